@@ -1,13 +1,22 @@
 import os
+import time
+import hashlib
 import streamlit as st
-import chromadb
 from dotenv import load_dotenv
-from collections import Counter
-from langchain_community.document_loaders import PyPDFLoader, DirectoryLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain.embeddings import init_embeddings
-from langchain.chat_models import init_chat_model
 import pandas as pd
+from resume_sync import sync_resume_dir, store_resume_docs, EmptyResume, MANIFEST_FILE
+from parallel_loader import load_pdf_bytes, persist_in_background, DEFAULT_WORKERS
+from resume_catalog import ResumeCatalog, CATALOG_FILE
+from ranking import ranking_text
+from answer_cache import ANSWER_CACHE, llm_model_name
+from streaming import TimedStream
+from lexical_index import LexicalIndex, LEXICAL_INDEX_FILE
+from compact_index import open_vector_store
+from dedup_index import DuplicateIndex, DuplicateResume, DEDUP_INDEX_FILE
+from shortlist_pipeline import build_shortlist
+from resources import REGISTRY, chat_model, embeddings, chroma_collection
+from profile_extractor import EXTRACT_PROFILES, extract_profile, backfill_profiles, profile_markdown
 load_dotenv()
 
 # ---------------- UI ----------------
@@ -24,22 +33,11 @@ if "action" not in st.session_state:
     st.session_state.action = "shortlist"
 
 
-# ---------------- LLM ----------------
-llm = init_chat_model(
-    model="phi-3.1-mini-4k-instruct",
-    model_provider="openai",
-    base_url="http://127.0.0.1:1234/v1",
-    api_key="not-needed"
-)
-
-# ---------------- EMBEDDINGS ----------------
-embed_model = init_embeddings(
-    model="text-embedding-nomic-embed-text-v1.5-embedding",
-    provider="openai",
-    base_url="http://127.0.0.1:1234/v1",
-    api_key="not-needed",
-    check_embedding_ctx_length=False
-)
+# ---------------- LLM / EMBEDDINGS ----------------
+# process-wide clients from the resource registry: built on first use and
+# reused by every rerun instead of being constructed on each interaction
+llm = chat_model()
+embed_model = embeddings()
 
 # ---------------- TEXT SPLITTER ----------------
 text_splitter = RecursiveCharacterTextSplitter(
@@ -47,112 +45,172 @@ text_splitter = RecursiveCharacterTextSplitter(
     chunk_overlap=60
 )
 
+# ---------------- RANKING ----------------
+# chunks fetched per query, then scored per resume from their distances
+CANDIDATE_POOL = 20
+# hybrid retrieval: vector and BM25 hits fused with reciprocal rank fusion
+VECTOR_POOL = 10
+LEXICAL_POOL = 20
+RANK_METHOD = "max"        # "max", "sum_top_m" or "rrf"
+SHORTLIST_TOP_K = 3
+
+# ---------------- SHORTLIST PROMPT ----------------
+SHORTLIST_PROMPT = """
+You are a resume shortlisting assistant.
+
+RULES:
+1. Use ONLY the candidate profile and resume parts provided below.
+2. Do NOT invent information.
+3. Do NOT repeat the profile, only explain the match in at most 5 sentences.
+
+CANDIDATE PROFILE ({best_source}):
+{profile_text}
+
+RESUME PARTS (most relevant to the query):
+{resume_text}
+
+USER QUERY:
+{user_query}
+
+WHY THIS CANDIDATE MATCHES THE QUERY (and any gaps):
+"""
+
 # ---------------- PDF LOADER ----------------
-dir_loader = DirectoryLoader(
-    path=r"D:\Sunbeam\IIT-Gen-AI-94443\Assignment\Day11\fake resume",
-    glob="*.pdf",
-    loader_cls=PyPDFLoader
-)
+RESUME_DIR = r"D:\Sunbeam\IIT-Gen-AI-94443\Assignment\Day11\fake resume"
+PDF_WORKERS = DEFAULT_WORKERS
 
-def load_pdf_resumes():
-    return dir_loader.load()
+# uploads are parsed in memory; set False to skip keeping the original PDF
+PERSIST_UPLOADS = True
+UPLOAD_DIR = "./fake resume"
 
 # ---------------- VECTOR DB ----------------
 PERSIST_DIR = "./Resume_base"
 COLLECTION_NAME = "Resume_collection"
 
-chroma_client = chromadb.PersistentClient(path=PERSIST_DIR)
-collection = chroma_client.get_or_create_collection(name=COLLECTION_NAME)
-
-# ---------------- INITIAL LOAD ----------------
-if collection.count() == 0:
-    documents = load_pdf_resumes()
-    chunks = text_splitter.split_documents(documents)
-    texts = [c.page_content for c in chunks]
-    embeddings = embed_model.embed_documents(texts)
-
-    ids = [f"resume_{i}" for i in range(len(texts))]
-    metadatas = []
-
-    for i, chunk in enumerate(chunks):
-        meta = chunk.metadata.copy()
-        meta["chunk_id"] = i
-        meta["source"] = os.path.basename(meta.get("source", "Unknown"))
-        metadatas.append(meta)
-
-    collection.add(
-        ids=ids,
-        documents=texts,
-        embeddings=embeddings,
-        metadatas=metadatas
-    )
+collection = chroma_collection(PERSIST_DIR, COLLECTION_NAME)
+
+# ---------------- RESUME CATALOG ----------------
+# one row per resume, kept in memory across reruns
+@st.cache_resource
+def get_catalog():
+    catalog = ResumeCatalog(os.path.join(PERSIST_DIR, CATALOG_FILE))
+    if len(catalog) == 0 and collection.count() > 0:
+        catalog.rebuild_from_collection(collection)
+    # skill / experience / location facets for resumes indexed before facets existed
+    catalog.backfill_facets(collection)
+    return catalog
+
+catalog = get_catalog()
+
+# ---------------- KEYWORD INDEX ----------------
+# BM25 index over the same chunks, for exact skills like "SAP FICO"
+@st.cache_resource
+def get_lexical_index():
+    lexical_index = LexicalIndex(os.path.join(PERSIST_DIR, LEXICAL_INDEX_FILE))
+    if len(lexical_index) == 0 and collection.count() > 0:
+        lexical_index.rebuild_from_collection(collection)
+    return lexical_index
+
+lexical_index = get_lexical_index()
+
+# ---------------- VECTOR STORE ----------------
+# VECTOR_STORE=int8 / float16 answers vector search from a compact array
+# (rebuilt when the catalog version moves) instead of the float32 HNSW index
+@st.cache_resource
+def get_vector_store():
+    return open_vector_store(collection, PERSIST_DIR, version_fn=catalog.version)
+
+vector_store = get_vector_store()
+
+# ---------------- DUPLICATE INDEX ----------------
+# MinHash + LSH signatures, checked before a resume is embedded
+@st.cache_resource
+def get_dedup_index():
+    dedup_index = DuplicateIndex(os.path.join(PERSIST_DIR, DEDUP_INDEX_FILE))
+    if len(dedup_index) == 0 and collection.count() > 0:
+        dedup_index.rebuild_from_collection(collection)
+    return dedup_index
+
+dedup_index = get_dedup_index()
+
+# ---------------- INITIAL LOAD / INCREMENTAL SYNC ----------------
+# only new or changed PDFs are parsed and embedded, deleted PDFs are removed
+@st.cache_data(ttl=600)
+def sync_resumes():
+    try:
+        return sync_resume_dir(
+            collection,
+            RESUME_DIR,
+            embed_model,
+            text_splitter,
+            manifest_path=os.path.join(PERSIST_DIR, MANIFEST_FILE),
+            workers=PDF_WORKERS,
+            catalog=catalog,
+            lexical_index=lexical_index,
+            dedup_index=dedup_index
+        )
+    except Exception as e:
+        st.warning(f"Resume sync skipped: {e}")
+        return None
+
+sync_report = sync_resumes()
 
 # ---------------- STORE UPLOADED RESUME ----------------
-def Store_Collection(uploaded_resume):
-    upload_dir = "./fake resume"
-    os.makedirs(upload_dir, exist_ok=True)
-
-    temp_path = os.path.join(upload_dir, uploaded_resume.name)
-
-    with open(temp_path, "wb") as f:
-        f.write(uploaded_resume.getbuffer())
-
-    loader = PyPDFLoader(temp_path)
-    docs = loader.load()
-
-    chunks = text_splitter.split_documents(docs)
-    texts = [c.page_content for c in chunks]
-    embeddings = embed_model.embed_documents(texts)
-    
-    ids = [f"{uploaded_resume.name}_{i}" for i in range(len(texts))]
-    metadatas = []
-
-    for i, chunk in enumerate(chunks):
-        meta = chunk.metadata
-        meta["source"] = uploaded_resume.name
-        meta["chunk_id"] = i
-        metadatas.append(meta)
-
-    collection.add(
-        ids=ids,
-        documents=texts,
-        embeddings=embeddings,
-        metadatas=metadatas
+def Store_Collection(uploaded_resume, source_name=None):
+    # source_name keeps the resume key of an update, even if the new file is named differently
+    source_name = source_name or uploaded_resume.name
+    # parse straight from the upload buffer, no temp file round trip
+    file_bytes = uploaded_resume.getbuffer()
+    docs = load_pdf_bytes(file_bytes, source_name)
+
+    # embeds only new chunk texts; upsert first, drop stale chunks after
+    chunk_count = store_resume_docs(
+        collection, docs, source_name, embed_model, text_splitter,
+        catalog=catalog,
+        sha256=hashlib.sha256(file_bytes).hexdigest(),
+        lexical_index=lexical_index,
+        dedup_index=dedup_index
     )
-def list_all_resumes():
-    data = collection.get(include=["documents","metadatas"])
-    rows = []
-    seen = set()
-    for doc, meta, doc_id in zip(data["documents"],data["metadatas"],data["ids"]):
 
-        source = meta.get("source", "Unknown")
+    # keeping the original PDF is optional and happens off the request path,
+    # only for a resume that was actually stored (not a skipped duplicate)
+    if PERSIST_UPLOADS:
+        persist_in_background(file_bytes, os.path.join(UPLOAD_DIR, source_name))
 
-        # avoid duplicate rows for same resume
-        if source not in seen:
-            seen.add(source)
-            raw_text = doc.strip()
-            lines = [l.strip() for l in raw_text.split("\n") if l.strip()]
-            first_line = lines[0] if lines else "Unknown Candidate"
-            candidate_name = " ".join(first_line.split()[:2])
+    # extract the profile once here, so shortlist queries only explain the match
+    row = catalog.get(source_name)
+    if EXTRACT_PROFILES and row and not row["profile"]:
+        try:
+            catalog.set_profile(source_name, extract_profile(llm, "\n".join(d.page_content for d in docs)))
+        except Exception as e:
+            st.warning(f"Profile extraction postponed: {e}")
+    return chunk_count
 
-            rows.append({
-                "Candidate Name": candidate_name,
-                "Resume Source": source,
-                "Resume ID": doc_id
-            })
+def list_all_resumes():
+    # served from the catalog, no collection dump
+    rows = []
+    for row in catalog.list_rows():
+        profile = row["profile"] or {}
+        rows.append({
+            "Candidate Name": row["candidate_name"],
+            "Current Role": profile.get("current_role", ""),
+            "Experience": profile.get("total_experience", ""),
+            "Resume Source": row["source"],
+            "Resume ID": row["source"],
+            "Chunks": row["chunk_count"],
+            "Uploaded": row["upload_time"]
+        })
 
     df = pd.DataFrame(rows)
     return df
 
 #-----------delete resume
 def delete_resume(source_name):
-    data = collection.get(include=["metadatas"])
-    delete_ids = [
-        doc_id
-        for doc_id, meta in zip(data["ids"], data["metadatas"])
-        if meta.get("source") == source_name
-    ]
-    collection.delete(ids=delete_ids)
+    # metadata-filtered delete: cost follows the resume size, not the corpus
+    collection.delete(where={"source": source_name})
+    lexical_index.remove_where("source", source_name)
+    catalog.remove(source_name)
+    dedup_index.remove(source_name)
 
 def update_resume():
     df = list_all_resumes()
@@ -175,8 +233,15 @@ def update_resume():
         if uploaded_file is None:
             st.warning("Please upload a PDF before updating")
             return
-        delete_resume(selected_source)
-        Store_Collection(uploaded_file)
+        # upsert under the same key: the old version stays searchable until the new one is in
+        try:
+            Store_Collection(uploaded_file, source_name=selected_source)
+        except DuplicateResume as e:
+            st.warning(f"Not updated: {e}")
+            return
+        except EmptyResume as e:
+            st.error(f"Not updated: {e} (scanned PDFs need OCR first)")
+            return
         st.success("Resume updated successfully ✅")
         st.stop()
 
@@ -190,8 +255,16 @@ if st.session_state.action == "upload":
     st.header("📤 Upload Resume")
     uploaded_file = st.file_uploader("Upload PDF", type=["pdf"])
     if uploaded_file:
-        Store_Collection(uploaded_file)
-        st.success("Resume uploaded successfully")
+        try:
+            Store_Collection(uploaded_file)
+            st.success("Resume uploaded successfully")
+            st.caption(embed_model.throughput_text())
+        except DuplicateResume as e:
+            # a new upload is really skipped: remember it as an alias for the duplicate clusters
+            dedup_index.add_alias(e.source, e.duplicate_of, e.similarity)
+            st.warning(f"Skipped: {e}")
+        except EmptyResume as e:
+            st.error(f"Not stored: {e} (scanned PDFs need OCR first)")
 
 elif st.session_state.action == "update":
     st.header("🔄 Update Resume")
@@ -202,6 +275,23 @@ elif st.session_state.action == "list":
     df=list_all_resumes()
     st.dataframe(df, use_container_width=True)
 
+    missing = catalog.missing_profiles()
+    if missing and st.button(f"Extract Missing Profiles ({len(missing)})", width="stretch"):
+        bar = st.progress(0.0, text="Extracting profiles")
+        profile_report = backfill_profiles(
+            catalog, collection, llm,
+            on_progress=lambda done, total: bar.progress(done / total, text=f"Profiles: {done}/{total}")
+        )
+        st.success(f"Extracted {profile_report['done']} profiles")
+        for source, error in profile_report["failed"]:
+            st.warning(f"Profile of {source} failed: {error}")
+
+    clusters = dedup_index.clusters()
+    if clusters:
+        st.subheader(f"Possible duplicates ({len(clusters)} groups)")
+        for i, members in enumerate(clusters, start=1):
+            st.markdown(f"**Group {i}:** " + ", ".join(f"{source} ({status})" for source, status in members))
+
 
 elif st.session_state.action == "delete":
     st.header("Delete Resume")
@@ -235,58 +325,41 @@ elif st.session_state.action == "shortlist":
         with st.chat_message("user"):
             st.markdown(user_query)
 
-        query_embedding = embed_model.embed_query(user_query)
-
-        results = collection.query(
-            query_embeddings=[query_embedding],
-            n_results=5
+        request_start = time.perf_counter()
+        shortlist = build_shortlist(
+            user_query, SHORTLIST_PROMPT, catalog, collection, vector_store, lexical_index, embed_model, llm,
+            top_k=SHORTLIST_TOP_K, candidate_pool=CANDIDATE_POOL, vector_pool=VECTOR_POOL,
+            lexical_pool=LEXICAL_POOL, rank_method=RANK_METHOD
         )
-
-        sources = [m["source"] for m in results["metadatas"][0]]
-        best_source = Counter(sources).most_common(1)[0][0]
-
-        all_docs = collection.get(where={"source": best_source})
-        full_resume_text = "\n\n".join(all_docs["documents"])
-
-        context = f"""
-    Resume Source: {best_source}
-    Full Resume Content:
-    {full_resume_text}
-    """
-
-        prompt = f"""
-    You are a resume identification assistant.
-
-    RULES:
-    1. Use ONLY the resume information provided in the CONTEXT.
-    2. Select ONLY one relevant resume.
-    3. Do NOT invent information.
-    4. If no match exists, respond exactly:
-    "No matching resume found."
-
-    RESUME DATA:
-    {context}
-
-    USER QUERY:
-    {user_query}
-
-    OUTPUT:
-    Name:
-    Current Role:
-    Company:
-    Contact:
-    Total Experience:
-    Primary Skills:
-    Key Responsibilities:
-    Resume Source:
-    reasone of selection : <answer based on your own intelligence
-    """
+        if shortlist is None:
+            with st.chat_message("assistant"):
+                st.markdown("No matching resume found.")
+            st.stop()
+        best_source, ranked, profile = shortlist["best_source"], shortlist["ranked"], shortlist["profile"]
+        prompt, filter_note, collection_version = shortlist["prompt"], shortlist["filter_note"], shortlist["version"]
 
         with st.chat_message("assistant"):
-            response = llm.invoke(prompt)
-            st.markdown(response.content)
-
-        messages.append({"role": "assistant", "content": response.content})
+            if filter_note:
+                st.caption(filter_note)
+            st.caption(f"Ranking: {ranking_text(ranked)}")
+            profile_md = profile_markdown(profile) + f"\n**Resume Source:** {best_source}\n\n"
+            st.markdown(profile_md)
+            model_name = llm_model_name(llm)
+            answer = ANSWER_CACHE.get(model_name, prompt, collection_version)
+            if answer is not None:
+                st.markdown(answer)
+                st.caption("⚡ Served from answer cache")
+            else:
+                # render tokens as they arrive instead of waiting for invoke()
+                stream = TimedStream(llm.stream(prompt))
+                st.write_stream(stream)
+                answer = stream.text
+                ANSWER_CACHE.put(model_name, prompt, collection_version, answer)
+                st.caption(
+                    f"{stream.timing_text()} · request {time.perf_counter() - request_start:.2f}s"
+                )
+
+        messages.append({"role": "assistant", "content": profile_md + answer})
 
 
 
@@ -308,3 +381,16 @@ with st.sidebar:
 
     if st.button("Shortlist Candidate",width="stretch"):
         st.session_state.action = "shortlist"
+
+    if st.button("Sync Resume Folder",width="stretch"):
+        sync_resumes.clear()
+        sync_report = sync_resumes()
+    if sync_report:
+        st.caption(
+            f"Last sync: {sync_report['added']} added, {sync_report['updated']} updated, "
+            f"{sync_report['deleted']} deleted, {sync_report['unchanged']} unchanged, "
+            f"{len(sync_report.get('duplicates', []))} duplicates skipped"
+        )
+    st.caption(embed_model.query_cache.stats_text())
+    st.caption(ANSWER_CACHE.stats_text())
+    st.caption(REGISTRY.stats_text())
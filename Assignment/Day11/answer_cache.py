@@ -0,0 +1,82 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+# ---------------- CONFIG ----------------
+# ANSWER_CACHE_SIZE=<n> answers kept in memory
+DEFAULT_ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", 512))
+
+
+def llm_model_name(llm):
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None) or "llm"
+
+
+class AnswerCache:
+    """
+    In-memory LRU of LLM answers keyed by (model, sha256(prompt)).
+    Every entry is stamped with the collection version it was produced
+    under (see ResumeCatalog.version). An entry is only served while the
+    version is unchanged, and all entries are dropped once it moves, so
+    answers about deleted or updated resumes are never returned.
+    """
+
+    def __init__(self, maxsize=DEFAULT_ANSWER_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.version = None
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model_name, prompt):
+        return model_name, hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+    def _check_version(self, version):
+        if version != self.version:
+            self.entries.clear()
+            self.version = version
+
+    def get(self, model_name, prompt, version):
+        key = self.make_key(model_name, prompt)
+        with self._lock:
+            self._check_version(version)
+            answer = self.entries.get(key)
+            if answer is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return answer
+
+    def put(self, model_name, prompt, version, answer):
+        key = self.make_key(model_name, prompt)
+        with self._lock:
+            # an answer produced under an older version is already stale
+            if self.version is not None and version != self.version:
+                return
+            self._check_version(version)
+            self.entries[key] = answer
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invoke(self, llm, prompt, version):
+        """Return (answer_text, cache_hit), calling llm.invoke() only on a miss."""
+        model_name = llm_model_name(llm)
+        answer = self.get(model_name, prompt, version)
+        if answer is not None:
+            return answer, True
+        answer = llm.invoke(prompt).content
+        self.put(model_name, prompt, version, answer)
+        return answer, False
+
+    def stats_text(self):
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"Answer cache: {rate:.0%} hit rate ({self.hits}/{total}), {len(self.entries)} entries"
+
+
+# one cache per process, so it survives Streamlit reruns
+ANSWER_CACHE = AnswerCache()
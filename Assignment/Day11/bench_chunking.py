@@ -0,0 +1,286 @@
+"""
+Chunking benchmark: chunk size / overlap / splitter strategy vs retrieval quality.
+
+The apps hard-code RecursiveCharacterTextSplitter(chunk_size=400,
+chunk_overlap=60). This sweeps the splitter settings over a fixture of
+synthetic resumes with labelled JD queries and reports, per setting:
+  - index size (chunks, MiB of vectors + text)
+  - ingestion time (split + embed)
+  - query latency p50 / p95 (embed + search + per-resume ranking)
+  - recall@k and MRR of the ranked resumes
+Embeddings come from hash_embeddings (deterministic, offline), so the
+numbers compare chunkings, not embedding models. Search is exact cosine
+over numpy by default; --chroma stores every setting in a throw-away
+Chroma collection instead and reports its on-disk size.
+
+Usage:
+    python bench_chunking.py
+    python bench_chunking.py --resumes 500 --sizes 300,400,600 --overlaps 0,60 --k 5
+    python bench_chunking.py --chroma --report-json chunking.json
+"""
+import os
+import json
+import time
+import random
+import argparse
+import tempfile
+import numpy as np
+from langchain_text_splitters import RecursiveCharacterTextSplitter, CharacterTextSplitter
+from hash_embeddings import HashEmbeddings
+from ranking import rank_resumes
+from context_packer import count_tokens
+
+# the apps' current setting, marked in the report
+CURRENT = ("recursive", 400, 60)
+STRATEGIES = ("recursive", "recursive_tokens", "character")
+CANDIDATE_POOL = 20
+
+# ---------------- FIXTURE ----------------
+ROLES = {
+    "Java Developer": ["java", "spring boot", "hibernate", "mysql", "microservices", "kafka", "rest api", "maven"],
+    "Python Developer": ["python", "django", "flask", "postgresql", "celery", "redis", "fastapi", "pandas"],
+    "Data Scientist": ["python", "machine learning", "pandas", "scikit-learn", "tensorflow", "nlp", "sql", "tableau"],
+    "Frontend Developer": ["javascript", "react", "typescript", "html", "css", "redux", "angular", "webpack"],
+    "DevOps Engineer": ["aws", "docker", "kubernetes", "terraform", "jenkins", "linux", "ansible", "prometheus"],
+    "SAP FICO Consultant": ["sap fico", "s/4hana", "general ledger", "accounts payable", "asset accounting",
+                            "controlling", "abap", "sap mm"],
+}
+# theme -> (project line, query wording of the same work)
+PROJECTS = {
+    "fraud": ("Built a real-time fraud detection pipeline scoring card transactions with {skill}.",
+              "candidate who has built fraud detection for card payments"),
+    "ecommerce": ("Developed the checkout and order management modules of an e-commerce platform using {skill}.",
+                  "experience building online shopping checkout and order management"),
+    "migration": ("Led the migration of a legacy on-premise system to the cloud, rewriting services in {skill}.",
+                  "someone who led a legacy to cloud migration"),
+    "chatbot": ("Created a customer support chatbot answering policy questions, backed by {skill}.",
+                "worked on a support chatbot for customers"),
+    "reporting": ("Automated month-end financial reporting and reconciliation with {skill}.",
+                  "automation of month end financial reporting and reconciliation"),
+    "inventory": ("Designed an inventory forecasting service for a retail chain with {skill}.",
+                  "inventory forecasting for retail stores"),
+    "telemetry": ("Implemented vehicle telemetry ingestion and alerting dashboards using {skill}.",
+                  "built telemetry ingestion and alerting for vehicles"),
+    "onboarding": ("Rebuilt the employee onboarding portal with single sign-on in {skill}.",
+                   "developed an employee onboarding portal with SSO"),
+}
+DUTIES = [
+    "Collaborated with cross-functional teams to deliver features on schedule.",
+    "Wrote unit and integration tests and reviewed pull requests of junior engineers.",
+    "Worked with business analysts to refine requirements and estimate user stories.",
+    "Improved performance of critical {skill} modules and reduced production incidents.",
+    "Maintained {skill} code and documented design decisions for the team.",
+    "Participated in sprint planning, daily stand-ups and retrospectives.",
+    "Mentored two interns and ran knowledge-sharing sessions on {skill}.",
+    "Handled production support and root cause analysis for escalated tickets.",
+]
+FIRST = ["Rahul", "Priya", "Amit", "Sneha", "Vikram", "Ananya", "Rohan", "Kavya", "Arjun", "Neha", "Karan", "Pooja"]
+LAST = ["Sharma", "Patel", "Iyer", "Reddy", "Gupta", "Nair", "Joshi", "Kulkarni", "Singh", "Mehta"]
+CITIES = ["Pune", "Mumbai", "Bengaluru", "Hyderabad", "Chennai", "Noida", "Kolkata"]
+COMPANIES = ["Infosys", "TCS", "Wipro", "Accenture", "Capgemini", "Cognizant", "HCL", "Tech Mahindra", "Persistent"]
+
+
+def make_resume(i, rng):
+    """One synthetic resume as (source, text, facts)."""
+    role = rng.choice(list(ROLES))
+    skills = rng.sample(ROLES[role], 5)
+    projects = rng.sample(list(PROJECTS), 2)
+    years = rng.randint(1, 15)
+    name = f"{rng.choice(FIRST)} {rng.choice(LAST)}"
+    lines = [
+        name,
+        f"{rng.choice(CITIES)}, India | {name.lower().replace(' ', '.')}{i}@mail.com | +91 9{rng.randint(100000000, 999999999)}",
+        "",
+        "PROFESSIONAL SUMMARY",
+        f"{role} with {years} years of experience delivering enterprise applications.",
+        "",
+        "TECHNICAL SKILLS",
+        ", ".join(skills),
+        "",
+        "WORK EXPERIENCE",
+    ]
+    for job in range(rng.randint(2, 3)):
+        lines.append(f"{role} - {rng.choice(COMPANIES)} ({2024 - 3 * job - 3} - {2024 - 3 * job})")
+        # the project lines sit deep inside the experience section on purpose
+        duties = [d.format(skill=rng.choice(skills)) for d in rng.sample(DUTIES, 4)]
+        if job < len(projects):
+            duties.insert(rng.randint(0, len(duties)), PROJECTS[projects[job]][0].format(skill=rng.choice(skills)))
+        lines += [f"- {d}" for d in duties]
+        lines.append("")
+    lines += ["EDUCATION", f"B.E. Computer Engineering, University of {rng.choice(CITIES)}, {2024 - years - 1}"]
+    return f"resume_{i:04d}.pdf", "\n".join(lines), {"role": role, "skills": set(skills), "projects": set(projects)}
+
+
+def make_queries(resumes, n_queries, rng):
+    """
+    Labelled JD queries as (query, relevant sources): role + two skills of a
+    real resume (relevant: same role, both skills) or a paraphrased project
+    (relevant: every resume with that project).
+    """
+    queries = []
+    for q in range(n_queries):
+        _, _, facts = rng.choice(resumes)
+        if q % 2 == 0:
+            a, b = rng.sample(sorted(facts["skills"]), 2)
+            text = f"Looking for a {facts['role']} with strong {a} and {b} experience"
+            relevant = {s for s, _, f in resumes if f["role"] == facts["role"] and {a, b} <= f["skills"]}
+        else:
+            theme = rng.choice(sorted(facts["projects"]))
+            text = f"Need a {PROJECTS[theme][1]}"
+            relevant = {s for s, _, f in resumes if theme in f["projects"]}
+        queries.append((text, relevant))
+    return queries
+
+
+# ---------------- SPLITTERS ----------------
+def make_splitter(strategy, size, overlap):
+    if strategy == "recursive":
+        return RecursiveCharacterTextSplitter(chunk_size=size, chunk_overlap=overlap)
+    if strategy == "recursive_tokens":
+        # same separators, but size and overlap counted in tokens
+        return RecursiveCharacterTextSplitter(chunk_size=size // 4, chunk_overlap=overlap // 4,
+                                              length_function=count_tokens)
+    if strategy == "character":
+        # whole lines packed up to the size, no recursive fallback
+        return CharacterTextSplitter(separator="\n", chunk_size=size, chunk_overlap=overlap)
+    raise ValueError(f"Unknown strategy: {strategy}. Use one of {STRATEGIES}")
+
+
+# ---------------- STORES ----------------
+class NumpyStore:
+    """Exact cosine search, results shaped like collection.query()."""
+
+    def __init__(self, ids, vectors, texts, metadatas):
+        self.ids, self.texts, self.metadatas = ids, texts, metadatas
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+
+    def size_bytes(self):
+        return self.vectors.nbytes + sum(len(t.encode("utf-8")) for t in self.texts)
+
+    def query(self, query_embedding, n_results):
+        sims = self.vectors @ np.asarray(query_embedding, dtype=np.float32)
+        top = np.argsort(-sims)[:n_results]
+        return {
+            "ids": [[self.ids[i] for i in top]],
+            "documents": [[self.texts[i] for i in top]],
+            "metadatas": [[self.metadatas[i] for i in top]],
+            "distances": [[float(2 - 2 * sims[i]) for i in top]],
+        }
+
+
+class ChromaStore:
+    """One throw-away persistent collection per setting."""
+
+    def __init__(self, ids, vectors, texts, metadatas, path):
+        import chromadb
+        from bench_compact import chroma_size
+        self.path, self._chroma_size = path, chroma_size
+        client = chromadb.PersistentClient(path=path)
+        self.collection = client.create_collection(name="bench_chunking")
+        batch = client.get_max_batch_size()
+        for start in range(0, len(ids), batch):
+            stop = start + batch
+            self.collection.add(ids=ids[start:stop], embeddings=vectors[start:stop],
+                                documents=texts[start:stop], metadatas=metadatas[start:stop])
+
+    def size_bytes(self):
+        return self._chroma_size(self.path)
+
+    def query(self, query_embedding, n_results):
+        return self.collection.query(query_embeddings=[query_embedding], n_results=n_results)
+
+
+# ---------------- BENCHMARK ----------------
+def run_setting(strategy, size, overlap, resumes, queries, embed_model, args, tmp):
+    start = time.perf_counter()
+    splitter = make_splitter(strategy, size, overlap)
+    ids, texts, metadatas = [], [], []
+    for source, text, _ in resumes:
+        for i, chunk in enumerate(splitter.split_text(text)):
+            ids.append(f"{source}_{i}")
+            texts.append(chunk)
+            metadatas.append({"source": source, "chunk_id": i})
+    vectors = embed_model.embed_documents(texts)
+    if args.chroma:
+        store = ChromaStore(ids, vectors, texts, metadatas, os.path.join(tmp, f"{strategy}_{size}_{overlap}"))
+    else:
+        store = NumpyStore(ids, vectors, texts, metadatas)
+    ingest_s = time.perf_counter() - start
+
+    timings, recalls, reciprocal_ranks = [], [], []
+    for query, relevant in queries:
+        start = time.perf_counter()
+        results = store.query(embed_model.embed_query(query), min(args.pool, len(ids)))
+        ranked = [r["source"] for r in rank_resumes(results, method=args.rank_method, top_k=args.pool)]
+        timings.append((time.perf_counter() - start) * 1000)
+        recalls.append(len(relevant & set(ranked[:args.k])) / min(args.k, len(relevant)))
+        first = next((rank for rank, source in enumerate(ranked, start=1) if source in relevant), None)
+        reciprocal_ranks.append(1.0 / first if first else 0.0)
+
+    return {
+        "strategy": strategy,
+        "chunk_size": size,
+        "chunk_overlap": overlap,
+        "chunks": len(ids),
+        "avg_chunk_chars": round(float(np.mean([len(t) for t in texts])), 1),
+        "index_mib": round(store.size_bytes() / 2**20, 3),
+        "ingest_s": round(ingest_s, 3),
+        "query_p50_ms": round(float(np.percentile(timings, 50)), 3),
+        "query_p95_ms": round(float(np.percentile(timings, 95)), 3),
+        f"recall@{args.k}": round(float(np.mean(recalls)), 4),
+        "mrr": round(float(np.mean(reciprocal_ranks)), 4),
+    }
+
+
+def print_report(rows, k):
+    print(f"  {'strategy':<17} | {'size':>4} | {'overlap':>7} | {'chunks':>6} | {'MiB':>6} | "
+          f"{'ingest s':>8} | {'p50 ms':>6} | {'p95 ms':>6} | {'recall@' + str(k):>8} | {'MRR':>6}")
+    print("-" * 104)
+    for r in rows:
+        mark = "*" if (r["strategy"], r["chunk_size"], r["chunk_overlap"]) == CURRENT else " "
+        print(f"{mark} {r['strategy']:<17} | {r['chunk_size']:>4} | {r['chunk_overlap']:>7} | {r['chunks']:>6} | "
+              f"{r['index_mib']:>6.2f} | {r['ingest_s']:>8.2f} | {r['query_p50_ms']:>6.2f} | "
+              f"{r['query_p95_ms']:>6.2f} | {r[f'recall@{k}']:>8.3f} | {r['mrr']:>6.3f}")
+    print("* current app setting")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=200, help="synthetic resumes in the fixture")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--sizes", default="200,400,800,1200", help="chunk sizes in characters")
+    parser.add_argument("--overlaps", default="0,60,120")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES))
+    parser.add_argument("--k", type=int, default=5, help="recall@k over ranked resumes")
+    parser.add_argument("--pool", type=int, default=CANDIDATE_POOL, help="chunks fetched per query")
+    parser.add_argument("--rank-method", default="max")
+    parser.add_argument("--chroma", action="store_true", help="search a Chroma collection instead of numpy")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--report-json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    resumes = [make_resume(i, rng) for i in range(args.resumes)]
+    queries = make_queries(resumes, args.queries, rng)
+    embed_model = HashEmbeddings()
+    print(f"{len(resumes)} resumes, {len(queries)} queries "
+          f"({np.mean([len(r) for _, r in queries]):.1f} relevant resumes per query)\n")
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for strategy in args.strategies.split(","):
+            for size in [int(s) for s in args.sizes.split(",")]:
+                for overlap in [int(o) for o in args.overlaps.split(",")]:
+                    if overlap >= size:
+                        continue
+                    rows.append(run_setting(strategy, size, overlap, resumes, queries, embed_model, args, tmp))
+    print_report(rows, args.k)
+
+    if args.report_json:
+        with open(args.report_json, "w", encoding="utf-8") as f:
+            json.dump({"resumes": args.resumes, "queries": args.queries, "k": args.k, "seed": args.seed,
+                       "store": "chroma" if args.chroma else "numpy", "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Compact vector storage benchmark: Chroma (float32 HNSW) vs float16 / int8.
+
+Compares, for the same chunk vectors and queries:
+  - recall@k against exact float32 brute force
+  - RAM held by the searchable vectors: Chroma's float32 copy (n x dim x 4,
+    its HNSW links come on top) vs the compact arrays (codes, scales,
+    centroids; the float32 rescoring copy is memory-mapped)
+  - size on disk: Chroma's sqlite plus segment folders vs the saved compact
+    index plus its float32 rescoring file
+  - query latency (p50 / p95)
+for the Chroma collection and every compact configuration (flat / IVF,
+with and without float32 rescoring).
+
+By default a throw-away collection is filled with clustered synthetic
+vectors. --persist-dir benchmarks a real collection instead. Queries are
+stored vectors plus noise, so no embedding server is needed.
+
+Usage:
+    python bench_compact.py --chunks 50000 --queries 200
+    python bench_compact.py --persist-dir ./Resume_base --collection Resume_collection
+"""
+import os
+import time
+import argparse
+import tempfile
+import numpy as np
+import chromadb
+from compact_index import CompactIndex, COMPACT_INDEX_DIR, normalize
+
+DIM = 768
+CHUNKS_PER_RESUME = 10
+# (dtype, ivf lists, rescore candidates)
+CONFIGS = [
+    ("float16", 0, 0),
+    ("int8", 0, 0),
+    ("int8", 0, 50),
+    ("int8", 256, 50),
+]
+
+
+def chroma_size(path):
+    """Bytes of chroma.sqlite3 plus the segment folders (HNSW, vectors)."""
+    total = 0
+    for root, _, files in os.walk(path):
+        top = root == path
+        if not top and os.path.relpath(root, path).split(os.sep)[0] == COMPACT_INDEX_DIR:
+            continue
+        for name in files:
+            if not top or name == "chroma.sqlite3":
+                total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def folder_size(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files)
+
+
+def fill_collection(collection, n_chunks, batch_size, rng):
+    """Clustered random vectors, so nearest neighbours are meaningful."""
+    centers = rng.normal(size=(max(1, n_chunks // 100), DIM)).astype(np.float32)
+    for start in range(0, n_chunks, batch_size):
+        stop = min(start + batch_size, n_chunks)
+        picks = rng.integers(0, len(centers), stop - start)
+        vectors = centers[picks] + 0.7 * rng.normal(size=(stop - start, DIM)).astype(np.float32)
+        collection.add(
+            ids=[f"resume_{i // CHUNKS_PER_RESUME}.pdf_{i % CHUNKS_PER_RESUME}" for i in range(start, stop)],
+            embeddings=vectors.tolist(),
+            metadatas=[{"source": f"resume_{i // CHUNKS_PER_RESUME}.pdf", "chunk_id": i % CHUNKS_PER_RESUME}
+                       for i in range(start, stop)]
+        )
+
+
+def load_all(collection):
+    ids, vectors, metadatas = [], [], []
+    offset = 0
+    while True:
+        page = collection.get(include=["embeddings", "metadatas"], limit=5000, offset=offset)
+        if len(page["ids"]) == 0:
+            break
+        ids += page["ids"]
+        vectors.append(np.asarray(page["embeddings"], dtype=np.float32))
+        metadatas += page["metadatas"]
+        offset += len(page["ids"])
+    return ids, np.vstack(vectors), metadatas
+
+
+def recall(found, truth):
+    return np.mean([len(set(f) & t) / len(t) for f, t in zip(found, truth)])
+
+
+def timed(search, queries):
+    found, timings = [], []
+    for q in queries:
+        start = time.perf_counter()
+        found.append(search(q))
+        timings.append((time.perf_counter() - start) * 1000)
+    return found, np.percentile(timings, 50), np.percentile(timings, 95)
+
+
+def run(collection, persist_path, args, rng, tmp):
+    ids, vectors, metadatas = load_all(collection)
+    ids_arr = np.asarray(ids, dtype=object)
+    unit = normalize(vectors)
+    picks = rng.choice(len(ids), min(args.queries, len(ids)), replace=False)
+    queries = vectors[picks] + args.noise * rng.normal(size=(len(picks), vectors.shape[1])).astype(np.float32)
+    truth = [set(ids_arr[np.argsort(-(unit @ normalize(q)))[:args.k]]) for q in queries]
+
+    print(f"{len(ids)} chunks x {vectors.shape[1]} dims, {len(queries)} queries, recall@{args.k}")
+    print(f"{'store':<22} | {'recall':>6} | {'RAM MiB':>8} | {'disk MiB':>8} | {'p50 ms':>7} | {'p95 ms':>7}")
+    print("-" * 75)
+
+    found, p50, p95 = timed(
+        lambda q: collection.query(query_embeddings=[q.tolist()], n_results=args.k, include=[])["ids"][0],
+        queries
+    )
+    # RAM: the float32 vectors Chroma's HNSW index holds, without the graph links
+    print(f"{'chroma float32 hnsw':<22} | {recall(found, truth):>6.3f} | {vectors.nbytes / 2**20:>8.1f} | "
+          f"{chroma_size(persist_path) / 2**20:>8.1f} | {p50:>7.2f} | {p95:>7.2f}")
+
+    for dtype, n_lists, rescore in CONFIGS:
+        label = f"{dtype} {'ivf' + str(n_lists) if n_lists else 'flat'}{' +rescore' if rescore else ''}"
+        folder = os.path.join(tmp, label.replace(" ", "_"))
+        os.makedirs(folder)
+        index = CompactIndex(dtype, n_lists=n_lists, n_probe=args.probe, rescore=rescore)
+        index.build(ids, vectors, metadatas, full_path=os.path.join(folder, f"{dtype}_full_f32.npy"))
+        index.save(folder)
+        found, p50, p95 = timed(lambda q: [c for c, _ in index.search(q, args.k)], queries)
+        print(f"{label:<22} | {recall(found, truth):>6.3f} | {index.memory_bytes() / 2**20:>8.1f} | "
+              f"{folder_size(folder) / 2**20:>8.1f} | {p50:>7.2f} | {p95:>7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=50000, help="synthetic corpus size")
+    parser.add_argument("--persist-dir", help="benchmark this Chroma folder instead of synthetic data")
+    parser.add_argument("--collection", default="Resume_collection")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--probe", type=int, default=16, help="IVF lists scanned per query")
+    parser.add_argument("--noise", type=float, default=0.5, help="noise added to the query vectors")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.persist_dir:
+            collection = chromadb.PersistentClient(path=args.persist_dir).get_collection(name=args.collection)
+            run(collection, args.persist_dir, args, rng, tmp)
+        else:
+            chroma_path = os.path.join(tmp, "chroma")
+            client = chromadb.PersistentClient(path=chroma_path)
+            collection = client.create_collection(name="bench_compact")
+            fill_collection(collection, args.chunks, client.get_max_batch_size(), rng)
+            run(collection, chroma_path, args, rng, tmp)
+
+
+if __name__ == "__main__":
+    main()
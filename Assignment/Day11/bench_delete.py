@@ -0,0 +1,88 @@
+"""
+Delete latency benchmark: full-scan delete vs metadata-filtered delete.
+
+Fills a throw-away Chroma collection with synthetic resumes (random vectors,
+CHUNKS_PER_RESUME chunks each) and times deleting single resumes with
+  - scan:  collection.get(include=["metadatas"]) + filter in Python (old code)
+  - where: collection.delete(where={"source": ...}) (current code)
+at growing corpus sizes. The "where" column should stay flat.
+
+Usage:
+    python bench_delete.py --sizes 1000 10000 50000 200000 --deletes 20
+"""
+import time
+import random
+import argparse
+import tempfile
+import statistics
+import chromadb
+
+CHUNKS_PER_RESUME = 10
+DIM = 64
+
+
+def fill_collection(collection, n_chunks, batch_size):
+    n_resumes = n_chunks // CHUNKS_PER_RESUME
+    ids, embeddings, metadatas = [], [], []
+    for r in range(n_resumes):
+        for c in range(CHUNKS_PER_RESUME):
+            ids.append(f"resume_{r}.pdf_{c}")
+            embeddings.append([random.random() for _ in range(DIM)])
+            metadatas.append({"source": f"resume_{r}.pdf", "chunk_id": c})
+            if len(ids) >= batch_size:
+                collection.add(ids=ids, embeddings=embeddings, metadatas=metadatas)
+                ids, embeddings, metadatas = [], [], []
+    if ids:
+        collection.add(ids=ids, embeddings=embeddings, metadatas=metadatas)
+    return n_resumes
+
+
+def scan_delete(collection, source_name):
+    data = collection.get(include=["metadatas"])
+    delete_ids = [
+        doc_id
+        for doc_id, meta in zip(data["ids"], data["metadatas"])
+        if meta.get("source") == source_name
+    ]
+    collection.delete(ids=delete_ids)
+
+
+def where_delete(collection, source_name):
+    collection.delete(where={"source": source_name})
+
+
+def time_deletes(collection, delete_fn, sources):
+    timings = []
+    for source in sources:
+        start = time.perf_counter()
+        delete_fn(collection, source)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--deletes", type=int, default=20, help="resumes deleted per method and size")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    print(f"{'chunks':>10} | {'scan ms (p50)':>14} | {'where ms (p50)':>14}")
+    print("-" * 46)
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            client = chromadb.PersistentClient(path=tmp)
+            collection = client.create_collection(name="bench_delete")
+            n_resumes = fill_collection(collection, size, client.get_max_batch_size())
+
+            picked = random.sample(range(n_resumes), min(2 * args.deletes, n_resumes))
+            sources = [f"resume_{r}.pdf" for r in picked]
+            half = len(sources) // 2
+            scan_ms = time_deletes(collection, scan_delete, sources[:half])
+            where_ms = time_deletes(collection, where_delete, sources[half:])
+            print(f"{size:>10} | {scan_ms:>14.2f} | {where_ms:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
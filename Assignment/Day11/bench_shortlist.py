@@ -0,0 +1,268 @@
+"""
+End-to-end shortlist latency benchmark with a per-stage breakdown.
+
+Drives the shortlist logic of Resume_RAG.py / Agentic _RAG.py headlessly
+(shortlist_pipeline.build_shortlist with the app's own SHORTLIST_PROMPT and
+pool settings, read from the script without running Streamlit) over a query
+set at a configurable concurrency, then calls the LLM like the app does.
+Reports p50 / p95 / p99 of every stage
+    embed_query, prefilter, retrieve, rank, fetch_resume, profile,
+    build_prompt, llm (+ time to first token with --stream)
+and of the whole request, and writes JSON so runs can be compared across
+commits (--baseline prints the change against an earlier JSON).
+The answer cache is bypassed, every request reaches the LLM.
+
+Usage:
+    python bench_shortlist.py --app day11 --requests 200 --concurrency 4 --json run.json
+    python bench_shortlist.py --app day12 --stream --baseline run.json
+    # fully offline: in-process stub server and 300 synthetic resumes
+    python bench_shortlist.py --stub --synthetic 300 --concurrency 8 --json stub.json
+"""
+import os
+import ast
+import sys
+import json
+import time
+import random
+import hashlib
+import datetime
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from langchain.chat_models import init_chat_model
+from bulk_index import build_indexer, percentile, PERSIST_DIR, COLLECTION_NAME, CHAT_MODEL
+from compact_index import open_vector_store, STORE_MODES, VECTOR_STORE
+from shortlist_pipeline import build_shortlist, StageTimer, SHORTLIST_STAGES
+from resume_sync import upsert_resume_chunks
+from resume_catalog import guess_candidate_name
+from facets import resume_facets
+from profile_extractor import backfill_profiles
+from resources import base_url_from_env
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APPS = {
+    "day11": os.path.join(HERE, "Resume_RAG.py"),
+    "day12": os.path.join(HERE, "..", "Day12", "Agentic _RAG.py"),
+}
+APP_SETTINGS = ("SHORTLIST_PROMPT", "SHORTLIST_TOP_K", "CANDIDATE_POOL", "VECTOR_POOL", "LEXICAL_POOL", "RANK_METHOD")
+
+DEFAULT_QUERIES = [
+    "Java developer with Spring Boot and microservices, 5+ years",
+    "Python developer who knows Django and PostgreSQL",
+    "Data scientist with machine learning and NLP experience",
+    "Frontend developer skilled in React and TypeScript",
+    "DevOps engineer with AWS, Docker and Kubernetes in Pune",
+    "SAP FICO consultant with S/4HANA and general ledger experience",
+    "Someone who built fraud detection for card payments",
+    "Candidate with experience in a legacy to cloud migration",
+    "Full stack developer with Node.js and MongoDB",
+    "Business analyst with Power BI and SQL reporting",
+]
+
+
+def app_settings(path):
+    """The shortlist constants of an app script, read with ast so Streamlit never runs."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    found = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            name = node.targets[0].id
+            if name in APP_SETTINGS:
+                found[name] = ast.literal_eval(node.value)
+    missing = [name for name in APP_SETTINGS if name not in found]
+    if missing:
+        raise ValueError(f"{path} does not define {', '.join(missing)}")
+    return found
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def load_queries(path):
+    if not path:
+        return DEFAULT_QUERIES
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def seed_synthetic(parts, llm, n_resumes, seed):
+    """Fill an empty store with bench_chunking's synthetic resumes, profiles included."""
+    from bench_chunking import make_resume
+    rng = random.Random(seed)
+    for i in range(n_resumes):
+        source, text, _ = make_resume(i, rng)
+        texts = parts["text_splitter"].split_text(text)
+        upsert_resume_chunks(parts["collection"], "source", source, texts,
+                             [{"source": source, "chunk_id": c} for c in range(len(texts))],
+                             parts["embed_model"], lexical_index=parts["lexical_index"])
+        parts["catalog"].upsert(source, guess_candidate_name(texts[0]), len(texts),
+                                sha256=hashlib.sha256(text.encode("utf-8")).hexdigest(), facets=resume_facets(text))
+    backfill_profiles(parts["catalog"], parts["collection"], llm)
+
+
+# ---------------- RUN ----------------
+def one_request(query, settings, parts, vector_store, llm, stream):
+    """Stage timings (ms) of one shortlist request, plus total and ttft."""
+    timer = StageTimer()
+    shortlist = build_shortlist(
+        query, settings["SHORTLIST_PROMPT"], parts["catalog"], parts["collection"], vector_store,
+        parts["lexical_index"], parts["embed_model"], llm,
+        top_k=settings["SHORTLIST_TOP_K"], candidate_pool=settings["CANDIDATE_POOL"],
+        vector_pool=settings["VECTOR_POOL"], lexical_pool=settings["LEXICAL_POOL"],
+        rank_method=settings["RANK_METHOD"], timer=timer
+    )
+    result = dict(timer.ms)
+    if shortlist is not None:
+        with timer.stage("llm"):
+            if stream:
+                start = time.perf_counter()
+                for i, _ in enumerate(llm.stream(shortlist["prompt"])):
+                    if i == 0:
+                        result["ttft"] = (time.perf_counter() - start) * 1000
+            else:
+                llm.invoke(shortlist["prompt"])
+        result["llm"] = timer.ms["llm"]
+    result["total"] = timer.total_ms()
+    return result
+
+
+def run_benchmark(queries, settings, parts, vector_store, llm, requests, concurrency, warmup, stream):
+    for query in queries[:warmup]:
+        one_request(query, settings, parts, vector_store, llm, stream)
+
+    def work(i):
+        try:
+            return one_request(queries[i % len(queries)], settings, parts, vector_store, llm, stream), None
+        except Exception as e:
+            return None, f"{type(e).__name__}: {e}"
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        outcomes = list(pool.map(work, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    samples = [r for r, _ in outcomes if r is not None]
+    errors = [e for _, e in outcomes if e is not None]
+    stages = {}
+    for name in SHORTLIST_STAGES + ("ttft", "total"):
+        values = [s[name] for s in samples if name in s]
+        if values:
+            stages[name] = {
+                "count": len(values),
+                "mean": round(sum(values) / len(values), 3),
+                "p50": round(percentile(values, 50), 3),
+                "p95": round(percentile(values, 95), 3),
+                "p99": round(percentile(values, 99), 3),
+            }
+    return {
+        "requests": requests,
+        "ok": len(samples),
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:5],
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(samples) / elapsed, 3) if elapsed else 0.0,
+        "stages_ms": stages,
+    }
+
+
+def print_report(report, baseline=None):
+    old = (baseline or {}).get("stages_ms", {})
+    print(f"{report['ok']}/{report['requests']} ok, {report['errors']} errors, "
+          f"{report['throughput_rps']:.2f} req/s over {report['elapsed_s']:.1f}s")
+    header = f"{'stage':<13} | {'mean':>8} | {'p50':>8} | {'p95':>8} | {'p99':>8}"
+    print(header + (f" | {'p95 vs base':>11}" if baseline else ""))
+    print("-" * (len(header) + (14 if baseline else 0)))
+    for name, s in report["stages_ms"].items():
+        line = f"{name:<13} | {s['mean']:>8.1f} | {s['p50']:>8.1f} | {s['p95']:>8.1f} | {s['p99']:>8.1f}"
+        if baseline:
+            if name in old and old[name]["p95"]:
+                line += f" | {(s['p95'] / old[name]['p95'] - 1) * 100:>+10.1f}%"
+            else:
+                line += f" | {'-':>11}"
+        print(line)
+    for error in report["error_samples"]:
+        print(f"error: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--app", choices=sorted(APPS), default="day11", help="whose prompt and pool settings to use")
+    parser.add_argument("--queries", help="text file, one JD query per line (default: built-in set)")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=3, help="untimed requests before the run")
+    parser.add_argument("--stream", action="store_true", help="stream the answer like the UI (adds ttft)")
+    parser.add_argument("--persist-dir", default=PERSIST_DIR)
+    parser.add_argument("--collection", default=COLLECTION_NAME)
+    parser.add_argument("--vector-store", choices=STORE_MODES, default=VECTOR_STORE)
+    parser.add_argument("--base-url", help="default: LLM_BASE_URL or LM Studio")
+    parser.add_argument("--no-embed-cache", action="store_true", help="embed every query against the server")
+    parser.add_argument("--stub", action="store_true", help="serve the models from an in-process stub_server")
+    parser.add_argument("--stub-latency-ms", type=float, default=50)
+    parser.add_argument("--stub-tokens-per-s", type=float, default=50)
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="index this many synthetic resumes into a temporary store first")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--baseline", help="earlier JSON report to compare p95 against")
+    args = parser.parse_args()
+    load_dotenv()
+
+    settings = app_settings(APPS[args.app])
+    base_url, server = args.base_url or base_url_from_env(), None
+    if args.stub:
+        from stub_server import start_stub_server, StubConfig
+        server, base_url = start_stub_server(0, StubConfig(latency_ms=args.stub_latency_ms,
+                                                           tokens_per_s=args.stub_tokens_per_s, seed=args.seed))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        persist_dir = tmp if args.synthetic else args.persist_dir
+        parts = build_indexer(persist_dir, args.collection, base_url)
+        if args.no_embed_cache:
+            parts["embed_model"] = parts["batched"]
+        llm = init_chat_model(model=CHAT_MODEL, model_provider="openai", base_url=base_url, api_key="not-needed")
+        if args.synthetic:
+            print(f"Indexing {args.synthetic} synthetic resumes ...")
+            seed_synthetic(parts, llm, args.synthetic, args.seed)
+        vector_store = open_vector_store(parts["collection"], persist_dir, args.vector_store,
+                                         version_fn=parts["catalog"].version)
+        queries = load_queries(args.queries)
+        print(f"{args.app}: {len(parts['catalog'])} resumes, {len(queries)} queries, "
+              f"{args.requests} requests at concurrency {args.concurrency}, vector store {args.vector_store}\n")
+        report = run_benchmark(queries, settings, parts, vector_store, llm,
+                               args.requests, args.concurrency, args.warmup, args.stream)
+
+    if server is not None:
+        server.shutdown()
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "app": args.app, "concurrency": args.concurrency, "stream": args.stream,
+            "vector_store": args.vector_store, "embed_cache": not args.no_embed_cache,
+            "base_url": "stub" if args.stub else base_url, "synthetic": args.synthetic,
+            "queries": len(queries), "settings": {k: v for k, v in settings.items() if k != "SHORTLIST_PROMPT"},
+        },
+        **report,
+    }
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    sys.exit(1 if report["errors"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Headless bulk indexer for a resume archive (cron / batch host).
+
+Runs the same parse -> split -> embed -> store path as the Streamlit apps,
+without Streamlit. The sync manifest is the checkpoint: it is saved after
+every file, so a killed run continues where it stopped and a nightly run
+only embeds new or changed PDFs.
+
+Usage:
+    python bulk_index.py /data/resumes --workers 16
+    python bulk_index.py /data/resumes --dry-run
+    python bulk_index.py /data/resumes --report-json run.json
+    python bulk_index.py /data/resumes --extract-profiles --profile-workers 4
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import chromadb
+from dotenv import load_dotenv
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain.embeddings import init_embeddings
+from langchain.chat_models import init_chat_model
+
+from resume_sync import sync_resume_dir, MANIFEST_FILE
+from parallel_loader import DEFAULT_WORKERS
+from embed_client import BatchedEmbeddings
+from embed_cache import CachedEmbeddings
+from resume_catalog import ResumeCatalog, CATALOG_FILE
+from lexical_index import LexicalIndex, LEXICAL_INDEX_FILE
+from dedup_index import DuplicateIndex, DEDUP_INDEX_FILE
+from profile_extractor import backfill_profiles, PROFILE_WORKERS
+from resources import base_url_from_env
+
+PERSIST_DIR = "./Resume_base"
+COLLECTION_NAME = "Resume_collection"
+EMBED_MODEL = "text-embedding-nomic-embed-text-v1.5-embedding"
+CHAT_MODEL = "phi-3.1-mini-4k-instruct"
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a list of numbers (p in 0..100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def build_indexer(persist_dir=PERSIST_DIR, collection_name=COLLECTION_NAME, base_url=None):
+    """
+    Create the embedding client, splitter, collection, catalog, keyword and
+    duplicate index. base_url defaults to LLM_BASE_URL, read at call time.
+    """
+    base_url = base_url or base_url_from_env()
+    batched = BatchedEmbeddings(init_embeddings(
+        model=EMBED_MODEL,
+        provider="openai",
+        base_url=base_url,
+        api_key="not-needed",
+        check_embedding_ctx_length=False
+    ))
+    client = chromadb.PersistentClient(path=persist_dir)
+    return {
+        "batched": batched,
+        "embed_model": CachedEmbeddings(batched, path=os.path.join(persist_dir, "embed_cache.sqlite")),
+        "text_splitter": RecursiveCharacterTextSplitter(chunk_size=400, chunk_overlap=60),
+        "collection": client.get_or_create_collection(name=collection_name),
+        "catalog": ResumeCatalog(os.path.join(persist_dir, CATALOG_FILE)),
+        "lexical_index": LexicalIndex(os.path.join(persist_dir, LEXICAL_INDEX_FILE)),
+        "dedup_index": DuplicateIndex(os.path.join(persist_dir, DEDUP_INDEX_FILE)),
+    }
+
+
+def run_bulk_index(resume_dir, persist_dir=PERSIST_DIR, collection_name=COLLECTION_NAME,
+                   workers=DEFAULT_WORKERS, dry_run=False, prune=True, base_url=None,
+                   extract_profiles=False, profile_workers=PROFILE_WORKERS):
+    """
+    Index a folder of PDFs and return a report dict with throughput and failures.
+    With extract_profiles=True the profile backlog is worked off afterwards.
+    A dry run only compares the folder with the manifest: no store, cache or
+    index file is opened or created.
+    """
+    base_url = base_url or base_url_from_env()
+    manifest_path = os.path.join(persist_dir, MANIFEST_FILE)
+    if dry_run:
+        start = time.perf_counter()
+        report = sync_resume_dir(None, resume_dir, None, None, manifest_path, dry_run=True, prune=prune)
+        report.update({"dry_run": True, "seconds": time.perf_counter() - start})
+        return report
+
+    parts = build_indexer(persist_dir, collection_name, base_url)
+    start = time.perf_counter()
+    report = sync_resume_dir(
+        parts["collection"],
+        resume_dir,
+        parts["embed_model"],
+        parts["text_splitter"],
+        manifest_path=manifest_path,
+        workers=workers,
+        catalog=parts["catalog"],
+        lexical_index=parts["lexical_index"],
+        dedup_index=parts["dedup_index"],
+        prune=prune
+    )
+    seconds = time.perf_counter() - start
+
+    files = report["added"] + report["updated"]
+    latencies_ms = [s * 1000 for s in parts["batched"].latencies]
+    report.update({
+        "dry_run": False,
+        "seconds": seconds,
+        "files_per_sec": files / seconds if seconds > 0 else 0.0,
+        "chunks_per_sec": report["chunks"] / seconds if seconds > 0 else 0.0,
+        "embed_requests": len(latencies_ms),
+        "embed_latency_ms": {
+            "p50": percentile(latencies_ms, 50),
+            "p95": percentile(latencies_ms, 95),
+            "p99": percentile(latencies_ms, 99),
+        },
+        "collection_chunks": parts["collection"].count(),
+        "resumes": len(parts["catalog"]),
+    })
+
+    if extract_profiles:
+        llm = init_chat_model(model=CHAT_MODEL, model_provider="openai", base_url=base_url, api_key="not-needed")
+        start = time.perf_counter()
+        report["profiles"] = backfill_profiles(parts["catalog"], parts["collection"], llm, workers=profile_workers)
+        report["profiles"]["seconds"] = time.perf_counter() - start
+    return report
+
+
+def print_report(report):
+    mode = "DRY RUN - nothing written" if report["dry_run"] else "done"
+    print(f"Bulk index {mode} in {report['seconds']:.1f}s")
+    print(f"  files:  {report['added']} added, {report['updated']} updated, "
+          f"{report['deleted']} deleted, {report['unchanged']} unchanged, {len(report['failed'])} failed, "
+          f"{len(report['duplicates'])} duplicates")
+    if not report["dry_run"]:
+        lat = report["embed_latency_ms"]
+        print(f"  speed:  {report['files_per_sec']:.2f} files/s, {report['chunks_per_sec']:.1f} chunks/s "
+              f"({report['chunks']} chunks)")
+        print(f"  embed:  {report['embed_requests']} requests, p50 {lat['p50']:.0f} ms, "
+              f"p95 {lat['p95']:.0f} ms, p99 {lat['p99']:.0f} ms")
+        print(f"  index:  {report['resumes']} resumes, {report['collection_chunks']} chunks")
+    if "profiles" in report:
+        profiles = report["profiles"]
+        print(f"  profiles: {profiles['done']} extracted, {len(profiles['failed'])} failed "
+              f"in {profiles['seconds']:.1f}s")
+        for name, error in profiles["failed"]:
+            print(f"  PROFILE FAILED {name}: {error}")
+    for name, duplicate_of in report["duplicates"]:
+        print(f"  duplicate {name} of {duplicate_of}")
+    for name, error in report["failed"]:
+        print(f"  FAILED {name}: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk index a folder of PDF resumes into Chroma")
+    parser.add_argument("resume_dir")
+    parser.add_argument("--persist-dir", default=PERSIST_DIR)
+    parser.add_argument("--collection", default=COLLECTION_NAME)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="PDF parser processes")
+    parser.add_argument("--base-url", help="OpenAI-compatible embedding server (default: LLM_BASE_URL or LM Studio)")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be indexed")
+    parser.add_argument("--keep-missing", action="store_true", help="do not remove resumes whose PDF is gone")
+    parser.add_argument("--extract-profiles", action="store_true", help="extract missing candidate profiles with the LLM")
+    parser.add_argument("--profile-workers", type=int, default=PROFILE_WORKERS, help="LLM requests in flight")
+    parser.add_argument("--report-json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    load_dotenv()
+    report = run_bulk_index(
+        args.resume_dir,
+        persist_dir=args.persist_dir,
+        collection_name=args.collection,
+        workers=args.workers,
+        dry_run=args.dry_run,
+        prune=not args.keep_missing,
+        base_url=args.base_url,
+        extract_profiles=args.extract_profiles,
+        profile_workers=args.profile_workers
+    )
+    print_report(report)
+    if args.report_json:
+        with open(args.report_json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    sys.exit(1 if report["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+import os
+import uuid
+import threading
+import numpy as np
+
+# ---------------- CONFIG ----------------
+# VECTOR_STORE=chroma keeps querying the Chroma HNSW index (full float32).
+# float16 / int8 serve vector search from a compact in-memory array instead.
+STORE_MODES = ("chroma", "float16", "int8")
+VECTOR_STORE = os.getenv("VECTOR_STORE", "chroma")
+IVF_LISTS = int(os.getenv("IVF_LISTS", 0))        # 0 = flat (exact over the compact array)
+IVF_PROBE = int(os.getenv("IVF_PROBE", 8))        # lists scanned per query
+RESCORE = int(os.getenv("VECTOR_RESCORE", 50))    # candidates re-scored in float32, 0 = off
+IVF_RETRAIN = float(os.getenv("IVF_RETRAIN", 0.2))  # re-run k-means once the row count moved this share
+COMPACT_INDEX_DIR = "compact_index"
+PAGE_SIZE = 5000
+GROUP_KEYS = ("source", "resume_id")
+
+
+def normalize(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    return matrix / (np.linalg.norm(matrix, axis=-1, keepdims=True) + 1e-12)
+
+
+def quantize(matrix, dtype):
+    """
+    float16: plain cast. int8: symmetric per-vector quantization, each row
+    scaled so its largest component maps to 127. Returns (codes, scales).
+    """
+    if dtype == "float16":
+        return matrix.astype(np.float16), np.ones(len(matrix), dtype=np.float32)
+    if dtype == "int8":
+        scales = np.abs(matrix).max(axis=1, initial=0.0) / 127.0 + 1e-12
+        codes = np.round(matrix / scales[:, None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    raise ValueError(f"dtype must be float16 or int8, got {dtype}")
+
+
+def kmeans(matrix, n_lists, iterations=10, sample=20000, seed=0):
+    """Spherical k-means centroids for the IVF lists, trained on a sample."""
+    rng = np.random.default_rng(seed)
+    if len(matrix) > sample:
+        matrix = matrix[rng.choice(len(matrix), sample, replace=False)]
+    centroids = matrix[rng.choice(len(matrix), n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(matrix @ centroids.T, axis=1)
+        for c in range(n_lists):
+            members = matrix[assign == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+        centroids = normalize(centroids)
+    return centroids
+
+
+class CompactIndex:
+    """
+    Vector search over the collection's chunk embeddings kept as float16 or
+    int8 (with a per-vector scale) instead of Chroma's float32 HNSW graph.
+    Search is flat, or IVF when n_lists > 0. The top RESCORE candidates are
+    re-scored against the float32 vectors, which stay on disk and are read
+    through a memory map, so only the compact array lives in RAM.
+    """
+
+    def __init__(self, dtype="int8", n_lists=IVF_LISTS, n_probe=IVF_PROBE, rescore=RESCORE):
+        if dtype not in ("float16", "int8"):
+            raise ValueError(f"dtype must be float16 or int8, got {dtype}")
+        self.dtype = dtype
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.rescore = rescore
+        self.version = None
+        self.ids = np.array([], dtype=object)
+        self.codes = np.zeros((0, 0), dtype=np.int8)
+        self.scales = np.zeros(0, dtype=np.float32)
+        self.full = None
+        self.full_file = None
+        self.centroids = None
+        self.list_starts = None
+        self.trained_rows = 0
+        self.groups = {key: {} for key in GROUP_KEYS}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def memory_bytes(self):
+        """
+        RAM held by the searchable arrays (codes, scales, centroids). The
+        float32 rescoring copy is memory-mapped from disk and not counted.
+        """
+        total = self.codes.nbytes + self.scales.nbytes
+        if self.centroids is not None:
+            total += self.centroids.nbytes + self.list_starts.nbytes
+        return total
+
+    # ---------------- BUILD ----------------
+    def build(self, ids, vectors, metadatas, version=None, full_path=None, centroids=None):
+        """
+        Quantize normalized vectors, sort rows by IVF list and remember the
+        rows of every source / resume_id for filtered queries. The float32
+        copy is written to full_path (for rescoring) or kept in memory.
+        Given centroids are reused instead of training new ones.
+        """
+        matrix = normalize(vectors) if len(ids) else np.zeros((0, 0), dtype=np.float32)
+        order = np.arange(len(ids))
+        if self.n_lists and len(ids) >= self.n_lists:
+            if centroids is None:
+                centroids = kmeans(matrix, self.n_lists)
+                self.trained_rows = len(ids)
+            self.centroids = centroids
+            assign = np.argmax(matrix @ self.centroids.T, axis=1)
+            order = np.argsort(assign, kind="stable")
+            self.list_starts = np.searchsorted(assign[order], np.arange(self.n_lists + 1))
+        else:
+            self.centroids, self.list_starts = None, None
+
+        matrix = matrix[order]
+        self.ids = np.asarray(ids, dtype=object)[order]
+        self.codes, self.scales = quantize(matrix, self.dtype)
+        self.groups = {key: {} for key in GROUP_KEYS}
+        for row, i in enumerate(order):
+            meta = metadatas[i] or {}
+            for key in GROUP_KEYS:
+                if meta.get(key) is not None:
+                    self.groups[key].setdefault(meta[key], []).append(row)
+        self.groups = {key: {v: np.asarray(rows) for v, rows in g.items()} for key, g in self.groups.items()}
+
+        self.full, self.full_file = None, None
+        if self.rescore:
+            if full_path:
+                np.save(full_path, matrix)
+                self.full = np.load(full_path, mmap_mode="r")
+                self.full_file = os.path.basename(full_path)
+            else:
+                self.full = matrix
+        self.version = version
+        return self
+
+    def build_from_collection(self, collection, version=None, full_path=None, previous=None):
+        """
+        Page through the collection once and build from its embeddings. With
+        previous (an earlier index of the same collection) only the chunks it
+        lacks are read with their embeddings, the others are taken from it,
+        and so are its IVF centroids while the row count stays within
+        IVF_RETRAIN of the count they were trained on.
+        """
+        known = {chunk_id: row for row, chunk_id in enumerate(previous.ids)} if previous is not None else {}
+        include = ["metadatas"] if known else ["embeddings", "metadatas"]
+        ids, metadatas, fetched = [], [], {}
+        offset = 0
+        while True:
+            page = collection.get(include=include, limit=PAGE_SIZE, offset=offset)
+            if len(page["ids"]) == 0:
+                break
+            ids += page["ids"]
+            metadatas += page["metadatas"]
+            if not known:
+                fetched.update(zip(page["ids"], page["embeddings"]))
+            offset += len(page["ids"])
+        missing = [chunk_id for chunk_id in ids if chunk_id not in known and chunk_id not in fetched]
+        for start in range(0, len(missing), PAGE_SIZE):
+            page = collection.get(ids=missing[start:start + PAGE_SIZE], include=["embeddings"])
+            fetched.update(zip(page["ids"], page["embeddings"]))
+
+        # chunks deleted between the two reads are left out
+        reused = [i for i, chunk_id in enumerate(ids) if chunk_id in known]
+        fresh = [i for i, chunk_id in enumerate(ids) if chunk_id not in known and chunk_id in fetched]
+        blocks = []
+        if reused:
+            blocks.append(previous.vectors([known[ids[i]] for i in reused]))
+        if fresh:
+            blocks.append(np.asarray([fetched[ids[i]] for i in fresh], dtype=np.float32))
+        matrix = np.vstack(blocks) if blocks else np.zeros((0, 0), dtype=np.float32)
+        rows = reused + fresh
+
+        centroids = None
+        if previous is not None and previous.centroids is not None \
+                and abs(len(rows) - previous.trained_rows) <= IVF_RETRAIN * previous.trained_rows:
+            centroids = previous.centroids
+            self.trained_rows = previous.trained_rows
+        return self.build([ids[i] for i in rows], matrix, [metadatas[i] for i in rows], version=version,
+                          full_path=full_path, centroids=centroids)
+
+    def vectors(self, rows):
+        """Unit float32 vectors of some rows: the rescoring copy, else the dequantized codes."""
+        rows = np.asarray(rows, dtype=np.int64)
+        if self.full is not None:
+            return np.asarray(self.full[rows], dtype=np.float32)
+        return self.codes[rows].astype(np.float32) * self.scales[rows, None]
+
+    # ---------------- SEARCH ----------------
+    def _scores(self, rows, query):
+        # int8 codes are widened block by block, never the whole matrix at once
+        if rows is None:
+            out = np.empty(len(self.ids), dtype=np.float32)
+            for start in range(0, len(self.ids), 16384):
+                block = self.codes[start:start + 16384].astype(np.float32)
+                out[start:start + 16384] = block @ query
+            return out * self.scales
+        return (self.codes[rows].astype(np.float32) @ query) * self.scales[rows]
+
+    def _candidate_rows(self, query, where):
+        if where:
+            (key, value), = where.items()
+            if key not in GROUP_KEYS:
+                raise ValueError(f"Can only filter by one of {GROUP_KEYS}")
+            values = value["$in"] if isinstance(value, dict) else [value]
+            rows = [self.groups[key][v] for v in values if v in self.groups[key]]
+            return np.concatenate(rows) if rows else np.array([], dtype=np.int64)
+        if self.centroids is None:
+            return None
+        probe = np.argsort(-(self.centroids @ query))[:self.n_probe]
+        return np.concatenate([np.arange(self.list_starts[c], self.list_starts[c + 1]) for c in probe])
+
+    def search(self, query_embedding, k=10, where=None):
+        """Return up to k (chunk_id, cosine similarity) pairs, best first."""
+        if len(self.ids) == 0:
+            return []
+        query = normalize(query_embedding)
+        rows = self._candidate_rows(query, where)
+        scores = self._scores(rows, query)
+        if len(scores) == 0:
+            return []
+        if rows is None:
+            rows = np.arange(len(self.ids))
+
+        pool = min(len(scores), max(k, self.rescore if self.full is not None else k))
+        top = np.argpartition(-scores, pool - 1)[:pool]
+        rows, scores = rows[top], scores[top]
+        if self.full is not None:
+            # re-score the shortlist with the exact float32 vectors
+            sorted_rows = np.sort(rows)
+            exact = np.asarray(self.full[sorted_rows], dtype=np.float32) @ query
+            rows, scores = sorted_rows, exact
+        best = np.argsort(-scores)[:k]
+        return [(self.ids[r], float(s)) for r, s in zip(rows[best], scores[best])]
+
+    # ---------------- PERSISTENCE ----------------
+    def save(self, folder):
+        os.makedirs(folder, exist_ok=True)
+        tmp_path = os.path.join(folder, f"{self.dtype}.tmp.npz")
+        np.savez(
+            tmp_path,
+            ids=self.ids.astype(str), codes=self.codes, scales=self.scales,
+            centroids=self.centroids if self.centroids is not None else np.zeros((0, 0), dtype=np.float32),
+            list_starts=self.list_starts if self.list_starts is not None else np.zeros(0, dtype=np.int64),
+            version=np.array(-1 if self.version is None else self.version),
+            trained_rows=np.array(self.trained_rows),
+            full_file=np.array(self.full_file or ""),
+            group_keys=np.array([f"{key}\t{value}" for key, g in self.groups.items() for value in g]),
+            group_rows=np.concatenate([rows for g in self.groups.values() for rows in g.values()] or [np.zeros(0, dtype=np.int64)]),
+            group_sizes=np.array([len(rows) for g in self.groups.values() for rows in g.values()], dtype=np.int64),
+        )
+        os.replace(tmp_path, os.path.join(folder, f"{self.dtype}.npz"))
+
+    def load(self, folder):
+        """Load a saved index; returns False if there is none for this dtype."""
+        path = os.path.join(folder, f"{self.dtype}.npz")
+        if not os.path.exists(path):
+            return False
+        data = np.load(path)
+        self.ids = data["ids"].astype(object)
+        self.codes, self.scales = data["codes"], data["scales"]
+        self.centroids = data["centroids"] if len(data["centroids"]) else None
+        self.list_starts = data["list_starts"] if self.centroids is not None else None
+        version = int(data["version"])
+        self.version = None if version < 0 else version
+        self.trained_rows = int(data["trained_rows"]) if "trained_rows" in data.files else len(self.ids)
+        self.groups = {key: {} for key in GROUP_KEYS}
+        offsets = np.concatenate([[0], np.cumsum(data["group_sizes"])])
+        for i, entry in enumerate(data["group_keys"]):
+            key, value = str(entry).split("\t", 1)
+            self.groups[key][value] = data["group_rows"][offsets[i]:offsets[i + 1]]
+        self.full_file = str(data["full_file"]) if "full_file" in data.files else f"{self.dtype}_full_f32.npy"
+        full_path = os.path.join(folder, self.full_file) if self.full_file else ""
+        self.full = np.load(full_path, mmap_mode="r") if self.rescore and os.path.isfile(full_path) else None
+        self.full_file = self.full_file if self.full is not None else None
+        return True
+
+
+class CompactVectorStore:
+    """
+    Stands in for the Chroma collection on the query path: query() is
+    answered from a CompactIndex, get() and everything else go to the
+    collection. The first query builds the index inline. After that, when
+    version_fn() (the catalog version, bumped by every write) moves past
+    the version the index was built at, a background thread builds the next
+    index from the current one, reading only the new chunks from Chroma,
+    and swaps it in; queries keep using the previous index meanwhile.
+    Without version_fn the index is built once and kept.
+    """
+    # query() distances are squared L2 between normalized vectors
+    distance_space = "unit_l2"
+
+    def __init__(self, collection, folder, dtype="int8", version_fn=None,
+                 n_lists=IVF_LISTS, n_probe=IVF_PROBE, rescore=RESCORE):
+        self.collection = collection
+        self.folder = folder
+        self.version_fn = version_fn
+        self.settings = {"n_lists": n_lists, "n_probe": n_probe, "rescore": rescore}
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._worker = None
+        self.index = CompactIndex(dtype, **self.settings)
+        # a saved index is only trusted when there is a version to check it against
+        self._built = self.index.load(folder) and version_fn is not None
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+    def _build(self, version, previous=None):
+        os.makedirs(self.folder, exist_ok=True)
+        index = CompactIndex(self.index.dtype, **self.settings)
+        # a new file per build: the index being replaced may still be reading its own
+        full_path = os.path.join(self.folder, f"{index.dtype}_full_f32_{uuid.uuid4().hex[:8]}.npy")
+        index.build_from_collection(self.collection, version=version, full_path=full_path, previous=previous)
+        index.save(self.folder)
+        return index
+
+    def _swap(self, index):
+        old, self.index = self.index, index
+        if old.full_file and old.full_file != index.full_file:
+            try:
+                os.remove(os.path.join(self.folder, old.full_file))
+            except OSError:
+                pass    # still mapped (Windows), left for later
+
+    def _rebuild(self, version):
+        try:
+            index = self._build(version, previous=self.index)
+            with self._lock:
+                self._swap(index)
+        except Exception as e:
+            # keep serving the old index, the next query tries again
+            self.last_error = e
+        finally:
+            self._worker = None
+
+    def refresh(self):
+        version = self.version_fn() if self.version_fn else None
+        if self._built and (self._worker is not None or version == self.index.version):
+            return
+        with self._lock:
+            if not self._built:
+                # nothing to search yet: build now, other sessions wait for it
+                self._swap(self._build(version))
+                self._built = True
+            elif self._worker is None and version != self.index.version:
+                self._worker = threading.Thread(target=self._rebuild, args=(version,), daemon=True)
+                self._worker.start()
+
+    def wait(self):
+        """Block until a running background rebuild has been swapped in."""
+        worker = self._worker
+        if worker is not None:
+            worker.join()
+
+    def query(self, query_embeddings, n_results=10, where=None, **kwargs):
+        """collection.query() look-alike for one query embedding."""
+        self.refresh()
+        hits = self.index.search(query_embeddings[0], k=n_results, where=where)
+        ids = [chunk_id for chunk_id, _ in hits]
+        found = self.collection.get(ids=ids, include=["documents", "metadatas"]) if ids else {
+            "ids": [], "documents": [], "metadatas": []}
+        by_id = {chunk_id: (doc, meta) for chunk_id, doc, meta in
+                 zip(found["ids"], found["documents"], found["metadatas"])}
+        hits = [(chunk_id, score) for chunk_id, score in hits if chunk_id in by_id]
+        return {
+            "ids": [[chunk_id for chunk_id, _ in hits]],
+            "documents": [[by_id[chunk_id][0] for chunk_id, _ in hits]],
+            "metadatas": [[by_id[chunk_id][1] for chunk_id, _ in hits]],
+            # squared L2 between unit vectors, the same scale Chroma's default space uses
+            "distances": [[2.0 - 2.0 * score for _, score in hits]],
+        }
+
+
+def open_vector_store(collection, persist_dir, mode=VECTOR_STORE, version_fn=None):
+    """The collection itself for mode "chroma", else a CompactVectorStore over it."""
+    if mode not in STORE_MODES:
+        raise ValueError(f"VECTOR_STORE must be one of {STORE_MODES}, got {mode}")
+    if mode == "chroma":
+        return collection
+    return CompactVectorStore(collection, os.path.join(persist_dir, COMPACT_INDEX_DIR), dtype=mode,
+                              version_fn=version_fn)
@@ -0,0 +1,86 @@
+import os
+
+# ---------------- CONFIG ----------------
+# phi-3.1-mini-4k-instruct: prompt + answer must fit in 4096 tokens
+CONTEXT_WINDOW = int(os.getenv("LLM_CONTEXT_WINDOW", 4096))
+ANSWER_TOKENS = int(os.getenv("LLM_ANSWER_TOKENS", 700))
+# RecursiveCharacterTextSplitter(chunk_overlap=60) in the apps
+CHUNK_OVERLAP = 60
+
+# tiktoken is optional; its cl100k encoding is close enough to phi-3's
+# tokenizer for budgeting. Without it a conservative chars/3 estimate is used.
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+
+def count_tokens(text):
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return len(text) // 3 + 1
+
+
+def context_budget(prompt_without_context, context_window=CONTEXT_WINDOW, answer_tokens=ANSWER_TOKENS):
+    """Tokens left for resume text once the prompt template and the answer are accounted for."""
+    return max(0, context_window - answer_tokens - count_tokens(prompt_without_context))
+
+
+def chunks_from_query(results):
+    """
+    Turn a single-query collection.query() result into chunk dicts
+    {"text", "score", "chunk_id"} with score = 1 / (1 + distance).
+    """
+    docs = results["documents"][0] if results.get("documents") else []
+    metas = results["metadatas"][0] if results.get("metadatas") else [{}] * len(docs)
+    dists = results["distances"][0] if results.get("distances") else [0.0] * len(docs)
+    chunks = []
+    for i, (doc, meta, dist) in enumerate(zip(docs, metas, dists)):
+        chunk_id = (meta or {}).get("chunk_id", i)
+        chunks.append({"text": doc, "score": 1.0 / (1.0 + dist), "chunk_id": chunk_id})
+    return chunks
+
+
+def overlap_length(left, right, max_overlap=CHUNK_OVERLAP * 2, min_overlap=10):
+    """
+    Length of the longest suffix of left that is also a prefix of right.
+    Matches shorter than min_overlap are treated as coincidence.
+    """
+    limit = min(len(left), len(right), max_overlap)
+    for k in range(limit, min_overlap - 1, -1):
+        if left.endswith(right[:k]):
+            return k
+    return 0
+
+
+def pack_context(chunks, budget_tokens, separator="\n"):
+    """
+    Pick chunks by descending score until the token budget is used up,
+    skipping any chunk that does not fit, then return them in document
+    order (chunk_id) with the splitter overlap between neighbouring chunks
+    removed so the same text is not paid for twice.
+    """
+    picked = []
+    used = 0
+    sep_tokens = count_tokens(separator)
+    for chunk in sorted(chunks, key=lambda c: c["score"], reverse=True):
+        cost = count_tokens(chunk["text"]) + sep_tokens
+        if used + cost > budget_tokens:
+            continue
+        picked.append(chunk)
+        used += cost
+
+    picked.sort(key=lambda c: c["chunk_id"])
+    parts = []
+    prev = None
+    for chunk in picked:
+        text = chunk["text"]
+        if prev is not None and chunk["chunk_id"] == prev["chunk_id"] + 1:
+            text = text[overlap_length(prev["text"], text):]
+        if text.strip():
+            parts.append(text)
+        prev = chunk
+    return separator.join(parts)
@@ -0,0 +1,221 @@
+import os
+import re
+import sqlite3
+import hashlib
+import datetime
+import threading
+import numpy as np
+
+# ---------------- CONFIG ----------------
+DEDUP_INDEX_FILE = "dedup_index.sqlite"
+# skip: a near-duplicate of another resume is not embedded at all
+# flag: it is indexed, but shows up in the duplicate clusters
+# off:  no check
+DEDUP_MODE = os.getenv("DEDUP_MODE", "skip")
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", 0.85))
+NUM_PERM = 128
+BANDS = 16             # 16 bands x 8 rows: pairs above ~0.7 Jaccard almost always share a bucket
+SHINGLE_SIZE = 5
+_PRIME = (1 << 61) - 1
+_rng = np.random.default_rng(94443)
+_A = _rng.integers(1, 1 << 32, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 32, NUM_PERM, dtype=np.uint64)
+
+WORD_RE = re.compile(r"\w+")
+
+
+class DuplicateResume(Exception):
+    """Raised at ingest when a resume is a near-duplicate of one already indexed."""
+
+    def __init__(self, source, duplicate_of, similarity):
+        super().__init__(f"{source} is a near-duplicate of {duplicate_of} ({similarity:.0%} similar)")
+        self.source = source
+        self.duplicate_of = duplicate_of
+        self.similarity = similarity
+
+
+def shingle_hashes(text, k=SHINGLE_SIZE):
+    """32-bit hashes of the word k-shingles of a text."""
+    words = WORD_RE.findall(text.lower())
+    if len(words) < k:
+        grams = {" ".join(words)} if words else set()
+    else:
+        grams = {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=4).digest(), "little") for g in grams],
+        dtype=np.uint64
+    )
+
+
+def minhash_signature(text):
+    """NUM_PERM MinHash values (uint32); None if the text has no words."""
+    hashes = shingle_hashes(text)
+    if len(hashes) == 0:
+        return None
+    # (a * x + b) mod p for every permutation x shingle, min over shingles.
+    # a and x are both below 2^32, so a * x < 2^64 is exact in uint64; it is
+    # reduced mod p (< 2^61) before b is added, so the sum cannot wrap either
+    hashes = hashes & np.uint64(0xFFFFFFFF)
+    values = ((np.outer(_A, hashes) % np.uint64(_PRIME)) + _B[:, None]) % np.uint64(_PRIME)
+    return (values.min(axis=1) & 0xFFFFFFFF).astype(np.uint32)
+
+
+def estimated_jaccard(sig_a, sig_b):
+    return float(np.mean(sig_a == sig_b))
+
+
+def band_keys(signature):
+    rows = NUM_PERM // BANDS
+    return [hashlib.blake2b(signature[b * rows:(b + 1) * rows].tobytes(), digest_size=8).digest()
+            for b in range(BANDS)]
+
+
+class DuplicateIndex:
+    """
+    MinHash signatures of every indexed resume plus their LSH band buckets,
+    in SQLite. A lookup only reads the BANDS buckets of the new resume, so
+    the cost follows the number of look-alikes, not the corpus size.
+    Skipped duplicates are remembered as aliases of the resume they match.
+    """
+
+    def __init__(self, path, threshold=DEDUP_THRESHOLD):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS signatures (source TEXT PRIMARY KEY, signature BLOB NOT NULL)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS lsh_buckets (band INTEGER, bucket BLOB, source TEXT)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_lsh_bucket ON lsh_buckets(band, bucket)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_lsh_source ON lsh_buckets(source)")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS aliases (
+                    source TEXT PRIMARY KEY,
+                    duplicate_of TEXT NOT NULL,
+                    similarity REAL,
+                    seen_time TEXT
+                )
+            """)
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+
+    def _signature_of(self, source):
+        row = self.conn.execute("SELECT signature FROM signatures WHERE source = ?", (source,)).fetchone()
+        return np.frombuffer(row[0], dtype=np.uint32) if row else None
+
+    # ---------------- LOOKUP ----------------
+    def find(self, signature, exclude=None):
+        """[(source, similarity)] of indexed resumes at or above the threshold, best first."""
+        if signature is None:
+            return []
+        with self._lock:
+            candidates = set()
+            for band, key in enumerate(band_keys(signature)):
+                candidates.update(r[0] for r in self.conn.execute(
+                    "SELECT source FROM lsh_buckets WHERE band = ? AND bucket = ?", (band, key)))
+            candidates.discard(exclude)
+            matches = []
+            for source in candidates:
+                similarity = estimated_jaccard(signature, self._signature_of(source))
+                if similarity >= self.threshold:
+                    matches.append((source, similarity))
+        return sorted(matches, key=lambda m: m[1], reverse=True)
+
+    def check(self, source, text, mode=DEDUP_MODE):
+        """
+        Signature of text plus its near-duplicates among other resumes.
+        Raises DuplicateResume in "skip" mode. Nothing is recorded: an update
+        that keeps the old version is not a skip, so the caller adds the
+        alias only where the file is really left out.
+        """
+        if mode == "off":
+            return None, []
+        signature = minhash_signature(text)
+        matches = self.find(signature, exclude=source)
+        if matches and mode == "skip":
+            duplicate_of, similarity = matches[0]
+            raise DuplicateResume(source, duplicate_of, similarity)
+        return signature, matches
+
+    # ---------------- WRITES ----------------
+    def add(self, source, signature):
+        """Index (or re-index) the signature of an ingested resume."""
+        if signature is None:
+            return
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM lsh_buckets WHERE source = ?", (source,))
+            self.conn.execute("DELETE FROM aliases WHERE source = ?", (source,))
+            self.conn.execute("INSERT OR REPLACE INTO signatures (source, signature) VALUES (?, ?)",
+                              (source, signature.tobytes()))
+            self.conn.executemany("INSERT INTO lsh_buckets (band, bucket, source) VALUES (?, ?, ?)",
+                                  [(band, key, source) for band, key in enumerate(band_keys(signature))])
+
+    def add_alias(self, source, duplicate_of, similarity):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO aliases (source, duplicate_of, similarity, seen_time) VALUES (?, ?, ?, ?)",
+                (source, duplicate_of, similarity, datetime.datetime.now().isoformat(timespec="seconds")),
+            )
+
+    def remove(self, source):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM signatures WHERE source = ?", (source,))
+            self.conn.execute("DELETE FROM lsh_buckets WHERE source = ?", (source,))
+            self.conn.execute("DELETE FROM aliases WHERE source = ? OR duplicate_of = ?", (source, source))
+
+    def rebuild_from_collection(self, collection, key="source"):
+        """One-time backfill: one signature per resume from its stored chunks."""
+        data = collection.get(include=["documents", "metadatas"])
+        texts = {}
+        for doc, meta in sorted(zip(data["documents"], data["metadatas"]),
+                                key=lambda x: (str(x[1].get(key)), x[1].get("chunk_id", 0))):
+            if meta.get(key) is not None:
+                texts.setdefault(meta[key], []).append(doc)
+        for source, chunks in texts.items():
+            self.add(source, minhash_signature("\n".join(chunks)))
+        return len(texts)
+
+    # ---------------- CLUSTERS ----------------
+    def clusters(self):
+        """
+        Groups of near-duplicate resumes (size >= 2), each as a list of
+        (source, status) with status "indexed" or "skipped, duplicate of X".
+        """
+        parent = {}
+
+        def find(x):
+            parent.setdefault(x, x)
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        with self._lock:
+            buckets = self.conn.execute(
+                "SELECT GROUP_CONCAT(source, char(31)) FROM lsh_buckets "
+                "GROUP BY band, bucket HAVING COUNT(*) > 1"
+            ).fetchall()
+            pairs = set()
+            for (members,) in buckets:
+                members = sorted(set(members.split("\x1f")))
+                pairs.update((a, b) for i, a in enumerate(members) for b in members[i + 1:])
+            for a, b in pairs:
+                if estimated_jaccard(self._signature_of(a), self._signature_of(b)) >= self.threshold:
+                    parent[find(a)] = find(b)
+            aliases = self.conn.execute("SELECT source, duplicate_of FROM aliases").fetchall()
+
+        status = {}
+        for source, duplicate_of in aliases:
+            parent[find(source)] = find(duplicate_of)
+            status[source] = f"skipped, duplicate of {duplicate_of}"
+        groups = {}
+        for x in list(parent):
+            groups.setdefault(find(x), []).append(x)
+        return [
+            [(source, status.get(source, "indexed")) for source in sorted(members)]
+            for members in groups.values() if len(members) > 1
+        ]
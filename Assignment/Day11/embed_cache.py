@@ -0,0 +1,227 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from array import array
+from langchain_core.embeddings import Embeddings
+
+# ---------------- CONFIG ----------------
+# override with EMBED_CACHE_PATH / EMBED_CACHE_MAX_ENTRIES
+DEFAULT_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "./Resume_base/embed_cache.sqlite")
+DEFAULT_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", 200_000))
+# in-process LRU for query embeddings, QUERY_CACHE_SIZE=<n>
+DEFAULT_QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", 1024))
+# PERSIST_QUERY_EMBEDDINGS=1 also keeps query vectors in the SQLite cache
+DEFAULT_PERSIST_QUERIES = os.getenv("PERSIST_QUERY_EMBEDDINGS", "0") == "1"
+
+# sqlite's default limit on "?" parameters per statement is 999
+LOOKUP_BATCH = 500
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def normalize_query(text):
+    """Lower-case and collapse whitespace so near-identical queries share an entry."""
+    return " ".join(text.lower().split())
+
+
+class QueryEmbeddingCache:
+    """
+    Thread-safe LRU of query embeddings keyed by (model name, normalized
+    query text). One process-wide cache serves every embedding model, so a
+    second model (another app, a benchmark run) gets its own entries
+    instead of wiping the first one's.
+    """
+
+    def __init__(self, maxsize=DEFAULT_QUERY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, model_name, text):
+        key = (model_name, normalize_query(text))
+        with self._lock:
+            vector = self.entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, model_name, text, vector):
+        key = (model_name, normalize_query(text))
+        with self._lock:
+            self.entries[key] = vector
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def stats_text(self):
+        s = self.stats()
+        return f"Query cache: {s['hit_rate']:.0%} hit rate ({s['hits']}/{s['hits'] + s['misses']}), {s['size']} entries"
+
+
+# one cache per process, so it survives Streamlit reruns that rebuild the models
+QUERY_CACHE = QueryEmbeddingCache()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Persistent embedding cache in front of an embeddings model.
+    Vectors are stored in SQLite keyed by (model name, sha256(text)), looked
+    up in batches, and only the misses are sent to the wrapped model. When the
+    cache grows past max_entries the least recently used rows are evicted.
+    Query embeddings go through the in-process QUERY_CACHE first; with
+    persist_queries=True they are also kept in SQLite under "query:<model>".
+    """
+
+    def __init__(self, embed_model, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES, model_name=None,
+                 query_cache=QUERY_CACHE, persist_queries=DEFAULT_PERSIST_QUERIES):
+        self.embed_model = embed_model
+        self.query_cache = query_cache
+        self.persist_queries = persist_queries
+        self.model_name = model_name or getattr(embed_model, "model", None) or "default"
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # stats of the last call per thread: the instance is shared by every session
+        self._local = threading.local()
+
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+        self.conn.commit()
+
+    @property
+    def model(self):
+        return self.model_name
+
+    @property
+    def last_stats(self):
+        return getattr(self._local, "stats", None) or {"hits": 0, "misses": 0, "embed": None}
+
+    # ---------------- STORE ----------------
+    def _lookup(self, hashes, model_name=None):
+        """Return {hash: vector} for the hashes already in the cache."""
+        model_name = model_name or self.model_name
+        found = {}
+        with self._lock:
+            for i in range(0, len(hashes), LOOKUP_BATCH):
+                part = hashes[i:i + LOOKUP_BATCH]
+                marks = ",".join("?" * len(part))
+                rows = self.conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({marks})",
+                    [model_name, *part],
+                ).fetchall()
+                for h, blob in rows:
+                    found[h] = array("f", blob).tolist()
+            if found:
+                now = time.time()
+                self.conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model_name, h) for h in found],
+                )
+                self.conn.commit()
+        return found
+
+    def _store(self, items, model_name=None):
+        """Insert (hash, vector) pairs and evict the oldest rows past max_entries."""
+        model_name = model_name or self.model_name
+        now = time.time()
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                [(model_name, h, array("f", v).tobytes(), now) for h, v in items],
+            )
+            count = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if count > self.max_entries:
+                self.conn.execute(
+                    "DELETE FROM embeddings WHERE rowid IN "
+                    "(SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self.conn.commit()
+
+    # ---------------- EMBEDDINGS API ----------------
+    def embed_documents_with_stats(self, texts):
+        """(vectors, stats): cache hits and misses of this call, plus the wrapped model's stats under "embed"."""
+        texts = list(texts)
+        hashes = [text_hash(t) for t in texts]
+        found = self._lookup(list(set(hashes)))
+
+        # embed each missing text once, even if it repeats in the batch
+        missing = {}
+        for h, t in zip(hashes, texts):
+            if h not in found and h not in missing:
+                missing[h] = t
+        embed_stats = None
+        if missing:
+            if hasattr(self.embed_model, "embed_documents_with_stats"):
+                vectors, embed_stats = self.embed_model.embed_documents_with_stats(list(missing.values()))
+            else:
+                vectors = self.embed_model.embed_documents(list(missing.values()))
+            new_items = list(zip(missing.keys(), vectors))
+            self._store(new_items)
+            found.update(new_items)
+
+        stats = {"hits": len(texts) - len(missing), "misses": len(missing), "embed": embed_stats}
+        return [found[h] for h in hashes], stats
+
+    def embed_documents(self, texts):
+        vectors, self._local.stats = self.embed_documents_with_stats(texts)
+        return vectors
+
+    def embed_query(self, text):
+        vector = self.query_cache.get(self.model_name, text)
+        if vector is not None:
+            return vector
+
+        query_model = f"query:{self.model_name}"
+        h = text_hash(normalize_query(text))
+        if self.persist_queries:
+            vector = self._lookup([h], model_name=query_model).get(h)
+        if vector is None:
+            vector = self.embed_model.embed_query(text)
+            if self.persist_queries:
+                self._store([(h, vector)], model_name=query_model)
+        self.query_cache.put(self.model_name, text, vector)
+        return vector
+
+    def throughput_text(self, stats=None):
+        s = stats or self.last_stats
+        text = f"Embedding cache: {s['hits']} hits, {s['misses']} misses"
+        if s["embed"] and hasattr(self.embed_model, "throughput_text"):
+            text += " | " + self.embed_model.throughput_text(s["embed"])
+        return text
@@ -0,0 +1,122 @@
+import os
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.embeddings import Embeddings
+
+# ---------------- CONFIG ----------------
+# override with EMBED_BATCH_SIZE / EMBED_MAX_IN_FLIGHT / EMBED_MAX_RETRIES
+DEFAULT_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 32))
+DEFAULT_MAX_IN_FLIGHT = int(os.getenv("EMBED_MAX_IN_FLIGHT", 4))
+DEFAULT_MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", 3))
+
+# errors worth retrying: the server is busy, restarting or the request timed out
+try:
+    import openai
+    TRANSIENT_ERRORS = (
+        openai.APIConnectionError,
+        openai.APITimeoutError,
+        openai.RateLimitError,
+        openai.InternalServerError,
+        ConnectionError,
+        TimeoutError,
+    )
+except ImportError:
+    TRANSIENT_ERRORS = (ConnectionError, TimeoutError)
+
+
+def empty_stats():
+    return {"chunks": 0, "batches": 0, "retries": 0, "seconds": 0.0, "chunks_per_sec": 0.0}
+
+
+class BatchedEmbeddings(Embeddings):
+    """
+    Wraps an embeddings model (e.g. the one from init_embeddings) so that
+    embed_documents() sends micro-batches of batch_size texts, keeps up to
+    max_in_flight requests running at once, and retries transient failures
+    with exponential backoff. One instance is shared by every session, so
+    call stats are not instance state: embed_documents_with_stats() returns
+    them, and last_stats is the last call of the current thread (one
+    Streamlit script run).
+    """
+
+    def __init__(self, embed_model, batch_size=DEFAULT_BATCH_SIZE,
+                 max_in_flight=DEFAULT_MAX_IN_FLIGHT, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff=0.5):
+        self.embed_model = embed_model
+        self.batch_size = max(1, batch_size)
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # seconds per embedding request (one micro-batch), for latency percentiles
+        self.latencies = deque(maxlen=100_000)
+
+    @property
+    def model(self):
+        return getattr(self.embed_model, "model", None)
+
+    @property
+    def last_stats(self):
+        return getattr(self._local, "stats", None) or empty_stats()
+
+    def _with_retry(self, fn, arg, stats=None):
+        for attempt in range(self.max_retries + 1):
+            try:
+                start = time.perf_counter()
+                result = fn(arg)
+                with self._lock:
+                    self.latencies.append(time.perf_counter() - start)
+                return result
+            except TRANSIENT_ERRORS:
+                if attempt == self.max_retries:
+                    raise
+                if stats is not None:
+                    with self._lock:
+                        stats["retries"] += 1
+                # exponential backoff with a little jitter
+                time.sleep(self.backoff * (2 ** attempt) * (1 + random.random() / 2))
+
+    def embed_documents_with_stats(self, texts):
+        """(vectors, stats) where stats are the chunks, batches, retries and seconds of this call."""
+        texts = list(texts)
+        stats = empty_stats()
+        if not texts:
+            return [], stats
+        start = time.perf_counter()
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+
+        def embed(batch):
+            return self._with_retry(self.embed_model.embed_documents, batch, stats)
+
+        if len(batches) == 1 or self.max_in_flight == 1:
+            results = [embed(b) for b in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_in_flight, len(batches))) as pool:
+                # map keeps the batch order, so vectors line up with texts
+                results = list(pool.map(embed, batches))
+
+        vectors = [v for batch in results for v in batch]
+        seconds = time.perf_counter() - start
+        stats.update({
+            "chunks": len(texts),
+            "batches": len(batches),
+            "seconds": seconds,
+            "chunks_per_sec": len(texts) / seconds if seconds > 0 else 0.0,
+        })
+        return vectors, stats
+
+    def embed_documents(self, texts):
+        vectors, self._local.stats = self.embed_documents_with_stats(texts)
+        return vectors
+
+    def embed_query(self, text):
+        return self._with_retry(self.embed_model.embed_query, text)
+
+    def throughput_text(self, stats=None):
+        s = stats or self.last_stats
+        return (f"Embedded {s['chunks']} chunks in {s['batches']} batches, "
+                f"{s['seconds']:.2f}s ({s['chunks_per_sec']:.1f} chunks/s, {s['retries']} retries)")
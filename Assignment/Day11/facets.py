@@ -0,0 +1,329 @@
+import re
+
+# ---------------- SKILL / LOCATION VOCABULARY ----------------
+# canonical name -> spellings found in resumes and job descriptions
+SKILLS = {
+    "python": ["python"],
+    "java": ["java", "core java", "j2ee"],
+    "javascript": ["javascript", "java script", "js", "es6"],
+    "typescript": ["typescript"],
+    "c++": ["c++", "cpp"],
+    "c#": ["c#", "c sharp"],
+    "go": ["golang"],
+    "sql": ["sql", "t-sql", "pl/sql"],
+    "mysql": ["mysql"],
+    "postgresql": ["postgresql", "postgres"],
+    "mongodb": ["mongodb", "mongo"],
+    "react": ["react", "reactjs", "react.js"],
+    "angular": ["angular", "angularjs"],
+    "node.js": ["node", "nodejs", "node.js"],
+    "spring": ["spring", "spring boot", "springboot"],
+    "django": ["django"],
+    "flask": ["flask"],
+    "fastapi": ["fastapi"],
+    "html": ["html", "html5"],
+    "css": ["css", "css3"],
+    "aws": ["aws", "amazon web services"],
+    "azure": ["azure"],
+    "gcp": ["gcp", "google cloud"],
+    "docker": ["docker"],
+    "kubernetes": ["kubernetes", "k8s"],
+    "linux": ["linux"],
+    "git": ["git", "github", "gitlab"],
+    "machine learning": ["machine learning", "ml"],
+    "deep learning": ["deep learning"],
+    "nlp": ["nlp", "natural language processing"],
+    "tensorflow": ["tensorflow"],
+    "pytorch": ["pytorch"],
+    "pandas": ["pandas"],
+    "spark": ["spark", "pyspark"],
+    "power bi": ["power bi", "powerbi"],
+    "tableau": ["tableau"],
+    "excel": ["excel"],
+    "langchain": ["langchain"],
+}
+
+LOCATIONS = {
+    "pune": ["pune"],
+    "mumbai": ["mumbai", "bombay"],
+    "bangalore": ["bangalore", "bengaluru"],
+    "hyderabad": ["hyderabad"],
+    "chennai": ["chennai"],
+    "delhi": ["delhi", "new delhi"],
+    "noida": ["noida"],
+    "gurgaon": ["gurgaon", "gurugram"],
+    "kolkata": ["kolkata"],
+    "ahmedabad": ["ahmedabad"],
+    "nagpur": ["nagpur"],
+    "remote": ["remote"],
+}
+
+
+def _term_regex(spellings):
+    # "java" must not match "javascript", "c" must not eat "c++"
+    alternatives = "|".join(re.escape(s).replace(r"\ ", r"\s+") for s in sorted(spellings, key=len, reverse=True))
+    return re.compile(rf"(?<![\w+#.])(?:{alternatives})(?![\w+#])", re.IGNORECASE)
+
+
+_SKILL_RES = {skill: _term_regex(spellings) for skill, spellings in SKILLS.items()}
+_LOCATION_RES = {city: _term_regex(spellings) for city, spellings in LOCATIONS.items()}
+YEARS_RE = re.compile(r"(\d{1,2})(?:\.\d+)?\s*\+?\s*(?:years?|yrs?)\b", re.IGNORECASE)
+MAX_YEARS = 45
+# chunk metadata value for "no years figure found": a where filter cannot
+# test for a missing key, so unknown experience is stored explicitly
+UNKNOWN_YEARS = -1
+
+
+# ---------------- INGEST ----------------
+def extract_skills(text):
+    return sorted(skill for skill, pattern in _SKILL_RES.items() if pattern.search(text))
+
+
+def extract_years(text):
+    """Largest plausible "N years" figure in the text, or None."""
+    years = [int(m.group(1)) for m in YEARS_RE.finditer(text)]
+    years = [y for y in years if y <= MAX_YEARS]
+    return max(years) if years else None
+
+
+def extract_location(text):
+    """The city mentioned first (resumes put the address in the header)."""
+    found = [(m.start(), city) for city, pattern in _LOCATION_RES.items() for m in [pattern.search(text)] if m]
+    return min(found)[1] if found else None
+
+
+def resume_facets(text, profile=None):
+    """{"skills": [...], "years_exp": int or None, "location": str or None}."""
+    facets = {"skills": extract_skills(text), "years_exp": extract_years(text), "location": extract_location(text)}
+    return merge_profile_facets(facets, profile) if profile else facets
+
+
+def merge_profile_facets(facets, profile):
+    """An extracted profile adds its skills and wins for total experience."""
+    merged = dict(facets)
+    merged["skills"] = sorted(set(facets["skills"]) | set(extract_skills(profile.get("primary_skills", ""))))
+    profile_years = extract_years(profile.get("total_experience", ""))
+    if profile_years is not None:
+        merged["years_exp"] = profile_years
+    return merged
+
+
+def facet_metadata(facets):
+    """
+    Flat chunk metadata for Chroma where filters (no list values):
+    skill_<name>: True, years_exp: int (UNKNOWN_YEARS if unsaid), location: str.
+    """
+    meta = {f"skill_{skill}": True for skill in facets["skills"]}
+    meta["years_exp"] = UNKNOWN_YEARS if facets["years_exp"] is None else facets["years_exp"]
+    if facets["location"]:
+        meta["location"] = facets["location"]
+    return meta
+
+
+# ---------------- QUERY ----------------
+# Only skills the query marks as required are hard filters ("must have
+# Python", "Django is mandatory"); skills it merely mentions are left to
+# the similarity search. "X or Y" / "X/Y" in a required clause means any
+# one of them. Years of experience and the city are hard filters only in
+# a required clause too ("must be based in Pune", "5+ years required").
+REQUIRED_RE = re.compile(
+    r"\b(?:must(?:\s+(?:have|know|be))?|required|requires?|mandatory|essential|needs?\s+to\s+know)\b",
+    re.IGNORECASE
+)
+CLAUSE_RE = re.compile(r"[;!?\n]+|\.(?=\s|$)")    # not the dot of "node.js"
+# text between two skill mentions that keeps them in one list; "and" starts a new one
+LIST_GAP_RE = re.compile(r"^\s*(?:,|/|,?\s*\bor\b)\s*$", re.IGNORECASE)
+ANY_OF_RE = re.compile(r"/|\bor\b", re.IGNORECASE)
+TRAILING_OR_RE = re.compile(r"^\s*,?\s*(?:/|or\b)", re.IGNORECASE)
+
+YEARS_RANGE_RE = re.compile(r"(\d{1,2})\s*(?:-|–|to)\s*(\d{1,2})\s*(?:years?|yrs?)\b", re.IGNORECASE)
+# words right before "N years" that turn it into an upper bound or a strict bound
+BELOW_RE = re.compile(r"(?:under|less\s+than|below|fewer\s+than|<)\s*$", re.IGNORECASE)
+AT_MOST_RE = re.compile(r"(?:at\s+most|up\s+to|no\s+more\s+than|not\s+more\s+than|max(?:imum)?(?:\s+of)?|<=)\s*$",
+                        re.IGNORECASE)
+ABOVE_RE = re.compile(r"(?:more\s+than|over|above|greater\s+than|>)\s*$", re.IGNORECASE)
+
+
+def _skill_mentions(text):
+    """(start, end, skill) of every known skill in text, in order."""
+    found = [(m.start(), m.end(), skill) for skill, pattern in _SKILL_RES.items() for m in pattern.finditer(text)]
+    return sorted(found)
+
+
+def _required_scope(clause):
+    """The part of a clause a "must" / "required" marker applies to, or None."""
+    marker = REQUIRED_RE.search(clause)
+    if not marker:
+        return None
+    after = clause[marker.end():]
+    if _skill_mentions(after):
+        return after
+    # "Python and Django are mandatory": the list before the marker
+    return clause[:marker.start()]
+
+
+def required_clauses(query):
+    """The clauses of a query that carry a "must" / "required" marker."""
+    return [clause for clause in CLAUSE_RE.split(query) if REQUIRED_RE.search(clause)]
+
+
+def required_skills(query):
+    """
+    Skills a query requires, as (all_of, any_of): every skill in all_of
+    must be present, each group in any_of needs one of its skills.
+    """
+    all_of, any_of = set(), []
+    for clause in CLAUSE_RE.split(query):
+        scope = _required_scope(clause)
+        if not scope:
+            continue
+        # runs of mentions joined by "," / "/" / "or", with the joining text and the text after
+        lists, last_end = [], 0
+        for start, end, skill in _skill_mentions(scope):
+            gap = scope[last_end:start]
+            if lists and LIST_GAP_RE.match(gap):
+                lists[-1]["skills"].append(skill)
+                lists[-1]["joins"].append(gap)
+            else:
+                if lists:
+                    lists[-1]["after"] = gap
+                lists.append({"skills": [skill], "joins": [], "after": ""})
+            last_end = end
+        if lists:
+            lists[-1]["after"] = scope[last_end:]
+        for run in lists:
+            skills = sorted(set(run["skills"]))
+            if TRAILING_OR_RE.match(run["after"]):
+                # "Python, Java or Go": a choice that includes a term we do not know, so no filter
+                continue
+            if len(skills) > 1 and any(ANY_OF_RE.search(gap) for gap in run["joins"]):
+                any_of.append(skills)
+            else:
+                all_of.update(skills)
+    groups = []
+    for group in any_of:
+        # a group with a skill that is required anyway adds nothing
+        if group not in groups and not all_of & set(group):
+            groups.append(group)
+    return sorted(all_of), groups
+
+
+def years_bounds(query):
+    """
+    (min_years, max_years) from "N+ years", "at least N", "under N years",
+    "at most N years", "more than N years" and "N-M years"; None if unsaid.
+    """
+    lows, highs = [], []
+    for m in YEARS_RANGE_RE.finditer(query):
+        low, high = sorted((int(m.group(1)), int(m.group(2))))
+        lows.append(low)
+        highs.append(high)
+    rest = YEARS_RANGE_RE.sub(" ", query)
+    for m in YEARS_RE.finditer(rest):
+        n = int(m.group(1))
+        before = rest[max(0, m.start() - 20):m.start()]
+        if BELOW_RE.search(before):
+            highs.append(n - 1)
+        elif AT_MOST_RE.search(before):
+            highs.append(n)
+        elif ABOVE_RE.search(before):
+            lows.append(n + 1)
+        else:
+            lows.append(n)
+    return (max(lows) if lows else None), (min(highs) if highs else None)
+
+
+def query_constraints(query):
+    """
+    Hard constraints named in the required clauses of a query: skills,
+    alternatives among them, the years of experience bounds and a city.
+    Returns {"skills", "any_skills", "min_years", "max_years", "location"}.
+    """
+    skills, any_skills = required_skills(query)
+    required = "\n".join(required_clauses(query))
+    min_years, max_years = years_bounds(required)
+    return {
+        "skills": skills,
+        "any_skills": any_skills,
+        "min_years": min_years,
+        "max_years": max_years,
+        "location": extract_location(required),
+    }
+
+
+def has_constraints(constraints):
+    return bool(constraints["skills"] or constraints["any_skills"] or constraints["min_years"]
+                or constraints["max_years"] is not None or constraints["location"])
+
+
+def constraints_where(constraints):
+    """
+    Chroma where clause over facet_metadata() keys, or None. Unknown
+    experience (UNKNOWN_YEARS) passes the years bounds.
+    """
+    clauses = [{f"skill_{skill}": True} for skill in constraints["skills"]]
+    for group in constraints["any_skills"]:
+        clauses.append({"$or": [{f"skill_{skill}": True} for skill in group]})
+    if constraints["min_years"]:
+        clauses.append({"$or": [{"years_exp": {"$gte": constraints["min_years"]}},
+                                {"years_exp": UNKNOWN_YEARS}]})
+    if constraints["max_years"] is not None:
+        # UNKNOWN_YEARS is below any upper bound
+        clauses.append({"years_exp": {"$lte": constraints["max_years"]}})
+    if constraints["location"]:
+        clauses.append({"location": constraints["location"]})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def constraints_text(constraints):
+    parts = list(constraints["skills"])
+    parts += [" or ".join(group) for group in constraints["any_skills"]]
+    low, high = constraints["min_years"], constraints["max_years"]
+    if low and high is not None:
+        parts.append(f"{low}-{high} years")
+    elif low:
+        parts.append(f"{low}+ years")
+    elif high is not None:
+        parts.append(f"at most {high} year{'' if high == 1 else 's'}")
+    if constraints["location"]:
+        parts.append(constraints["location"])
+    return ", ".join(parts)
+
+
+def prefilter_sources(catalog, query):
+    """
+    Resumes a query may return, from the catalog facets, as (sources, note).
+    sources is None when nothing needs filtering: no hard constraints, every
+    resume qualifies, or none does (then the search is not narrowed and the
+    note says so, so the user still gets the closest resume).
+    """
+    constraints = query_constraints(query)
+    allowed = catalog.filter_sources(constraints)
+    if allowed is None:
+        return None, ""
+    wanted = constraints_text(constraints)
+    if not allowed:
+        return None, f"No resume meets all of: {wanted}. Showing the closest matches."
+    if len(allowed) >= len(catalog):
+        return None, ""
+    return allowed, f"Pre-filtered to {len(allowed)} of {len(catalog)} resumes ({wanted})"
+
+
+# ---------------- BACKFILL ----------------
+def backfill_chunk_facets(collection, key):
+    """
+    Facet metadata for chunks stored before facets existed (no years_exp
+    key), rebuilt per resume (metadata key) from its chunks. Without it a
+    where filter silently drops those resumes. Returns the resumes updated.
+    """
+    data = collection.get(include=["metadatas"])
+    stale = {meta[key] for meta in data["metadatas"] if meta.get(key) is not None and "years_exp" not in meta}
+    for value in stale:
+        rows = collection.get(where={key: value}, include=["documents", "metadatas"])
+        chunks = sorted(zip(rows["ids"], rows["metadatas"], rows["documents"]), key=lambda c: c[1].get("chunk_id", 0))
+        facets = facet_metadata(resume_facets("\n".join(doc for _, _, doc in chunks)))
+        collection.update(ids=[chunk_id for chunk_id, _, _ in chunks],
+                          metadatas=[{**meta, **facets} for _, meta, _ in chunks])
+    return len(stale)
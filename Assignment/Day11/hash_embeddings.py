@@ -0,0 +1,45 @@
+import re
+import hashlib
+import numpy as np
+
+# ---------------- CONFIG ----------------
+# deterministic offline stand-in for nomic-embed-text: same text -> same
+# vector in every process, and texts sharing words land close together
+HASH_DIM = 768
+WORD_RE = re.compile(r"[\w+#.]+")
+
+
+def _features(text):
+    words = [w.strip(".") for w in WORD_RE.findall(text.lower())]
+    words = [w for w in words if w]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def hash_vector(text, dim=HASH_DIM):
+    """
+    Signed feature hashing of word unigrams and bigrams, L2 normalized
+    (float32). Cosine similarity then tracks shared vocabulary.
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature in _features(text):
+        digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        vector[digest % dim] += 1.0 if (digest >> 63) else -1.0
+    norm = np.linalg.norm(vector)
+    if norm == 0:
+        # empty text still gets a fixed unit vector, Chroma rejects zero vectors
+        vector[0] = 1.0
+        return vector
+    return vector / norm
+
+
+class HashEmbeddings:
+    """embed_documents / embed_query interface over hash_vector()."""
+
+    def __init__(self, dim=HASH_DIM):
+        self.dim = dim
+
+    def embed_documents(self, texts):
+        return [hash_vector(t, self.dim).tolist() for t in texts]
+
+    def embed_query(self, text):
+        return hash_vector(text, self.dim).tolist()
@@ -0,0 +1,144 @@
+import queue
+import threading
+
+# ---------------- PIPELINED INGESTION ----------------
+# parse -> split -> embed -> store, each stage on its own thread(s), joined by
+# bounded queues. While file N is being embedded, file N+1 is already parsing,
+# and the store stage collects several files into one Chroma write.
+#
+# Every item is a dict that flows through the stages:
+#   {"name": ..., "data": ..., ...stage outputs..., "error": None}
+# A stage that raises marks the item with its error; later stages skip it,
+# so one bad file never stops the batch.
+#
+# The stage threads never touch Streamlit. The UI polls pipeline.counts.
+
+STAGES = ("parse", "split", "embed", "store")
+_DONE = object()
+
+
+class IngestPipeline:
+
+    def __init__(self, parse_fn, split_fn, embed_fn, store_fn,
+                 queue_size=4, parse_workers=2, store_batch_chunks=256):
+        """
+        parse_fn(item) -> parsed docs, split_fn(item) -> chunks,
+        embed_fn(item) -> embeddings, each stored under item[<stage>].
+        store_fn(items) writes a batch of embedded items in one go.
+        """
+        self.fns = {"parse": parse_fn, "split": split_fn, "embed": embed_fn}
+        self.store_fn = store_fn
+        self.parse_workers = max(1, parse_workers)
+        self.store_batch_chunks = store_batch_chunks
+        # input queue of each stage after parse
+        self.queues = {stage: queue.Queue(maxsize=queue_size) for stage in STAGES[1:]}
+        self.counts = {stage: 0 for stage in STAGES}
+        self.total = 0
+        self.results = []
+        self.errors = []
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def _bump(self, stage):
+        with self._lock:
+            self.counts[stage] += 1
+
+    def _fail(self, item, stage, error):
+        item["error"] = f"{stage}: {error}"
+        with self._lock:
+            self.errors.append((item["name"], item["error"]))
+
+    def _run_stage(self, stage, inbox, outbox, n_upstream=1):
+        finished = 0
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                finished += 1
+                if finished == n_upstream:
+                    outbox.put(_DONE)
+                    return
+                continue
+            if item.get("error") is None:
+                try:
+                    item[stage] = self.fns[stage](item)
+                except Exception as e:
+                    self._fail(item, stage, e)
+            self._bump(stage)
+            outbox.put(item)
+
+    def _run_parse(self, jobs, outbox):
+        while True:
+            try:
+                item = jobs.get_nowait()
+            except queue.Empty:
+                outbox.put(_DONE)
+                return
+            try:
+                item["parse"] = self.fns["parse"](item)
+            except Exception as e:
+                self._fail(item, "parse", e)
+            self._bump("parse")
+            outbox.put(item)
+
+    def _flush(self, batch):
+        if not batch:
+            return
+        try:
+            self.store_fn(batch)
+            with self._lock:
+                self.results.extend(batch)
+        except Exception as e:
+            for item in batch:
+                self._fail(item, "store", e)
+        for _ in batch:
+            self._bump("store")
+
+    def _run_store(self, inbox):
+        batch, batch_chunks = [], 0
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                self._flush(batch)
+                return
+            if item.get("error") is not None:
+                self._bump("store")
+                continue
+            batch.append(item)
+            batch_chunks += len(item.get("split") or [])
+            if batch_chunks >= self.store_batch_chunks:
+                self._flush(batch)
+                batch, batch_chunks = [], 0
+
+    def start(self, items):
+        jobs = queue.Queue()
+        for item in items:
+            item.setdefault("error", None)
+            jobs.put(item)
+            self.total += 1
+
+        q = self.queues
+        self._threads = [
+            threading.Thread(target=self._run_parse, args=(jobs, q["split"]), daemon=True)
+            for _ in range(self.parse_workers)
+        ]
+        self._threads += [
+            threading.Thread(target=self._run_stage, args=("split", q["split"], q["embed"], self.parse_workers), daemon=True),
+            threading.Thread(target=self._run_stage, args=("embed", q["embed"], q["store"]), daemon=True),
+            threading.Thread(target=self._run_store, args=(q["store"],), daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+        return self
+
+    def is_alive(self):
+        return any(t.is_alive() for t in self._threads)
+
+    def join(self, timeout=None):
+        for t in self._threads:
+            t.join(timeout)
+        return self
+
+    def progress(self):
+        """{stage: fraction done} for progress bars."""
+        with self._lock:
+            return {stage: (self.counts[stage] / self.total if self.total else 1.0) for stage in STAGES}
@@ -0,0 +1,230 @@
+import os
+import re
+import sqlite3
+import threading
+import numpy as np
+
+# ---------------- CONFIG ----------------
+LEXICAL_INDEX_FILE = "lexical_index.sqlite"
+# metadata keys a resume can be deleted by (Day11/Day12 use source, Day7 resume_id)
+GROUP_KEYS = ("source", "resume_id")
+
+# keep "c++" and "c#" as single tokens
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+class LexicalIndex:
+    """
+    BM25 keyword index over the same chunks as the Chroma collection.
+    Built on SQLite FTS5 (an inverted index with bm25() ranking) so it is
+    persistent, incremental and safe to share between the apps. A side
+    table maps chunk ids and resume keys to FTS rowids, so deletes only
+    touch the rows of one resume.
+    """
+
+    def __init__(self, path):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS chunk_text USING fts5(text, tokenize=\"unicode61 tokenchars '+#'\")"
+            )
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS chunk_map (
+                    rowid INTEGER PRIMARY KEY,
+                    chunk_id TEXT UNIQUE NOT NULL,
+                    source TEXT,
+                    resume_id TEXT
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_chunk_map_source ON chunk_map(source)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_chunk_map_resume_id ON chunk_map(resume_id)")
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM chunk_map").fetchone()[0]
+
+    def _delete_rowids(self, rowids):
+        for i in range(0, len(rowids), 500):
+            part = rowids[i:i + 500]
+            marks = ",".join("?" * len(part))
+            self.conn.execute(f"DELETE FROM chunk_text WHERE rowid IN ({marks})", part)
+            self.conn.execute(f"DELETE FROM chunk_map WHERE rowid IN ({marks})", part)
+
+    # ---------------- WRITES ----------------
+    def add(self, ids, texts, metadatas):
+        """Index chunks; call next to collection.add() with the same arguments."""
+        with self._lock, self.conn:
+            # re-adding an id replaces the old text
+            existing = []
+            for i in range(0, len(ids), 500):
+                part = list(ids[i:i + 500])
+                marks = ",".join("?" * len(part))
+                existing += [r[0] for r in self.conn.execute(
+                    f"SELECT rowid FROM chunk_map WHERE chunk_id IN ({marks})", part)]
+            self._delete_rowids(existing)
+
+            for chunk_id, text, meta in zip(ids, texts, metadatas):
+                meta = meta or {}
+                cur = self.conn.execute(
+                    "INSERT INTO chunk_map (chunk_id, source, resume_id) VALUES (?, ?, ?)",
+                    (chunk_id, meta.get("source"), meta.get("resume_id")),
+                )
+                self.conn.execute("INSERT INTO chunk_text (rowid, text) VALUES (?, ?)", (cur.lastrowid, text))
+
+    def remove_ids(self, ids):
+        with self._lock, self.conn:
+            rowids = []
+            for i in range(0, len(ids), 500):
+                part = list(ids[i:i + 500])
+                marks = ",".join("?" * len(part))
+                rowids += [r[0] for r in self.conn.execute(
+                    f"SELECT rowid FROM chunk_map WHERE chunk_id IN ({marks})", part)]
+            self._delete_rowids(rowids)
+
+    def remove_where(self, key, value):
+        """Remove all chunks of one resume, e.g. remove_where("source", "a.pdf")."""
+        if key not in GROUP_KEYS:
+            raise ValueError(f"Can only remove by one of {GROUP_KEYS}")
+        with self._lock, self.conn:
+            rowids = [r[0] for r in self.conn.execute(f"SELECT rowid FROM chunk_map WHERE {key} = ?", (value,))]
+            self._delete_rowids(rowids)
+
+    def rebuild_from_collection(self, collection):
+        """One-time backfill from an existing collection."""
+        data = collection.get(include=["documents", "metadatas"])
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM chunk_text")
+            self.conn.execute("DELETE FROM chunk_map")
+        self.add(data["ids"], data["documents"], data["metadatas"])
+        return len(data["ids"])
+
+    # ---------------- SEARCH ----------------
+    def search(self, query, k=20, where=None, sources=None):
+        """
+        Return up to k (chunk_id, score) pairs, best first. score is the
+        negated FTS5 bm25() value, so higher is better. where may be a
+        single {"source": ...} or {"resume_id": ...} filter; sources a set
+        of allowed sources (the facet pre-filter).
+        """
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+        match = " OR ".join('"' + t.replace('"', '""') + '"' for t in terms)
+        sql = (
+            "SELECT m.chunk_id, bm25(chunk_text) AS rank FROM chunk_text "
+            "JOIN chunk_map m ON m.rowid = chunk_text.rowid WHERE chunk_text MATCH ?"
+        )
+        params = [match]
+        if where:
+            (key, value), = where.items()
+            if key not in GROUP_KEYS:
+                raise ValueError(f"Can only filter by one of {GROUP_KEYS}")
+            sql += f" AND m.{key} = ?"
+            params.append(value)
+        post_filter = None
+        if sources is not None:
+            if len(sources) <= 500:
+                sql += f" AND m.source IN ({','.join('?' * len(sources))})"
+                params += sorted(sources)
+            else:
+                # too many for one IN list, over-fetch and filter here
+                post_filter = sources
+                sql = sql.replace("SELECT m.chunk_id,", "SELECT m.chunk_id, m.source,")
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(k if post_filter is None else k * 10)
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        if post_filter is not None:
+            return [(chunk_id, -rank) for chunk_id, source, rank in rows if source in post_filter][:k]
+        return [(chunk_id, -rank) for chunk_id, rank in rows]
+
+
+# ---------------- HYBRID RETRIEVAL ----------------
+def rrf_fuse(rankings, rrf_k=60):
+    """Reciprocal rank fusion of several best-first id lists -> [(id, score)] best first."""
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores.items(), key=lambda x: x[1], reverse=True)
+
+
+def embedding_distances(query_embedding, vectors, space="l2"):
+    """
+    Distance of each stored vector to the query on the scale collection.query()
+    reports for that hnsw:space: squared L2, 1 - cosine or 1 - dot product.
+    "unit_l2" is squared L2 between normalized vectors (the compact store).
+    """
+    query = np.asarray(query_embedding, dtype=np.float32)
+    vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, len(query))
+    if space == "unit_l2":
+        query = query / (np.linalg.norm(query) + 1e-12)
+        vectors = vectors / (np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12)
+        space = "l2"
+    if space == "l2":
+        return ((vectors - query) ** 2).sum(axis=1).tolist()
+    if space == "cosine":
+        norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query) + 1e-12
+        return (1.0 - vectors @ query / norms).tolist()
+    if space == "ip":
+        return (1.0 - vectors @ query).tolist()
+    raise ValueError(f"Unknown distance space: {space}")
+
+
+def distance_space(collection):
+    # the compact store names its own scale, a Chroma collection keeps it in its metadata
+    return getattr(collection, "distance_space", None) or (collection.metadata or {}).get("hnsw:space", "l2")
+
+
+def hybrid_query(collection, lexical_index, query_embedding, query_text,
+                 n_results=20, vector_pool=10, lexical_pool=20, rrf_k=60, sources=None, where=None):
+    """
+    Vector hits from Chroma fused with BM25 hits via reciprocal rank fusion.
+    Returns a collection.query()-shaped result (ids, documents, metadatas,
+    distances) for the top n_results fused chunks, in fused order, so
+    rank_resumes() and the Day7 aggregation work unchanged. RRF only picks
+    and orders the chunks; distances stay real vector distances: Chroma's
+    own for vector hits, and for keyword-only hits the same distance
+    computed from their stored embeddings. So "max" / "sum_top_m" still
+    rank by similarity and "rrf" by the fused order.
+    sources (a set of resume sources) restricts both searches, so a facet
+    pre-filter shrinks the search space before any scoring. where is a
+    Chroma filter on chunk metadata; keyword hits that fail it are dropped.
+    """
+    if sources is not None:
+        source_where = {"source": {"$in": sorted(sources)}}
+        where = source_where if where is None else {"$and": [where, source_where]}
+    vector = collection.query(query_embeddings=[query_embedding], n_results=vector_pool, where=where)
+    vector_ids = vector["ids"][0]
+    lexical_ids = [chunk_id for chunk_id, _ in lexical_index.search(query_text, lexical_pool, sources=sources)]
+    fused = rrf_fuse([vector_ids, lexical_ids], rrf_k)[:n_results]
+
+    known = {
+        chunk_id: (doc, meta, dist)
+        for chunk_id, doc, meta, dist in zip(vector_ids, vector["documents"][0], vector["metadatas"][0],
+                                             vector["distances"][0])
+    }
+    missing = [chunk_id for chunk_id, _ in fused if chunk_id not in known]
+    if missing:
+        extra = collection.get(ids=missing, where=where, include=["documents", "metadatas", "embeddings"])
+        if len(extra["ids"]):
+            dists = embedding_distances(query_embedding, extra["embeddings"], distance_space(collection))
+            for chunk_id, doc, meta, dist in zip(extra["ids"], extra["documents"], extra["metadatas"], dists):
+                known[chunk_id] = (doc, meta, dist)
+
+    # ids the lexical index still knows but Chroma no longer has (or that fail where) are skipped
+    fused = [chunk_id for chunk_id, _ in fused if chunk_id in known]
+    return {
+        "ids": [fused],
+        "documents": [[known[chunk_id][0] for chunk_id in fused]],
+        "metadatas": [[known[chunk_id][1] for chunk_id in fused]],
+        "distances": [[known[chunk_id][2] for chunk_id in fused]],
+    }
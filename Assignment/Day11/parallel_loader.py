@@ -0,0 +1,129 @@
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pypdf import PdfReader
+from langchain_core.documents import Document
+from langchain_community.document_loaders import PyPDFLoader
+
+# ---------------- CONFIG ----------------
+# number of parser processes, override with PDF_WORKERS=<n>
+DEFAULT_WORKERS = int(os.getenv("PDF_WORKERS", os.cpu_count() or 1))
+
+
+def parse_pdf(path):
+    """Parse one PDF into LangChain Documents (runs inside a worker process)."""
+    return PyPDFLoader(path).load()
+
+
+def iter_parsed_pdfs(paths, workers=None):
+    """
+    Parse PDFs on a process pool and yield (path, docs, error) as soon as
+    each file finishes, so callers can split/embed while the rest is parsing.
+    A file that raises is reported with its error instead of aborting the batch.
+    If a worker process dies (e.g. a PDF crashes the parser) the unfinished
+    files are retried once on a fresh pool.
+    """
+    workers = workers or DEFAULT_WORKERS
+    paths = list(paths)
+
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            try:
+                yield path, parse_pdf(path), None
+            except Exception as e:
+                yield path, [], e
+        return
+
+    retried = set()
+    pending = paths
+    while pending:
+        retry = []
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+            futures = {pool.submit(parse_pdf, path): path for path in pending}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    docs = future.result()
+                except BrokenProcessPool as e:
+                    if path in retried:
+                        yield path, [], e
+                    else:
+                        retried.add(path)
+                        retry.append(path)
+                    continue
+                except Exception as e:
+                    yield path, [], e
+                    continue
+                yield path, docs, None
+        pending = retry
+
+
+# ---------------- IN-MEMORY PDFS ----------------
+class MemoryviewStream(io.RawIOBase):
+    """
+    Read-only, seekable file object over a memoryview (e.g. the one from
+    uploaded_file.getbuffer()). Only the ranges pypdf actually reads are
+    copied; the upload itself is never duplicated.
+    """
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast("B")
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = len(self._view) + offset
+        self._pos = max(0, self._pos)
+        return self._pos
+
+    def readinto(self, b):
+        n = max(0, min(len(b), len(self._view) - self._pos))
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+
+def load_pdf_bytes(buffer, source_name):
+    """
+    Parse PDF bytes / a memoryview without a temp file. Returns one Document
+    per page with the same "source"/"page" metadata PyPDFLoader sets.
+    """
+    reader = PdfReader(MemoryviewStream(buffer))
+    return [
+        Document(page_content=page.extract_text() or "", metadata={"source": source_name, "page": i})
+        for i, page in enumerate(reader.pages)
+    ]
+
+
+# one background writer, keeps the original uploads off the request path
+_persist_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persist-upload")
+
+
+def _write_file(buffer, path):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp_path = path + ".part"
+    with open(tmp_path, "wb") as f:
+        f.write(buffer)
+    os.replace(tmp_path, path)
+    return path
+
+
+def persist_in_background(buffer, path):
+    """Write the original upload to disk on a background thread; returns a Future."""
+    return _persist_pool.submit(_write_file, buffer, path)
@@ -0,0 +1,137 @@
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from context_packer import count_tokens, context_budget
+
+# ---------------- CONFIG ----------------
+# extract the profile right after a resume is stored (set 0 to leave it to the backlog job)
+EXTRACT_PROFILES = os.getenv("EXTRACT_PROFILES", "1") == "1"
+# LLM requests in flight while working through the backlog
+PROFILE_WORKERS = int(os.getenv("PROFILE_WORKERS", 2))
+
+# key -> label, in display order
+PROFILE_FIELDS = {
+    "name": "Name",
+    "current_role": "Current Role",
+    "company": "Company",
+    "contact": "Contact",
+    "total_experience": "Total Experience",
+    "primary_skills": "Primary Skills",
+    "key_responsibilities": "Key Responsibilities",
+}
+
+PROFILE_PROMPT = """Extract the candidate profile from the resume below.
+Use ONLY the resume text. Write "Unknown" for anything that is not stated.
+Answer with one JSON object and nothing else, using exactly these keys:
+{keys}
+
+RESUME:
+{resume_text}
+
+JSON:"""
+
+
+def trim_to_budget(text, budget_tokens):
+    """Keep whole lines from the top of the resume while they fit the token budget."""
+    kept, used = [], 0
+    for line in text.split("\n"):
+        cost = count_tokens(line) + 1
+        if used + cost > budget_tokens:
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept)
+
+
+def parse_profile(raw):
+    """
+    Profile dict from the model output: the first JSON object in it, or
+    "Label: value" lines when the model ignored the JSON instruction.
+    """
+    found = {}
+    start, end = raw.find("{"), raw.rfind("}")
+    if start != -1 and end > start:
+        try:
+            found = json.loads(raw[start:end + 1])
+        except json.JSONDecodeError:
+            found = {}
+    if not found:
+        labels = {label.lower(): key for key, label in PROFILE_FIELDS.items()}
+        for line in raw.split("\n"):
+            label, sep, value = line.partition(":")
+            key = labels.get(label.strip(" -*").lower())
+            if sep and key:
+                found[key] = value.strip()
+
+    profile = {}
+    for key in PROFILE_FIELDS:
+        value = found.get(key, "Unknown")
+        if isinstance(value, list):
+            value = ", ".join(str(v) for v in value)
+        profile[key] = str(value).strip() or "Unknown"
+    return profile
+
+
+def extract_profile(llm, resume_text):
+    """One LLM call that turns resume text into a profile dict."""
+    prompt_without_text = PROFILE_PROMPT.format(keys=", ".join(PROFILE_FIELDS), resume_text="")
+    resume_text = trim_to_budget(resume_text, context_budget(prompt_without_text))
+    response = llm.invoke(PROFILE_PROMPT.format(keys=", ".join(PROFILE_FIELDS), resume_text=resume_text))
+    return parse_profile(getattr(response, "content", response))
+
+
+def profile_text(profile):
+    """Plain "Label: value" lines, for prompts and chat answers."""
+    return "\n".join(f"{label}: {profile.get(key, 'Unknown')}" for key, label in PROFILE_FIELDS.items())
+
+
+def profile_markdown(profile):
+    return "\n".join(f"**{label}:** {profile.get(key, 'Unknown')}  " for key, label in PROFILE_FIELDS.items())
+
+
+def resume_text_from_collection(collection, source):
+    """Rebuild a resume's text from its stored chunks, in chunk order."""
+    data = collection.get(where={"source": source}, include=["documents", "metadatas"])
+    chunks = sorted(zip(data["metadatas"], data["documents"]), key=lambda x: x[0].get("chunk_id", 0))
+    return "\n".join(doc for _, doc in chunks)
+
+
+def ensure_profile(catalog, collection, llm, source):
+    """Stored profile of a resume; extracted once and stored if it is missing."""
+    row = catalog.get(source)
+    if row and row.get("profile"):
+        return row["profile"]
+    profile = extract_profile(llm, resume_text_from_collection(collection, source))
+    catalog.set_profile(source, profile)
+    return profile
+
+
+# ---------------- BACKLOG ----------------
+def backfill_profiles(catalog, collection, llm, workers=PROFILE_WORKERS, limit=None, on_progress=None):
+    """
+    Extract profiles for every catalog row that has none yet, with at most
+    `workers` LLM requests in flight. on_progress(done, total) is called from
+    the calling thread. Returns {"done": n, "failed": [(source, error)]}.
+    """
+    sources = catalog.missing_profiles()
+    if limit is not None:
+        sources = sources[:limit]
+    report = {"done": 0, "failed": []}
+    if not sources:
+        return report
+
+    def work(source):
+        return extract_profile(llm, resume_text_from_collection(collection, source))
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(work, source): source for source in sources}
+        for i, future in enumerate(as_completed(futures), start=1):
+            source = futures[future]
+            try:
+                catalog.set_profile(source, future.result())
+                report["done"] += 1
+            except Exception as e:
+                report["failed"].append((source, str(e)))
+            if on_progress is not None:
+                on_progress(i, len(sources))
+    return report
@@ -0,0 +1,59 @@
+# ---------------- RESUME RANKING ----------------
+# Turns the chunk hits of one collection.query() call into a ranked list of
+# resumes. Chroma returns distances (lower is closer), they are converted to a
+# similarity of 1 / (1 + distance) before aggregating per resume:
+#   "max"       best chunk similarity of the resume
+#   "sum_top_m" sum of the resume's top_m chunk similarities
+#   "rrf"       reciprocal rank fusion, sum of 1 / (rrf_k + rank) over its chunks
+
+RANK_METHODS = ("max", "sum_top_m", "rrf")
+
+
+def distance_to_similarity(distance):
+    return 1.0 / (1.0 + distance)
+
+
+def rank_resumes(results, method="max", top_k=3, top_m=3, rrf_k=60, key="source"):
+    """
+    Aggregate per-resume scores from a single-query collection.query() result.
+
+    Returns up to top_k dicts sorted by score (best first):
+        {"source": ..., "score": ..., "hits": [(document, distance), ...]}
+    where hits are the resume's returned chunks, closest first.
+    """
+    if method not in RANK_METHODS:
+        raise ValueError(f"Unknown ranking method: {method}. Use one of {RANK_METHODS}")
+
+    metadatas = results["metadatas"][0] if results.get("metadatas") else []
+    documents = results["documents"][0] if results.get("documents") else [None] * len(metadatas)
+    distances = results["distances"][0] if results.get("distances") else [0.0] * len(metadatas)
+
+    per_resume = {}
+    for rank, (doc, meta, dist) in enumerate(zip(documents, metadatas, distances), start=1):
+        resume = meta.get(key) if meta else None
+        if resume is None:
+            continue
+        per_resume.setdefault(resume, []).append((rank, doc, dist))
+
+    ranked = []
+    for resume, hits in per_resume.items():
+        sims = sorted((distance_to_similarity(d) for _, _, d in hits), reverse=True)
+        if method == "max":
+            score = sims[0]
+        elif method == "sum_top_m":
+            score = sum(sims[:top_m])
+        else:
+            score = sum(1.0 / (rrf_k + rank) for rank, _, _ in hits)
+        ranked.append({
+            "source": resume,
+            "score": score,
+            "hits": [(doc, dist) for _, doc, dist in sorted(hits, key=lambda h: h[2])],
+        })
+
+    ranked.sort(key=lambda r: r["score"], reverse=True)
+    return ranked[:top_k]
+
+
+def ranking_text(ranked):
+    """Short one-line summary like 'a.pdf (0.712), b.pdf (0.655)'."""
+    return ", ".join(f"{r['source']} ({r['score']:.3f})" for r in ranked)
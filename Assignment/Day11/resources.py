@@ -0,0 +1,179 @@
+import os
+import time
+import threading
+import urllib.error
+import urllib.request
+import chromadb
+from langchain.embeddings import init_embeddings
+from langchain.chat_models import init_chat_model
+from embed_client import BatchedEmbeddings
+from embed_cache import CachedEmbeddings, DEFAULT_CACHE_PATH
+
+# ---------------- CONFIG ----------------
+CHAT_MODEL = "phi-3.1-mini-4k-instruct"
+EMBED_MODEL = "text-embedding-nomic-embed-text-v1.5-embedding"
+# LM Studio by default; LLM_BASE_URL points the apps at another server (e.g. stub_server.py)
+DEFAULT_BASE_URL = "http://127.0.0.1:1234/v1"
+# seconds between health checks of a shared client, checked on use
+HEALTH_CHECK_EVERY = float(os.getenv("RESOURCE_CHECK_EVERY", 30))
+HEALTH_CHECK_TIMEOUT = float(os.getenv("RESOURCE_CHECK_TIMEOUT", 2))
+
+
+class _Entry:
+    def __init__(self, factory, health_check, check_every):
+        self.factory = factory
+        self.health_check = health_check
+        self.check_every = check_every
+        self.value = None
+        self.checked = 0.0
+        self.builds = 0
+        self.build_ms = 0.0
+        self.lock = threading.Lock()
+
+
+class ResourceRegistry:
+    """
+    Process-wide cache of expensive clients (chat model, embeddings, Chroma).
+    Streamlit re-executes the app script on every interaction but keeps
+    imported modules, so a client built here once is reused by every rerun,
+    session and app in the process. Each resource is built on first use and
+    re-checked every check_every seconds; a failed health check rebuilds it.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def register(self, key, factory, health_check=None, check_every=HEALTH_CHECK_EVERY):
+        """Declare a resource; a key that is already registered keeps its built value."""
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = _Entry(factory, health_check, check_every)
+
+    def get(self, key):
+        entry = self._entries[key]
+        if entry.value is not None and (entry.health_check is None
+                                        or time.monotonic() - entry.checked < entry.check_every):
+            return entry.value
+        with entry.lock:
+            if entry.value is not None and entry.health_check is not None \
+                    and time.monotonic() - entry.checked >= entry.check_every:
+                try:
+                    entry.health_check(entry.value)
+                    entry.checked = time.monotonic()
+                except Exception:
+                    entry.value = None
+            if entry.value is None:
+                start = time.perf_counter()
+                entry.value = entry.factory()
+                entry.build_ms += (time.perf_counter() - start) * 1000
+                entry.builds += 1
+                entry.checked = time.monotonic()
+            return entry.value
+
+    def reset(self, key=None):
+        """Drop one built resource (or all); the next use builds it again."""
+        with self._lock:
+            for k, entry in self._entries.items():
+                if key is None or k == key:
+                    entry.value = None
+
+    def stats_text(self):
+        built = [e for e in self._entries.values() if e.builds]
+        rebuilds = sum(e.builds - 1 for e in built)
+        return (f"Shared clients: {len(built)}/{len(self._entries)} built in "
+                f"{sum(e.build_ms for e in built) / 1000:.2f}s, {rebuilds} rebuilds")
+
+
+# one registry per process
+REGISTRY = ResourceRegistry()
+
+
+class LazyResource:
+    """Stand-in that resolves a registry key on every attribute access."""
+
+    def __init__(self, key):
+        object.__setattr__(self, "_key", key)
+
+    def resolve(self):
+        return REGISTRY.get(self._key)
+
+    def __getattr__(self, name):
+        return getattr(REGISTRY.get(self._key), name)
+
+    def __setattr__(self, name, value):
+        setattr(REGISTRY.get(self._key), name, value)
+
+    def __repr__(self):
+        return f"LazyResource({self._key!r})"
+
+
+# ---------------- SHARED CLIENTS ----------------
+def base_url_from_env():
+    # read on call, after the app's load_dotenv()
+    return os.getenv("LLM_BASE_URL", DEFAULT_BASE_URL)
+
+
+def check_models_endpoint(base_url, timeout=HEALTH_CHECK_TIMEOUT):
+    """
+    Cheap liveness probe of an OpenAI-compatible server: GET <base_url>/models,
+    no tokens generated. Raises if the server cannot be reached; any HTTP
+    answer (also 401 from a hosted API) means it is up.
+    """
+    try:
+        with urllib.request.urlopen(base_url.rstrip("/") + "/models", timeout=timeout) as response:
+            response.read()
+    except urllib.error.HTTPError:
+        pass
+
+
+def chat_model(model=CHAT_MODEL, base_url=None):
+    base_url = base_url or base_url_from_env()
+    key = ("chat_model", model, base_url)
+    REGISTRY.register(key, lambda: init_chat_model(
+        model=model,
+        model_provider="openai",
+        base_url=base_url,
+        api_key="not-needed"
+    ), health_check=lambda llm: check_models_endpoint(base_url))
+    return LazyResource(key)
+
+
+def embeddings(model=EMBED_MODEL, base_url=None, cache_path=DEFAULT_CACHE_PATH):
+    """
+    On-disk cache by (model, sha256(text)) in front of the micro-batched,
+    bounded-concurrency client that retries transient errors.
+    """
+    base_url = base_url or base_url_from_env()
+    key = ("embeddings", model, base_url, os.path.abspath(cache_path))
+    REGISTRY.register(key, lambda: CachedEmbeddings(BatchedEmbeddings(init_embeddings(
+        model=model,
+        provider="openai",
+        base_url=base_url,
+        api_key="not-needed",
+        check_embedding_ctx_length=False
+    )), path=cache_path), health_check=lambda embed_model: check_models_endpoint(base_url))
+    return LazyResource(key)
+
+
+def chroma_collection(persist_dir, name):
+    """Collection of a shared PersistentClient; both are re-opened if a health check fails."""
+    client_key = ("chroma_client", os.path.abspath(persist_dir))
+    REGISTRY.register(client_key, lambda: chromadb.PersistentClient(path=persist_dir),
+                      health_check=lambda client: client.heartbeat())
+    key = ("chroma_collection", os.path.abspath(persist_dir), name)
+    opened = {}
+
+    def open_collection():
+        opened["client"] = REGISTRY.get(client_key)
+        return opened["client"].get_or_create_collection(name=name)
+
+    def check_collection(collection):
+        # a heartbeat, not a query on the collection; a handle from a client
+        # that has been re-opened since is stale
+        if REGISTRY.get(client_key) is not opened.get("client"):
+            raise RuntimeError("Chroma client was re-opened")
+        opened["client"].heartbeat()
+
+    REGISTRY.register(key, open_collection, health_check=check_collection)
+    return LazyResource(key)
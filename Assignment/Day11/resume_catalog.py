@@ -0,0 +1,268 @@
+import os
+import json
+import sqlite3
+import datetime
+import threading
+from facets import resume_facets, merge_profile_facets, has_constraints
+
+# ---------------- CONFIG ----------------
+CATALOG_FILE = "resume_catalog.sqlite"
+
+
+def guess_candidate_name(text):
+    """First two words of the first non-empty line, like the old list page did."""
+    lines = [l.strip() for l in text.strip().split("\n") if l.strip()]
+    first_line = lines[0] if lines else "Unknown Candidate"
+    return " ".join(first_line.split()[:2])
+
+
+class ResumeCatalog:
+    """
+    One row per resume (source, candidate name, chunk count, upload time,
+    hash, the structured profile extracted at ingest and the skill /
+    experience / location facets).
+    Rows live in SQLite and are mirrored in a dict, so listing resumes never
+    has to dump the Chroma collection. Every write is a single transaction
+    that also bumps the collection version, which answer caches use to
+    notice that resumes were added, updated or deleted. An in-memory
+    skill -> sources index answers facet filters without a scan.
+    """
+
+    def __init__(self, path):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS resumes (
+                    source TEXT PRIMARY KEY,
+                    candidate_name TEXT,
+                    chunk_count INTEGER,
+                    upload_time TEXT,
+                    sha256 TEXT
+                )
+            """)
+            columns = [r[1] for r in self.conn.execute("PRAGMA table_info(resumes)")]
+            # catalogs created before profiles / facets were stored
+            if "profile" not in columns:
+                self.conn.execute("ALTER TABLE resumes ADD COLUMN profile TEXT")
+            if "facets" not in columns:
+                self.conn.execute("ALTER TABLE resumes ADD COLUMN facets TEXT")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS catalog_meta (key TEXT PRIMARY KEY, value INTEGER)")
+            self.conn.execute("INSERT OR IGNORE INTO catalog_meta (key, value) VALUES ('version', 0)")
+        self.rows = {}
+        self.skill_index = {}
+        for source, name, count, upload_time, digest, profile, facets in self.conn.execute(
+            "SELECT source, candidate_name, chunk_count, upload_time, sha256, profile, facets FROM resumes"
+        ):
+            self.rows[source] = {
+                "source": source,
+                "candidate_name": name,
+                "chunk_count": count,
+                "upload_time": upload_time,
+                "sha256": digest,
+                "profile": json.loads(profile) if profile else None,
+                "facets": json.loads(facets) if facets else None,
+            }
+            self._index_skills(source)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, source):
+        return source in self.rows
+
+    def get(self, source):
+        return self.rows.get(source)
+
+    def version(self):
+        """Collection version, read from SQLite so writes by other processes count too."""
+        with self._lock:
+            return self.conn.execute("SELECT value FROM catalog_meta WHERE key = 'version'").fetchone()[0]
+
+    def _bump_version(self):
+        self.conn.execute("UPDATE catalog_meta SET value = value + 1 WHERE key = 'version'")
+
+    def _index_skills(self, source, drop=False):
+        facets = (self.rows.get(source) or {}).get("facets") or {}
+        for skill in facets.get("skills", []):
+            if drop:
+                self.skill_index.get(skill, set()).discard(source)
+            else:
+                self.skill_index.setdefault(skill, set()).add(source)
+
+    def _write_facets(self, source, facets):
+        self._index_skills(source, drop=True)
+        self.rows[source]["facets"] = facets
+        self._index_skills(source)
+        self.conn.execute("UPDATE resumes SET facets = ? WHERE source = ?",
+                          (json.dumps(facets) if facets else None, source))
+
+    def list_rows(self):
+        """All rows sorted by source name."""
+        return [self.rows[s] for s in sorted(self.rows)]
+
+    def upsert(self, source, candidate_name, chunk_count, sha256=None, upload_time=None, facets=None):
+        """
+        Add or replace the row of a resume. Storing the same file again
+        (same hash, chunk count, name and facets) writes nothing and keeps
+        the version, so answer caches and the compact index stay valid.
+        """
+        old = self.rows.get(source)
+        # the stored profile survives only if the file content did not change
+        keep_profile = old is not None and sha256 is not None and old["sha256"] == sha256
+        row = {
+            "source": source,
+            "candidate_name": old["candidate_name"] if keep_profile and old["profile"] else candidate_name,
+            "chunk_count": chunk_count,
+            "upload_time": upload_time or datetime.datetime.now().isoformat(timespec="seconds"),
+            "sha256": sha256,
+            "profile": old["profile"] if keep_profile else None,
+            "facets": None,
+        }
+        if facets is not None and row["profile"]:
+            facets = merge_profile_facets(facets, row["profile"])
+        if keep_profile and (old["candidate_name"], old["chunk_count"], old["facets"]) == (
+                row["candidate_name"], chunk_count, facets):
+            return old
+        with self._lock, self.conn:
+            if old is not None:
+                self._index_skills(source, drop=True)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO resumes (source, candidate_name, chunk_count, upload_time, sha256, profile) "
+                "VALUES (:source, :candidate_name, :chunk_count, :upload_time, :sha256, :profile_json)",
+                {**row, "profile_json": json.dumps(row["profile"]) if row["profile"] else None},
+            )
+            self._bump_version()
+            self.rows[source] = row
+            self._write_facets(source, facets)
+        return row
+
+    def set_profile(self, source, profile):
+        """
+        Store the extracted profile; its name replaces the first-line guess.
+        Not a content change, so the collection version stays the same.
+        """
+        with self._lock, self.conn:
+            row = self.rows.get(source)
+            if row is None:
+                return
+            name = profile.get("name")
+            if name and name != "Unknown":
+                row["candidate_name"] = name
+            row["profile"] = profile
+            self.conn.execute(
+                "UPDATE resumes SET profile = ?, candidate_name = ? WHERE source = ?",
+                (json.dumps(profile), row["candidate_name"], source),
+            )
+            if row["facets"] is not None:
+                self._write_facets(source, merge_profile_facets(row["facets"], profile))
+
+    def missing_profiles(self):
+        """Sources that have no profile yet (the extraction backlog)."""
+        return [s for s in sorted(self.rows) if not self.rows[s]["profile"]]
+
+    # ---------------- FACETS ----------------
+    def missing_facets(self):
+        return [s for s in sorted(self.rows) if self.rows[s]["facets"] is None]
+
+    def set_facets(self, source, facets):
+        """Facets of a resume stored before facets existed (no version bump)."""
+        with self._lock, self.conn:
+            if source not in self.rows:
+                return
+            profile = self.rows[source]["profile"]
+            self._write_facets(source, merge_profile_facets(facets, profile) if profile else facets)
+
+    def backfill_facets(self, collection):
+        """Facets for rows stored before facets existed, rebuilt from their chunks."""
+        sources = self.missing_facets()
+        for source in sources:
+            data = collection.get(where={"source": source}, include=["documents", "metadatas"])
+            chunks = sorted(zip(data["metadatas"], data["documents"]), key=lambda c: c[0].get("chunk_id", 0))
+            self.set_facets(source, resume_facets("\n".join(doc for _, doc in chunks)))
+        return len(sources)
+
+    def filter_sources(self, constraints):
+        """
+        Sources meeting every hard constraint of query_constraints(), from the
+        skill index plus the per-row experience / location facets. None when
+        there are no constraints. Resumes without facets never match; a
+        resume without a years figure counts as unknown and passes the
+        experience bounds.
+        """
+        if not has_constraints(constraints):
+            return None
+        with self._lock:
+            # every required skill, and one skill of every alternative group
+            sets = [self.skill_index.get(skill, set()) for skill in constraints["skills"]]
+            sets += [set().union(*(self.skill_index.get(skill, set()) for skill in group))
+                     for group in constraints["any_skills"]]
+            if sets:
+                allowed = set.intersection(*sorted(sets, key=len))
+            else:
+                allowed = {s for s, row in self.rows.items() if row["facets"] is not None}
+            result = set()
+            for source in allowed:
+                facets = self.rows[source]["facets"]
+                years = facets["years_exp"]
+                if years is not None and constraints["min_years"] and years < constraints["min_years"]:
+                    continue
+                if years is not None and constraints["max_years"] is not None and years > constraints["max_years"]:
+                    continue
+                if constraints["location"] and facets["location"] != constraints["location"]:
+                    continue
+                result.add(source)
+        return result
+
+    def remove(self, source):
+        with self._lock, self.conn:
+            self._index_skills(source, drop=True)
+            self.conn.execute("DELETE FROM resumes WHERE source = ?", (source,))
+            self._bump_version()
+            self.rows.pop(source, None)
+
+    def rebuild_from_collection(self, collection):
+        """
+        One-time backfill for a collection that was filled before the catalog
+        existed. This is the only place that dumps the whole collection.
+        """
+        data = collection.get(include=["documents", "metadatas"])
+        found = {}
+        for doc, meta in zip(data["documents"], data["metadatas"]):
+            source = meta.get("source", "Unknown")
+            entry = found.setdefault(source, {"name": None, "first_chunk": None, "count": 0, "chunks": []})
+            entry["count"] += 1
+            chunk_id = meta.get("chunk_id", 0)
+            entry["chunks"].append((chunk_id, doc))
+            if entry["first_chunk"] is None or chunk_id < entry["first_chunk"]:
+                entry["first_chunk"] = chunk_id
+                entry["name"] = guess_candidate_name(doc)
+
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM resumes")
+            self._bump_version()
+            self.rows = {}
+            self.skill_index = {}
+            now = datetime.datetime.now().isoformat(timespec="seconds")
+            for source, entry in found.items():
+                text = "\n".join(doc for _, doc in sorted(entry["chunks"], key=lambda c: c[0]))
+                row = {
+                    "source": source,
+                    "candidate_name": entry["name"],
+                    "chunk_count": entry["count"],
+                    "upload_time": now,
+                    "sha256": None,
+                    "profile": None,
+                    "facets": resume_facets(text),
+                }
+                self.conn.execute(
+                    "INSERT INTO resumes (source, candidate_name, chunk_count, upload_time, sha256, facets) "
+                    "VALUES (:source, :candidate_name, :chunk_count, :upload_time, :sha256, :facets_json)",
+                    {**row, "facets_json": json.dumps(row["facets"])},
+                )
+                self.rows[source] = row
+                self._index_skills(source)
+        return len(self.rows)
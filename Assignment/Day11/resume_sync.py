@@ -0,0 +1,260 @@
+import os
+import json
+import hashlib
+from parallel_loader import iter_parsed_pdfs
+from resume_catalog import guess_candidate_name
+from dedup_index import DuplicateResume
+from facets import resume_facets
+
+# ---------------- MANIFEST ----------------
+# The manifest remembers what was ingested for every PDF in the resume folder:
+#   file name -> {"sha256": ..., "mtime": ..., "size": ...}
+# so a sync only parses and embeds files that are new or actually changed.
+MANIFEST_FILE = "resume_manifest.json"
+
+
+def file_sha256(path, block_size=1 << 20):
+    """Return the sha256 hex digest of a file, read in blocks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_manifest(manifest_path):
+    """Load the manifest json, or an empty one if it does not exist yet."""
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest_path, manifest):
+    """Write the manifest atomically so a crash never leaves half a file."""
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def scan_resume_dir(resume_dir, manifest, glob_ext=".pdf"):
+    """
+    Compare the folder with the manifest.
+    Only files whose mtime or size moved are hashed again.
+    Returns (changed, deleted, unchanged) where changed is a list of
+    (file_name, path, entry) tuples ready to be written to the manifest.
+    """
+    changed, unchanged = [], []
+    present = set()
+
+    for entry in os.scandir(resume_dir):
+        if not entry.is_file() or not entry.name.lower().endswith(glob_ext):
+            continue
+        present.add(entry.name)
+        stat = entry.stat()
+        old = manifest.get(entry.name)
+
+        if old and old["mtime"] == stat.st_mtime and old["size"] == stat.st_size:
+            unchanged.append(entry.name)
+            continue
+
+        digest = file_sha256(entry.path)
+        new_entry = {"sha256": digest, "mtime": stat.st_mtime, "size": stat.st_size}
+        if old and old["sha256"] == digest:
+            # touched but same content, just remember the new mtime
+            manifest[entry.name] = new_entry
+            unchanged.append(entry.name)
+            continue
+        changed.append((entry.name, entry.path, new_entry))
+
+    deleted = [name for name in manifest if name not in present]
+    return changed, deleted, unchanged
+
+
+# ---------------- UPSERT ----------------
+class EmptyResume(ValueError):
+    """Raised when a PDF yields no text, e.g. a scanned (image-only) resume."""
+
+
+def content_chunk_ids(key, texts):
+    """
+    Chunk ids derived from the resume key and the chunk text, so the same
+    text keeps the same id across versions of a resume. Repeated texts get
+    a running suffix.
+    """
+    ids, seen = [], {}
+    for text in texts:
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+        n = seen.get(digest, 0)
+        seen[digest] = n + 1
+        ids.append(f"{key}_{digest}" if n == 0 else f"{key}_{digest}_{n}")
+    return ids
+
+
+def upsert_resume_chunks(collection, key, value, texts, metadatas, embed_model, lexical_index=None):
+    """
+    Replace the chunks stored for one resume (metadata key == value) with a
+    new version. Only chunks with new text are embedded, and that happens
+    before anything is written, so a failed embedding leaves the old version
+    searchable. This is a best-effort two-step swap, not a transaction: new
+    and moved chunks go out in one collection.upsert, stale chunks are
+    deleted after it. The resume never drops out of search, but a query
+    between the two steps can see old and new chunks side by side, and if
+    the delete fails the stale chunks stay until the next update of the
+    resume removes them.
+    Returns {"written", "kept", "deleted"} chunk counts.
+    """
+    if not texts:
+        raise EmptyResume(f"No text extracted for {value}")
+    ids = content_chunk_ids(value, texts)
+    old = collection.get(where={key: value}, include=["metadatas"])
+    old_metas = dict(zip(old["ids"], old["metadatas"]))
+
+    fresh = [i for i, chunk_id in enumerate(ids) if chunk_id not in old_metas]
+    # same text, but its position (chunk_id, page, ...) changed
+    moved = [i for i, chunk_id in enumerate(ids) if chunk_id in old_metas and old_metas[chunk_id] != metadatas[i]]
+    current = set(ids)
+    stale = [chunk_id for chunk_id in old_metas if chunk_id not in current]
+
+    vectors = {}
+    if fresh:
+        vectors.update(zip(fresh, embed_model.embed_documents([texts[i] for i in fresh])))
+    if moved:
+        kept = collection.get(ids=[ids[i] for i in moved], include=["embeddings"])
+        by_id = dict(zip(kept["ids"], kept["embeddings"]))
+        # Chroma hands back numpy rows; one upsert must not mix them with the lists embed_model returns
+        vectors.update((i, [float(x) for x in by_id[ids[i]]]) for i in moved)
+
+    write = sorted(vectors)
+    if write:
+        write_ids = [ids[i] for i in write]
+        write_texts = [texts[i] for i in write]
+        write_metas = [metadatas[i] for i in write]
+        collection.upsert(ids=write_ids, documents=write_texts,
+                          embeddings=[vectors[i] for i in write], metadatas=write_metas)
+        if lexical_index is not None:
+            lexical_index.add(write_ids, write_texts, write_metas)
+    if stale:
+        collection.delete(ids=stale)
+        if lexical_index is not None:
+            lexical_index.remove_ids(stale)
+    return {"written": len(write), "kept": len(ids) - len(write), "deleted": len(stale)}
+
+
+# ---------------- SYNC ----------------
+def store_resume_docs(collection, docs, source_name, embed_model, text_splitter, catalog=None, sha256=None,
+                      lexical_index=None, dedup_index=None):
+    """
+    Chunk the parsed pages of one PDF and upsert them under source_name,
+    replacing any earlier version. Records the resume (with its
+    skill facets) in the catalog, the keyword index and the duplicate index
+    when given.
+    Raises DuplicateResume (before embedding) for a near-duplicate of
+    another resume when the dedup mode is "skip". Returns the number of chunks.
+    """
+    full_text = "\n".join(d.page_content for d in docs)
+    signature = None
+    if dedup_index is not None:
+        signature, _ = dedup_index.check(source_name, full_text)
+    chunks = text_splitter.split_documents(docs)
+    texts = [c.page_content for c in chunks]
+    metadatas = []
+    for i, chunk in enumerate(chunks):
+        meta = chunk.metadata.copy()
+        meta["chunk_id"] = i
+        meta["source"] = source_name
+        metadatas.append(meta)
+
+    upsert_resume_chunks(collection, "source", source_name, texts, metadatas, embed_model,
+                         lexical_index=lexical_index)
+    if catalog is not None:
+        catalog.upsert(source_name, guess_candidate_name(texts[0]), len(texts), sha256=sha256,
+                       facets=resume_facets(full_text))
+    if dedup_index is not None:
+        dedup_index.add(source_name, signature)
+    return len(texts)
+
+
+def sync_resume_dir(collection, resume_dir, embed_model, text_splitter, manifest_path, workers=None, catalog=None,
+                    lexical_index=None, dry_run=False, prune=True, dedup_index=None):
+    """
+    Incrementally sync a resume folder into the collection.
+    New or changed PDFs are (re)indexed, chunks of deleted PDFs are removed
+    (unless prune=False), untouched PDFs are skipped. Changed PDFs are parsed
+    on a process pool and embedded as each one finishes. The manifest is
+    saved after every file so an interrupted sync picks up where it stopped.
+    With dry_run=True nothing is written, the report says what would change;
+    only the folder and the manifest are read, so collection, embed_model and
+    text_splitter may be None.
+    Near-duplicates of already indexed resumes are listed under "duplicates".
+    """
+    if not os.path.isdir(resume_dir):
+        # never treat a missing (e.g. unmounted) folder as "everything deleted"
+        raise FileNotFoundError(f"Resume folder not found: {resume_dir}")
+    manifest = load_manifest(manifest_path)
+    changed, deleted, unchanged = scan_resume_dir(resume_dir, manifest)
+    report = {"added": 0, "updated": 0, "deleted": 0, "unchanged": len(unchanged), "chunks": 0, "failed": [],
+              "duplicates": []}
+    if not prune:
+        deleted = []
+
+    if dry_run:
+        report["added"] = sum(1 for name, _, _ in changed if name not in manifest)
+        report["updated"] = len(changed) - report["added"]
+        report["deleted"] = len(deleted)
+        return report
+
+    for name in deleted:
+        collection.delete(where={"source": name})
+        if lexical_index is not None:
+            lexical_index.remove_where("source", name)
+        if catalog is not None:
+            catalog.remove(name)
+        if dedup_index is not None:
+            dedup_index.remove(name)
+        del manifest[name]
+        report["deleted"] += 1
+        save_manifest(manifest_path, manifest)
+
+    entries = {path: (name, entry) for name, path, entry in changed}
+    for path, docs, error in iter_parsed_pdfs(entries, workers):
+        name, entry = entries[path]
+        is_update = name in manifest
+        if error is None:
+            # upsert replaces the chunks of an earlier version (also
+            # covers a collection that was filled by the old one-shot load)
+            try:
+                report["chunks"] += store_resume_docs(collection, docs, name, embed_model, text_splitter,
+                                                      catalog=catalog, sha256=entry["sha256"],
+                                                      lexical_index=lexical_index, dedup_index=dedup_index)
+            except DuplicateResume as e:
+                if is_update:
+                    # the file now repeats another resume, drop its earlier version
+                    collection.delete(where={"source": name})
+                    if lexical_index is not None:
+                        lexical_index.remove_where("source", name)
+                    if catalog is not None:
+                        catalog.remove(name)
+                    dedup_index.remove(name)
+                dedup_index.add_alias(name, e.duplicate_of, e.similarity)
+                # remembered in the manifest, so it is not parsed again until it changes
+                report["duplicates"].append((name, e.duplicate_of))
+                manifest[name] = entry
+                save_manifest(manifest_path, manifest)
+                continue
+            except Exception as e:
+                error = e
+        if error is not None:
+            # an earlier version stays indexed and keeps its manifest entry,
+            # so the next sync tries the new file again
+            report["failed"].append((name, str(error)))
+            continue
+        manifest[name] = entry
+        report["updated" if is_update else "added"] += 1
+        save_manifest(manifest_path, manifest)
+
+    if not changed and not deleted and unchanged:
+        # only mtimes may have moved
+        save_manifest(manifest_path, manifest)
+    return report
@@ -0,0 +1,86 @@
+import time
+from contextlib import contextmanager
+from ranking import rank_resumes
+from context_packer import context_budget, chunks_from_query, pack_context
+from lexical_index import hybrid_query
+from facets import prefilter_sources
+from profile_extractor import ensure_profile, profile_text
+
+# stages of one shortlist request, in order (llm is timed by the caller)
+SHORTLIST_STAGES = ("embed_query", "prefilter", "retrieve", "rank", "fetch_resume", "profile", "build_prompt", "llm")
+
+
+class StageTimer:
+    """Wall time (ms) of each stage of one request."""
+
+    def __init__(self):
+        self.ms = {}
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.ms[name] = self.ms.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+
+def build_shortlist(user_query, prompt_template, catalog, collection, vector_store, lexical_index,
+                    embed_model, llm, top_k=3, candidate_pool=20, vector_pool=10, lexical_pool=20,
+                    rank_method="max", timer=None):
+    """
+    Retrieve and rank resumes for a query and build the LLM prompt for the best one.
+    prompt_template takes best_source, profile_text, resume_text and user_query.
+    Returns None when nothing matches, otherwise a dict with best_source, ranked,
+    profile, prompt, filter_note and the collection version read before retrieval.
+    With a StageTimer every stage up to the prompt is timed.
+    """
+    timer = timer or StageTimer()
+    # read before retrieval, so an answer built on data that changes
+    # meanwhile is filed under an already stale version
+    collection_version = catalog.version()
+    with timer.stage("embed_query"):
+        query_embedding = embed_model.embed_query(user_query)
+    with timer.stage("prefilter"):
+        # required skills / years of experience / city named in the query narrow the resumes searched
+        allowed_sources, filter_note = prefilter_sources(catalog, user_query)
+    with timer.stage("retrieve"):
+        results = hybrid_query(
+            vector_store, lexical_index, query_embedding, user_query,
+            n_results=candidate_pool, vector_pool=vector_pool, lexical_pool=lexical_pool,
+            sources=allowed_sources
+        )
+    with timer.stage("rank"):
+        ranked = rank_resumes(results, method=rank_method, top_k=top_k)
+    if not ranked:
+        return None
+    best_source = ranked[0]["source"]
+
+    with timer.stage("fetch_resume"):
+        # score every chunk of the chosen resume against the query
+        best_row = catalog.get(best_source)
+        resume_results = vector_store.query(
+            query_embeddings=[query_embedding],
+            where={"source": best_source},
+            n_results=best_row["chunk_count"] if best_row else candidate_pool
+        )
+    with timer.stage("profile"):
+        # stored at ingest; only resumes from before profiles existed are extracted here, once
+        profile = ensure_profile(catalog, collection, llm, best_source)
+    with timer.stage("build_prompt"):
+        # pack the best chunks into the tokens the 4k model has left for context
+        budget = context_budget(prompt_template.format(
+            best_source=best_source, profile_text=profile_text(profile), resume_text="", user_query=user_query
+        ))
+        resume_text = pack_context(chunks_from_query(resume_results), budget)
+        prompt = prompt_template.format(
+            best_source=best_source, profile_text=profile_text(profile), resume_text=resume_text,
+            user_query=user_query
+        )
+
+    return {"best_source": best_source, "ranked": ranked, "profile": profile, "prompt": prompt,
+            "filter_note": filter_note, "version": collection_version}
@@ -0,0 +1,40 @@
+import time
+
+
+class TimedStream:
+    """
+    Wraps llm.stream(prompt) so it can be handed to st.write_stream().
+    Yields the text of each chunk as it arrives and records the time to
+    first token and the total generation time. After iterating, .text holds
+    the full answer for the message history / answer cache.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.parts = []
+        self.ttft = None
+        self.total = None
+
+    def __iter__(self):
+        # llm.stream() is lazy, the request only starts on the first next()
+        start = time.perf_counter()
+        for chunk in self.chunks:
+            text = getattr(chunk, "content", chunk)
+            if not text:
+                continue
+            if self.ttft is None:
+                self.ttft = time.perf_counter() - start
+            self.parts.append(text)
+            yield text
+        self.total = time.perf_counter() - start
+
+    @property
+    def text(self):
+        return "".join(self.parts)
+
+    def timing_text(self):
+        if self.total is None:
+            return "Generation not finished"
+        ttft = f"{self.ttft:.2f}s" if self.ttft is not None else "n/a"
+        return f"⏱️ First token {ttft} · total {self.total:.2f}s"
+
@@ -0,0 +1,260 @@
+"""
+Offline OpenAI-compatible stand-in for LM Studio / Groq, for load tests.
+
+Serves the endpoints the apps use:
+  POST /v1/chat/completions   streaming (SSE) and non-streaming
+  POST /v1/embeddings         float or base64 vectors
+  GET  /v1/models
+Replies are deterministic: embeddings come from hash_embeddings, chat text
+is seeded by the prompt, and prompts that end in "JSON:" (profile
+extraction) get a JSON object with the requested keys. Latency, tokens/s
+and error injection are configurable, so runs are reproducible without a
+GPU or network.
+
+Point the apps at it through LLM_BASE_URL:
+    python stub_server.py --port 1235 --latency-ms 80 --tokens-per-s 40 --error-rate 0.02
+    LLM_BASE_URL=http://127.0.0.1:1235/v1 streamlit run Resume_RAG.py
+Run the apps from a scratch folder then: ./Resume_base (and its embedding
+cache) is relative, and stub vectors must not mix with real ones.
+"""
+import os
+import re
+import json
+import time
+import base64
+import random
+import hashlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from hash_embeddings import hash_vector, HASH_DIM
+
+# ---------------- CONFIG ----------------
+STUB_PORT = int(os.getenv("STUB_PORT", 1235))
+STUB_LATENCY_MS = float(os.getenv("STUB_LATENCY_MS", 50))        # before the first token / the response
+STUB_JITTER_MS = float(os.getenv("STUB_JITTER_MS", 0))
+STUB_TOKENS_PER_S = float(os.getenv("STUB_TOKENS_PER_S", 50))    # 0 = no generation delay
+STUB_REPLY_TOKENS = int(os.getenv("STUB_REPLY_TOKENS", 120))
+STUB_EMBED_MS_PER_INPUT = float(os.getenv("STUB_EMBED_MS_PER_INPUT", 2))
+STUB_ERROR_RATE = float(os.getenv("STUB_ERROR_RATE", 0))          # share of requests answered with an error
+STUB_ERROR_STATUS = int(os.getenv("STUB_ERROR_STATUS", 503))
+STUB_SEED = int(os.getenv("STUB_SEED", 7))
+
+MODELS = ["phi-3.1-mini-4k-instruct", "text-embedding-nomic-embed-text-v1.5-embedding"]
+WORD_RE = re.compile(r"[A-Za-z][A-Za-z+#.]{2,}")
+KEYS_RE = re.compile(r"these keys:\s*\n?(.+)")
+
+
+class StubConfig:
+    def __init__(self, latency_ms=STUB_LATENCY_MS, jitter_ms=STUB_JITTER_MS, tokens_per_s=STUB_TOKENS_PER_S,
+                 reply_tokens=STUB_REPLY_TOKENS, embed_ms_per_input=STUB_EMBED_MS_PER_INPUT,
+                 error_rate=STUB_ERROR_RATE, error_status=STUB_ERROR_STATUS, seed=STUB_SEED, dim=HASH_DIM):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tokens_per_s = tokens_per_s
+        self.reply_tokens = reply_tokens
+        self.embed_ms_per_input = embed_ms_per_input
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.dim = dim
+        # one seeded stream for jitter and injected errors, shared by all threads
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def draw(self):
+        """(delay seconds, fail?) for the next request."""
+        with self._lock:
+            self.requests += 1
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+            fail = self._rng.random() < self.error_rate
+            self.errors += fail
+        return max(0.0, self.latency_ms + jitter) / 1000, fail
+
+
+# ---------------- REPLIES ----------------
+def prompt_of(messages):
+    parts = []
+    for m in messages:
+        content = m.get("content") or ""
+        if isinstance(content, list):
+            content = " ".join(p.get("text", "") for p in content if isinstance(p, dict))
+        parts.append(content)
+    return "\n".join(parts)
+
+
+def reply_text(prompt, n_tokens):
+    """
+    Deterministic answer for a prompt. Profile prompts ending in "JSON:" get
+    a JSON object with the listed keys, everything else a Match Score / Why
+    answer made of words from the prompt.
+    """
+    rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+    words = WORD_RE.findall(prompt) or ["candidate", "resume", "skills"]
+    keys = KEYS_RE.search(prompt)
+    if prompt.rstrip().endswith("JSON:") and keys:
+        return json.dumps({k.strip(): " ".join(rng.choices(words, k=3))
+                           for k in keys.group(1).split(",") if k.strip()})
+    body = " ".join(rng.choices(words, k=max(1, n_tokens - 6)))
+    return f"Match Score: {rng.randint(1, 10)}/10\nWhy: {body}"
+
+
+def split_tokens(text):
+    """Stream pieces: a word with its leading whitespace counts as one token."""
+    return re.findall(r"\s*\S+", text) or [text]
+
+
+def count_tokens(text):
+    return len(text.split())
+
+
+# ---------------- HTTP ----------------
+class StubHandler(BaseHTTPRequestHandler):
+    config = StubConfig()
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._json(status, {"error": {"message": message, "type": "stub_error", "code": status}})
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._json(200, {"object": "list", "data": [{"id": m, "object": "model", "owned_by": "stub"}
+                                                        for m in MODELS]})
+        else:
+            self._error(404, f"Unknown path {self.path}")
+
+    def do_POST(self):
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except json.JSONDecodeError as e:
+            return self._error(400, f"Invalid JSON: {e}")
+        delay, fail = self.config.draw()
+        if self.path.endswith("/chat/completions"):
+            time.sleep(delay)
+            if fail:
+                return self._error(self.config.error_status, "Injected failure")
+            return self.chat(request)
+        if self.path.endswith("/embeddings"):
+            inputs = request.get("input", [])
+            inputs = [inputs] if isinstance(inputs, str) else inputs
+            time.sleep(delay + len(inputs) * self.config.embed_ms_per_input / 1000)
+            if fail:
+                return self._error(self.config.error_status, "Injected failure")
+            return self.embeddings(request, inputs)
+        self._error(404, f"Unknown path {self.path}")
+
+    def chat(self, request):
+        prompt = prompt_of(request.get("messages", []))
+        n_tokens = min(int(request.get("max_tokens") or self.config.reply_tokens), self.config.reply_tokens)
+        text = reply_text(prompt, n_tokens)
+        model = request.get("model", MODELS[0])
+        created = int(time.time())
+        completion_id = "chatcmpl-" + hashlib.sha1(f"{prompt}{time.time_ns()}".encode()).hexdigest()[:12]
+        tokens = split_tokens(text)
+        per_token = 1.0 / self.config.tokens_per_s if self.config.tokens_per_s > 0 else 0.0
+        usage = {"prompt_tokens": count_tokens(prompt), "completion_tokens": len(tokens),
+                 "total_tokens": count_tokens(prompt) + len(tokens)}
+
+        if not request.get("stream"):
+            time.sleep(per_token * len(tokens))
+            return self._json(200, {
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                             "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(delta, finish_reason=None):
+            chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        try:
+            event({"role": "assistant", "content": ""})
+            for token in tokens:
+                time.sleep(per_token)
+                event({"content": token})
+            event({}, "stop")
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def embeddings(self, request, inputs):
+        data = []
+        for i, text in enumerate(inputs):
+            if not isinstance(text, str):
+                # token id arrays: embed their decimal form, still deterministic
+                text = " ".join(str(t) for t in text)
+            vector = hash_vector(text, self.config.dim)
+            if request.get("encoding_format") == "base64":
+                embedding = base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii")
+            else:
+                embedding = vector.tolist()
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+        tokens = sum(count_tokens(t) if isinstance(t, str) else len(t) for t in inputs)
+        self._json(200, {"object": "list", "data": data, "model": request.get("model", MODELS[1]),
+                         "usage": {"prompt_tokens": tokens, "total_tokens": tokens}})
+
+
+def start_stub_server(port=0, config=None, host="127.0.0.1"):
+    """
+    Run the stub on a background thread (port 0 picks a free one) and return
+    (server, base_url). Stop it with server.shutdown().
+    """
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"config": config or StubConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=STUB_PORT)
+    parser.add_argument("--latency-ms", type=float, default=STUB_LATENCY_MS)
+    parser.add_argument("--jitter-ms", type=float, default=STUB_JITTER_MS)
+    parser.add_argument("--tokens-per-s", type=float, default=STUB_TOKENS_PER_S, help="0 for no delay")
+    parser.add_argument("--reply-tokens", type=int, default=STUB_REPLY_TOKENS)
+    parser.add_argument("--embed-ms-per-input", type=float, default=STUB_EMBED_MS_PER_INPUT)
+    parser.add_argument("--error-rate", type=float, default=STUB_ERROR_RATE)
+    parser.add_argument("--error-status", type=int, default=STUB_ERROR_STATUS)
+    parser.add_argument("--seed", type=int, default=STUB_SEED)
+    parser.add_argument("--dim", type=int, default=HASH_DIM, help="embedding size")
+    args = parser.parse_args()
+
+    config = StubConfig(args.latency_ms, args.jitter_ms, args.tokens_per_s, args.reply_tokens,
+                        args.embed_ms_per_input, args.error_rate, args.error_status, args.seed, args.dim)
+    server, base_url = start_stub_server(args.port, config, args.host)
+    print(f"Stub server on {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"\n{config.requests} requests, {config.errors} injected errors")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import os
+import sys
+import uuid
+import pytest
+import chromadb
+
+# the Day11 modules are plain scripts next to this folder, not a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def collection():
+    """Fresh in-memory Chroma collection (default l2 space)."""
+    return chromadb.EphemeralClient().create_collection(name=f"test_{uuid.uuid4().hex[:12]}")
+
+
+def pdf_bytes(text):
+    """A one-page PDF that shows text, built by hand (no PDF writer dependency)."""
+    stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("latin-1")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+@pytest.fixture
+def make_pdf(tmp_path):
+    """make_pdf(name, text) writes a one-page PDF into tmp_path and returns its path."""
+    def make(name, text):
+        path = tmp_path / name
+        path.write_bytes(pdf_bytes(text))
+        return str(path)
+    return make
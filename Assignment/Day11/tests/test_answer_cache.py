@@ -0,0 +1,52 @@
+from answer_cache import AnswerCache
+
+
+class FakeLLM:
+    model_name = "fake"
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return type("Message", (), {"content": f"answer {self.calls} to {prompt}"})()
+
+
+def test_hit_under_the_same_version():
+    cache, llm = AnswerCache(), FakeLLM()
+    first, hit = cache.invoke(llm, "who fits?", version=1)
+    assert not hit
+    again, hit = cache.invoke(llm, "who fits?", version=1)
+    assert hit and again == first and llm.calls == 1
+
+
+def test_version_change_drops_every_entry():
+    cache, llm = AnswerCache(), FakeLLM()
+    cache.invoke(llm, "q1", version=1)
+    cache.invoke(llm, "q2", version=1)
+    _, hit = cache.invoke(llm, "q1", version=2)
+    assert not hit and llm.calls == 3
+    assert len(cache.entries) == 1
+
+
+def test_answer_from_an_older_version_is_not_stored():
+    cache = AnswerCache()
+    cache.get("fake", "q", version=2)
+    cache.put("fake", "q", version=1, answer="stale")
+    assert cache.get("fake", "q", version=2) is None
+
+
+def test_lru_evicts_the_least_recently_used():
+    cache = AnswerCache(maxsize=2)
+    cache.put("fake", "a", 1, "A")
+    cache.put("fake", "b", 1, "B")
+    cache.get("fake", "a", 1)
+    cache.put("fake", "c", 1, "C")
+    assert cache.get("fake", "b", 1) is None
+    assert cache.get("fake", "a", 1) == "A"
+
+
+def test_model_is_part_of_the_key():
+    cache = AnswerCache()
+    cache.put("model-a", "q", 1, "from a")
+    assert cache.get("model-b", "q", 1) is None
@@ -0,0 +1,59 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Day7"))
+from batch_shortlist import load_jds, load_chunk_matrix, group_by_resume, score_jds
+
+
+def unit(rows):
+    matrix = np.asarray(rows, dtype=np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def test_group_by_resume_makes_each_resume_contiguous():
+    matrix = np.arange(10, dtype=np.float32).reshape(5, 2)
+    grouped, resumes, starts = group_by_resume(matrix, ["b", "a", "b", "c", "a"])
+    assert resumes.tolist() == ["a", "b", "c"]
+    assert starts.tolist() == [0, 2, 4]
+    assert grouped[:, 0].tolist() == [2, 8, 0, 4, 6]
+
+
+def test_score_jds_ranks_resumes_by_their_best_chunk():
+    chunks, resumes, starts = group_by_resume(
+        unit([[1, 0], [0, 1], [1, 1], [-1, 0]]), ["a", "b", "b", "c"])
+    jds = unit([[1, 0], [0, 1]])
+    results = {jd: ([resumes[r] for r in idx], scores) for jd, idx, scores in score_jds(jds, chunks, starts, 2, 1)}
+    assert results[0][0] == ["a", "b"]
+    assert results[1][0] == ["b", "a"]
+    assert results[1][1][0] == pytest.approx(1.0)
+    # top_k above the pool size returns every resume
+    assert [len(idx) for _, idx, _ in score_jds(jds, chunks, starts, 10)] == [3, 3]
+
+
+def test_score_jds_rejects_top_k_below_one():
+    chunks, _, starts = group_by_resume(unit([[1, 0]]), ["a"])
+    with pytest.raises(ValueError):
+        list(score_jds(unit([[1, 0]]), chunks, starts, 0))
+
+
+def test_load_jds_from_csv_and_folder(tmp_path):
+    (tmp_path / "jds.csv").write_text('jd_id,job_description\n7,"Java, Spring"\n8,Python\n')
+    assert load_jds(str(tmp_path / "jds.csv")) == (["7", "8"], ["Java, Spring", "Python"])
+    folder = tmp_path / "jds"
+    folder.mkdir()
+    (folder / "backend.txt").write_text("Go developer", encoding="utf-8")
+    (folder / "notes.md").write_text("ignored")
+    assert load_jds(str(folder)) == (["backend"], ["Go developer"])
+
+
+def test_load_chunk_matrix_pages_and_normalizes(collection, monkeypatch):
+    import batch_shortlist
+    monkeypatch.setattr(batch_shortlist, "PAGE_SIZE", 2)
+    collection.add(ids=["1", "2", "3"], embeddings=[[3.0, 4.0], [1.0, 0.0], [0.0, 2.0]],
+                   metadatas=[{"resume_id": "r1"}, {"source": "a.pdf"}, {"resume_id": "r1"}])
+    matrix, keys = load_chunk_matrix(collection)
+    assert matrix.shape == (3, 2)
+    assert np.allclose(np.linalg.norm(matrix, axis=1), 1.0)
+    assert sorted(keys) == ["a.pdf", "r1", "r1"]
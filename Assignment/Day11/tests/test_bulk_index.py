@@ -0,0 +1,61 @@
+import os
+from bulk_index import run_bulk_index, build_indexer
+from resume_sync import save_manifest, file_sha256, MANIFEST_FILE
+
+
+def test_dry_run_only_reads_the_manifest(tmp_path):
+    resumes = tmp_path / "resumes"
+    resumes.mkdir()
+    (resumes / "a.pdf").write_bytes(b"%PDF-1.4 a")
+    (resumes / "b.pdf").write_bytes(b"%PDF-1.4 b")
+    persist_dir = tmp_path / "store"
+
+    report = run_bulk_index(str(resumes), persist_dir=str(persist_dir), dry_run=True)
+    assert (report["added"], report["updated"], report["deleted"]) == (2, 0, 0)
+    assert report["dry_run"]
+    assert not persist_dir.exists()
+
+
+def test_dry_run_counts_against_an_existing_manifest(tmp_path):
+    resumes = tmp_path / "resumes"
+    resumes.mkdir()
+    (resumes / "a.pdf").write_bytes(b"%PDF-1.4 a")
+    (resumes / "b.pdf").write_bytes(b"%PDF-1.4 b")
+    persist_dir = tmp_path / "store"
+    persist_dir.mkdir()
+    stat = os.stat(resumes / "a.pdf")
+    manifest = {
+        "a.pdf": {"sha256": file_sha256(resumes / "a.pdf"), "mtime": stat.st_mtime, "size": stat.st_size},
+        "b.pdf": {"sha256": "old", "mtime": 0, "size": 0},
+        "gone.pdf": {"sha256": "x", "mtime": 0, "size": 0},
+    }
+    save_manifest(str(persist_dir / MANIFEST_FILE), manifest)
+
+    report = run_bulk_index(str(resumes), persist_dir=str(persist_dir), dry_run=True)
+    assert (report["added"], report["updated"], report["deleted"], report["unchanged"]) == (0, 1, 1, 1)
+    assert os.listdir(persist_dir) == [MANIFEST_FILE]
+    report = run_bulk_index(str(resumes), persist_dir=str(persist_dir), dry_run=True, prune=False)
+    assert report["deleted"] == 0
+
+
+def test_base_url_is_read_when_the_indexer_is_built(tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_BASE_URL", "http://127.0.0.1:9/v1")
+    parts = build_indexer(str(tmp_path / "store"))
+    assert str(parts["batched"].embed_model.openai_api_base) == "http://127.0.0.1:9/v1"
+
+
+def test_profile_extraction_uses_the_env_base_url(tmp_path, monkeypatch):
+    import bulk_index
+    monkeypatch.setenv("LLM_BASE_URL", "http://127.0.0.1:9/v1")
+    seen = {}
+
+    def fake_chat_model(**kwargs):
+        seen.update(kwargs)
+        return object()
+
+    monkeypatch.setattr(bulk_index, "init_chat_model", fake_chat_model)
+    resumes = tmp_path / "resumes"
+    resumes.mkdir()
+    report = run_bulk_index(str(resumes), persist_dir=str(tmp_path / "store"), extract_profiles=True)
+    assert seen["base_url"] == "http://127.0.0.1:9/v1"
+    assert report["profiles"]["done"] == 0
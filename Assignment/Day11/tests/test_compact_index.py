@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+from compact_index import CompactIndex, CompactVectorStore, normalize
+
+
+def clustered(n, dim=64, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, n // 20), dim))
+    return (centers[rng.integers(0, len(centers), n)] + 0.5 * rng.normal(size=(n, dim))).astype(np.float32)
+
+
+def recall_at_k(index, vectors, queries, k=10):
+    unit = normalize(vectors)
+    hits = 0
+    for q in queries:
+        truth = set(np.argsort(-(unit @ normalize(q)))[:k].tolist())
+        hits += len(truth & {int(chunk_id) for chunk_id, _ in index.search(q, k)})
+    return hits / (k * len(queries))
+
+
+@pytest.mark.parametrize("dtype,n_lists,rescore,floor", [
+    ("float16", 0, 0, 0.99),
+    ("int8", 0, 0, 0.95),
+    ("int8", 0, 50, 0.99),
+    ("int8", 16, 50, 0.9),
+])
+def test_recall_against_exact_search(dtype, n_lists, rescore, floor):
+    vectors = clustered(2000)
+    queries = vectors[:50] + 0.3 * np.random.default_rng(1).normal(size=(50, vectors.shape[1]))
+    index = CompactIndex(dtype, n_lists=n_lists, n_probe=8, rescore=rescore)
+    index.build([str(i) for i in range(len(vectors))], vectors, [{"source": f"r{i // 10}"} for i in range(2000)])
+    assert recall_at_k(index, vectors, queries) >= floor
+
+
+def test_where_limits_search_to_one_resume():
+    vectors = clustered(200)
+    index = CompactIndex("int8", rescore=0)
+    index.build([str(i) for i in range(200)], vectors, [{"source": f"r{i // 10}"} for i in range(200)])
+    hits = index.search(vectors[0], k=20, where={"source": "r5"})
+    assert sorted(int(chunk_id) for chunk_id, _ in hits) == list(range(50, 60))
+    hits = index.search(vectors[0], k=30, where={"source": {"$in": ["r1", "r2"]}})
+    assert len(hits) == 20
+
+
+def test_save_and_load_round_trip(tmp_path):
+    vectors = clustered(300)
+    index = CompactIndex("int8", n_lists=4, rescore=20)
+    index.build([str(i) for i in range(300)], vectors, [{"source": f"r{i // 10}"} for i in range(300)],
+                version=3, full_path=str(tmp_path / "int8_full_f32.npy"))
+    index.save(str(tmp_path))
+    loaded = CompactIndex("int8", n_lists=4, rescore=20)
+    assert loaded.load(str(tmp_path))
+    assert loaded.version == 3 and loaded.full is not None
+    assert loaded.search(vectors[7], k=5) == index.search(vectors[7], k=5)
+
+
+class CountingCollection:
+    """Chroma collection wrapper that counts the embeddings it hands out."""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.embeddings_read = 0
+
+    def get(self, **kwargs):
+        result = self.collection.get(**kwargs)
+        if "embeddings" in kwargs.get("include", []):
+            self.embeddings_read += len(result["ids"])
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+
+def add_chunks(collection, start, stop, vectors):
+    collection.add(ids=[f"r{i // 10}.pdf_{i}" for i in range(start, stop)],
+                   embeddings=vectors[start:stop].tolist(),
+                   documents=[f"chunk {i}" for i in range(start, stop)],
+                   metadatas=[{"source": f"r{i // 10}.pdf"} for i in range(start, stop)])
+
+
+def test_store_without_version_fn_builds_once(collection, tmp_path):
+    vectors = clustered(100)
+    add_chunks(collection, 0, 100, vectors)
+    counting = CountingCollection(collection)
+    store = CompactVectorStore(counting, str(tmp_path), version_fn=None)
+    for _ in range(3):
+        store.query(query_embeddings=[vectors[0].tolist()], n_results=5)
+    assert counting.embeddings_read == 100
+
+
+def test_empty_store_is_not_rebuilt_per_query(collection, tmp_path):
+    counting = CountingCollection(collection)
+    builds = []
+    store = CompactVectorStore(counting, str(tmp_path), version_fn=lambda: 1)
+    store._build = lambda version, previous=None, build=store._build: builds.append(version) or build(version, previous)
+    for _ in range(3):
+        assert store.query(query_embeddings=[[1.0] * 8], n_results=5)["ids"] == [[]]
+    assert builds == [1]
+
+
+def test_version_bump_rebuilds_in_background_reading_only_new_chunks(collection, tmp_path):
+    vectors = clustered(150)
+    add_chunks(collection, 0, 100, vectors)
+    counting = CountingCollection(collection)
+    version = [1]
+    store = CompactVectorStore(counting, str(tmp_path), version_fn=lambda: version[0])
+    store.query(query_embeddings=[vectors[0].tolist()], n_results=5)
+    assert counting.embeddings_read == 100 and len(store.index) == 100
+
+    add_chunks(collection, 100, 150, vectors)
+    collection.delete(ids=[f"r0.pdf_{i}" for i in range(10)])
+    version[0] = 2
+    store.refresh()
+    store.wait()
+    assert store.last_error is None
+    assert counting.embeddings_read == 150
+    assert store.index.version == 2 and len(store.index) == 140
+    hits = store.query(query_embeddings=[vectors[120].tolist()], n_results=1)
+    assert hits["ids"][0] == ["r12.pdf_120"]
+    # only the current rescoring file is left on disk
+    assert sorted(p.name for p in tmp_path.glob("*.npy")) == [store.index.full_file]
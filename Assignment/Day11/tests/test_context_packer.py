@@ -0,0 +1,43 @@
+from context_packer import pack_context, overlap_length, chunks_from_query, context_budget, count_tokens
+
+
+def chunk(chunk_id, text, score):
+    return {"chunk_id": chunk_id, "text": text, "score": score}
+
+
+def test_overlap_length():
+    assert overlap_length("skills: java spring boot and kafka", "spring boot and kafka, aws") == 21
+    assert overlap_length("abc xyz", "xyz def") == 0           # shorter than min_overlap
+    assert overlap_length("no shared text here", "something else") == 0
+
+
+def test_best_chunks_within_budget_in_document_order():
+    chunks = [chunk(0, "a " * 30, 0.1), chunk(1, "b " * 30, 0.9), chunk(2, "c " * 30, 0.8)]
+    budget = 2 * (count_tokens("b " * 30) + count_tokens("\n"))
+    packed = pack_context(chunks, budget)
+    assert "a a" not in packed
+    assert packed.index("b b") < packed.index("c c")
+    assert count_tokens(packed) <= budget
+
+
+def test_chunk_that_does_not_fit_is_skipped_not_truncated():
+    chunks = [chunk(0, "long " * 200, 0.9), chunk(1, "short text", 0.5)]
+    assert pack_context(chunks, 20) == "short text"
+    assert pack_context(chunks, 0) == ""
+
+
+def test_splitter_overlap_between_neighbours_is_removed():
+    shared = "spring boot and kafka"
+    chunks = [chunk(3, "java developer with " + shared, 0.9), chunk(4, shared + " on aws", 0.8)]
+    assert pack_context(chunks, 1000) == "java developer with " + shared + "\n on aws"
+    # not neighbours: both kept whole
+    chunks[1]["chunk_id"] = 6
+    assert pack_context(chunks, 1000).count(shared) == 2
+
+
+def test_chunks_from_query_and_budget():
+    results = {"documents": [["x", "y"]], "metadatas": [[{"chunk_id": 5}, None]], "distances": [[0.0, 1.0]]}
+    assert chunks_from_query(results) == [{"text": "x", "score": 1.0, "chunk_id": 5},
+                                          {"text": "y", "score": 0.5, "chunk_id": 1}]
+    assert context_budget("", context_window=1000, answer_tokens=200) == 800
+    assert context_budget("word " * 5000, context_window=1000, answer_tokens=200) == 0
@@ -0,0 +1,69 @@
+import pytest
+from dedup_index import DuplicateIndex, DuplicateResume, minhash_signature, estimated_jaccard
+
+RESUME = (
+    "Asha Patil, Pune. Java developer with six years of experience building Spring Boot microservices, "
+    "REST APIs and Kafka pipelines for retail banking. Led the migration of a monolith to Kubernetes on AWS, "
+    "cut release time from weeks to days and mentored four junior engineers. Skills: Java, Spring, SQL, Docker."
+)
+OTHER = (
+    "Rahul Mehta, Mumbai. Data analyst who builds Power BI dashboards and SQL reports for a logistics firm, "
+    "automates Excel workflows with Python and pandas, and presents monthly KPIs to the operations team."
+)
+
+
+def test_signature_estimates_jaccard():
+    same = minhash_signature(RESUME)
+    assert estimated_jaccard(same, minhash_signature(RESUME)) == 1.0
+    assert estimated_jaccard(same, minhash_signature(RESUME.replace("four", "five"))) > 0.7
+    assert estimated_jaccard(same, minhash_signature(OTHER)) < 0.1
+    assert minhash_signature("") is None
+
+
+def test_skip_mode_rejects_near_duplicates(tmp_path):
+    index = DuplicateIndex(str(tmp_path / "dedup.sqlite"), threshold=0.8)
+    signature, matches = index.check("asha.pdf", RESUME, mode="skip")
+    assert matches == []
+    index.add("asha.pdf", signature)
+
+    with pytest.raises(DuplicateResume) as error:
+        index.check("asha_copy.pdf", RESUME + " References on request.", mode="skip")
+    assert error.value.duplicate_of == "asha.pdf"
+    # the same resume re-uploaded under its own name is not its own duplicate
+    assert index.check("asha.pdf", RESUME, mode="skip")[1] == []
+    signature, matches = index.check("rahul.pdf", OTHER, mode="skip")
+    assert matches == []
+
+
+def test_flag_mode_indexes_and_clusters(tmp_path):
+    index = DuplicateIndex(str(tmp_path / "dedup.sqlite"), threshold=0.8)
+    for source, text in [("asha.pdf", RESUME), ("asha_v2.pdf", RESUME + " Open to relocation."), ("rahul.pdf", OTHER)]:
+        signature, _ = index.check(source, text, mode="flag")
+        index.add(source, signature)
+    assert len(index) == 3
+    clusters = index.clusters()
+    assert len(clusters) == 1
+    assert sorted(source for source, _ in clusters[0]) == ["asha.pdf", "asha_v2.pdf"]
+
+    index.remove("asha_v2.pdf")
+    assert index.clusters() == []
+
+
+def test_signature_matches_exact_integer_arithmetic():
+    from dedup_index import shingle_hashes, _A, _B, _PRIME
+    hashes = [int(x) for x in shingle_hashes(RESUME)]
+    expected = [min((int(a) * x + int(b)) % _PRIME for x in hashes) & 0xFFFFFFFF for a, b in zip(_A, _B)]
+    assert minhash_signature(RESUME).tolist() == expected
+
+
+def test_check_leaves_alias_recording_to_the_caller(tmp_path):
+    index = DuplicateIndex(str(tmp_path / "dedup.sqlite"), threshold=0.8)
+    index.add("asha.pdf", minhash_signature(RESUME))
+    index.add("rahul.pdf", minhash_signature(OTHER))
+    # an update of rahul.pdf that repeats asha.pdf is refused, rahul.pdf keeps its old version
+    with pytest.raises(DuplicateResume):
+        index.check("rahul.pdf", RESUME, mode="skip")
+    assert index.clusters() == []
+
+    index.add_alias("asha_copy.pdf", "asha.pdf", 1.0)
+    assert index.clusters() == [[("asha.pdf", "indexed"), ("asha_copy.pdf", "skipped, duplicate of asha.pdf")]]
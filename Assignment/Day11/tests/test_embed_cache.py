@@ -0,0 +1,89 @@
+import time
+from embed_cache import CachedEmbeddings, QueryEmbeddingCache
+from hash_embeddings import HashEmbeddings
+
+
+class CountingEmbeddings(HashEmbeddings):
+    def __init__(self):
+        super().__init__()
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded += texts
+        return super().embed_documents(texts)
+
+
+def cached(tmp_path, inner, **kwargs):
+    return CachedEmbeddings(inner, path=str(tmp_path / "cache.sqlite"), model_name="m",
+                            query_cache=QueryEmbeddingCache(), **kwargs)
+
+
+def test_only_misses_are_embedded_once(tmp_path):
+    inner = CountingEmbeddings()
+    cache = cached(tmp_path, inner)
+    vectors = cache.embed_documents(["java", "python", "java"])
+    assert inner.embedded == ["java", "python"]
+    assert vectors[0] == vectors[2] == HashEmbeddings().embed_query("java")
+    assert cache.embed_documents(["python", "java"]) == [vectors[1], vectors[0]]
+    assert inner.embedded == ["java", "python"]
+    assert cache.last_stats["hits"] == 2 and cache.last_stats["misses"] == 0
+
+    # the cache is on disk, a new process starts warm
+    again = cached(tmp_path, CountingEmbeddings())
+    again.embed_documents(["java"])
+    assert again.embed_model.embedded == []
+
+
+def test_least_recently_used_rows_are_evicted(tmp_path):
+    inner = CountingEmbeddings()
+    cache = cached(tmp_path, inner, max_entries=2)
+    cache.embed_documents(["a"])
+    time.sleep(0.01)
+    cache.embed_documents(["b"])
+    time.sleep(0.01)
+    cache.embed_documents(["a"])          # a is now more recent than b
+    time.sleep(0.01)
+    cache.embed_documents(["c"])          # evicts b
+    assert cache.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] == 2
+    inner.embedded.clear()
+    cache.embed_documents(["a", "b", "c"])
+    assert inner.embedded == ["b"]
+
+
+def test_models_do_not_share_vectors(tmp_path):
+    inner = CountingEmbeddings()
+    cached(tmp_path, inner).embed_documents(["java"])
+    other = CachedEmbeddings(inner, path=str(tmp_path / "cache.sqlite"), model_name="other",
+                             query_cache=QueryEmbeddingCache())
+    other.embed_documents(["java"])
+    assert inner.embedded == ["java", "java"]
+
+
+def test_query_cache_is_keyed_by_model():
+    cache = QueryEmbeddingCache(maxsize=3)
+    cache.put("nomic", "Java  Developer", [1.0])
+    assert cache.get("nomic", "java developer") == [1.0]
+    # another model misses, and does not wipe the first model's entries
+    assert cache.get("minilm", "java developer") is None
+    cache.put("minilm", "java developer", [2.0])
+    assert cache.get("nomic", "java developer") == [1.0]
+    assert cache.get("minilm", "java developer") == [2.0]
+
+    cache.put("nomic", "python", [3.0])
+    cache.get("nomic", "java developer")
+    cache.put("nomic", "sql", [4.0])            # evicts the least recently used: minilm
+    assert cache.get("minilm", "java developer") is None
+    assert cache.stats()["size"] == 3
+
+
+def test_embed_query_uses_the_cache_of_its_model(tmp_path):
+    inner = CountingEmbeddings()
+    queries = QueryEmbeddingCache()
+    calls = []
+    inner.embed_query = lambda text: calls.append(text) or [float(len(calls))]
+    a = CachedEmbeddings(inner, path=str(tmp_path / "cache.sqlite"), model_name="a", query_cache=queries)
+    b = CachedEmbeddings(inner, path=str(tmp_path / "cache.sqlite"), model_name="b", query_cache=queries)
+    assert a.embed_query("Java") == a.embed_query("java ") == [1.0]
+    assert b.embed_query("java") == [2.0]
+    assert a.embed_query("JAVA") == [1.0]
+    assert len(calls) == 2
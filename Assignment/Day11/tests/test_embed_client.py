@@ -0,0 +1,58 @@
+import threading
+import pytest
+from embed_client import BatchedEmbeddings
+from hash_embeddings import HashEmbeddings
+
+
+class FlakyEmbeddings(HashEmbeddings):
+    """Fails the first `failures` requests with a transient error, records every batch it serves."""
+
+    def __init__(self, failures=0):
+        super().__init__()
+        self.failures = failures
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self._lock:
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("server busy")
+            self.batches.append(list(texts))
+        return super().embed_documents(texts)
+
+
+def test_batches_run_concurrently_but_keep_the_text_order():
+    inner = FlakyEmbeddings()
+    batched = BatchedEmbeddings(inner, batch_size=3, max_in_flight=4)
+    texts = [f"resume chunk {i}" for i in range(20)]
+    vectors, stats = batched.embed_documents_with_stats(texts)
+    assert vectors == HashEmbeddings().embed_documents(texts)
+    assert sorted(len(b) for b in inner.batches) == [2] + [3] * 6
+    assert (stats["chunks"], stats["batches"], stats["retries"]) == (20, 7, 0)
+
+
+def test_transient_errors_are_retried_and_counted_per_call():
+    batched = BatchedEmbeddings(FlakyEmbeddings(failures=2), batch_size=4, max_in_flight=1, backoff=0)
+    vectors, stats = batched.embed_documents_with_stats(["a", "b", "c"])
+    assert vectors == HashEmbeddings().embed_documents(["a", "b", "c"])
+    assert stats["retries"] == 2
+    # the next call starts from zero instead of inheriting the count
+    assert batched.embed_documents_with_stats(["d"])[1]["retries"] == 0
+
+
+def test_retries_give_up_after_max_retries():
+    batched = BatchedEmbeddings(FlakyEmbeddings(failures=5), max_retries=2, backoff=0)
+    with pytest.raises(ConnectionError):
+        batched.embed_documents(["a"])
+
+
+def test_last_stats_are_per_thread():
+    batched = BatchedEmbeddings(FlakyEmbeddings(), batch_size=2)
+    batched.embed_documents(["a", "b", "c"])
+    seen = {}
+    other = threading.Thread(target=lambda: seen.update(batched.last_stats))
+    other.start()
+    other.join()
+    assert batched.last_stats["chunks"] == 3
+    assert seen["chunks"] == 0
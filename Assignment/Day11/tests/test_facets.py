@@ -0,0 +1,112 @@
+import pytest
+from facets import (query_constraints, constraints_where, constraints_text, prefilter_sources, years_bounds,
+                    resume_facets, facet_metadata, extract_skills, backfill_chunk_facets, UNKNOWN_YEARS)
+from resume_catalog import ResumeCatalog
+
+
+def test_skill_spellings_do_not_overlap():
+    assert extract_skills("JavaScript and C++ developer") == ["c++", "javascript"]
+    assert extract_skills("Core Java, Spring Boot, k8s") == ["java", "kubernetes", "spring"]
+
+
+def test_mentioned_skills_are_not_hard_filters():
+    constraints = query_constraints("python or java developer")
+    assert constraints["skills"] == [] and constraints["any_skills"] == []
+    assert constraints_where(constraints) is None
+
+
+@pytest.mark.parametrize("query,skills,any_skills", [
+    ("Must have Python or Java", [], [["java", "python"]]),
+    ("Must know Python, Django and AWS. Based in Pune", ["aws", "django", "python"], []),
+    ("Python and Django are mandatory", ["django", "python"], []),
+    ("must know React and Node or Angular", ["react"], [["angular", "node.js"]]),
+    ("Required: Django/Flask", [], [["django", "flask"]]),
+    ("Must know node.js. Java is nice to have", ["node.js"], []),
+    # Go is not in the vocabulary, so the choice cannot be checked
+    ("Python, Java or Go required", [], []),
+])
+def test_required_skills(query, skills, any_skills):
+    constraints = query_constraints(query)
+    assert constraints["skills"] == skills
+    assert constraints["any_skills"] == any_skills
+
+
+@pytest.mark.parametrize("query,min_years,max_years", [
+    ("5+ years of Java", 5, None),
+    ("at least 4 years", 4, None),
+    ("more than 5 years", 6, None),
+    ("less than 3 years of React", None, 2),
+    ("under 2 years", None, 1),
+    ("at most 8 years", None, 8),
+    ("3-5 years", 3, 5),
+    ("3 to 5 yrs", 3, 5),
+    ("fresher", None, None),
+])
+def test_years_bounds(query, min_years, max_years):
+    assert years_bounds(query) == (min_years, max_years)
+
+
+def test_years_and_city_are_hard_only_in_required_clauses():
+    constraints = query_constraints("Java developer in Pune with 5 years, remote is fine")
+    assert (constraints["min_years"], constraints["location"]) == (None, None)
+    constraints = query_constraints("Java developer. 5+ years required. Must be based in Pune")
+    assert (constraints["min_years"], constraints["location"]) == (5, "pune")
+
+
+def test_constraints_where_uses_or_and_upper_bounds():
+    where = constraints_where(query_constraints("Must have Python or Java, under 3 years, Pune"))
+    assert where == {"$and": [
+        {"$or": [{"skill_java": True}, {"skill_python": True}]},
+        {"years_exp": {"$lte": 2}},
+        {"location": "pune"},
+    ]}
+    assert constraints_where(query_constraints("must have 4+ years")) == {
+        "$or": [{"years_exp": {"$gte": 4}}, {"years_exp": UNKNOWN_YEARS}]}
+    assert constraints_text(query_constraints("Must have Python or Java, 3-5 years")) == "java or python, 3-5 years"
+
+
+def test_backfilled_chunks_match_where_filters(collection):
+    collection.add(ids=["a0", "a1", "b0"], documents=["Python developer, Pune", "Django, 3 years", "Java, Mumbai"],
+                   embeddings=[[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]],
+                   metadatas=[{"resume_id": "a", "chunk_id": 0}, {"resume_id": "a", "chunk_id": 1},
+                              {"resume_id": "b", "chunk_id": 0}])
+    where = constraints_where(query_constraints("Must have Python, at least 2 years"))
+    assert collection.get(where=where)["ids"] == []
+
+    assert backfill_chunk_facets(collection, "resume_id") == 2
+    assert sorted(collection.get(where=where)["ids"]) == ["a0", "a1"]
+    assert collection.get(ids=["b0"])["metadatas"][0]["years_exp"] == UNKNOWN_YEARS
+    assert backfill_chunk_facets(collection, "resume_id") == 0
+    assert facet_metadata(resume_facets("Java, Mumbai"))["years_exp"] == UNKNOWN_YEARS
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = ResumeCatalog(str(tmp_path / "catalog.sqlite"))
+    resumes = {
+        "py.pdf": "Python developer, Django, 2 years, Pune",
+        "java.pdf": "Java developer, Spring, 6 years, Mumbai",
+        "both.pdf": "Python and Java engineer, 4 years, Pune",
+        "new.pdf": "React developer, Pune",
+    }
+    for source, text in resumes.items():
+        catalog.upsert(source, source, 1, facets=resume_facets(text))
+    return catalog
+
+
+def test_filter_sources_any_of_and_year_bounds(catalog):
+    assert catalog.filter_sources(query_constraints("data analyst")) is None
+    assert catalog.filter_sources(query_constraints("Must have Python or Java")) == {"py.pdf", "java.pdf", "both.pdf"}
+    assert catalog.filter_sources(query_constraints("Must have Python and Java")) == {"both.pdf"}
+    # unknown experience (new.pdf) passes the bounds
+    assert catalog.filter_sources(query_constraints("must have less than 5 years")) == {"py.pdf", "both.pdf", "new.pdf"}
+    assert catalog.filter_sources(query_constraints("must have 3-5 years, must be in Pune")) == {"both.pdf", "new.pdf"}
+    assert catalog.filter_sources(query_constraints("3-5 years in Pune")) is None
+
+
+def test_prefilter_falls_back_when_nothing_matches(catalog):
+    sources, note = prefilter_sources(catalog, "Must have Python or Java, 3-5 years")
+    assert sources == {"both.pdf"}
+    assert "1 of 4" in note
+    sources, note = prefilter_sources(catalog, "Must have Python, more than 10 years")
+    assert sources is None and note.startswith("No resume meets")
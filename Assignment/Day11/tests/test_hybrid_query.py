@@ -0,0 +1,79 @@
+import numpy as np
+from lexical_index import LexicalIndex, rrf_fuse, hybrid_query, embedding_distances
+from ranking import rank_resumes
+
+
+def test_rrf_fuse_sums_reciprocal_ranks():
+    fused = dict(rrf_fuse([["a", "b", "c"], ["c", "a"]], rrf_k=60))
+    assert fused["a"] == 1 / 61 + 1 / 62
+    assert fused["c"] == 1 / 63 + 1 / 61
+    assert fused["b"] == 1 / 62
+    assert [doc_id for doc_id, _ in rrf_fuse([["a", "b", "c"], ["c", "a"]])] == ["a", "c", "b"]
+
+
+def fill(collection, tmp_path):
+    vectors = {
+        "a.pdf_0": [1.0, 0.0, 0.0],
+        "a.pdf_1": [0.9, 0.1, 0.0],
+        "b.pdf_0": [0.0, 1.0, 0.0],
+        "c.pdf_0": [0.0, 0.0, 1.0],
+    }
+    texts = {
+        "a.pdf_0": "java spring developer",
+        "a.pdf_1": "microservices on kubernetes",
+        "b.pdf_0": "react frontend",
+        "c.pdf_0": "kotlin android developer with kafka",
+    }
+    ids = list(vectors)
+    metadatas = [{"source": chunk_id.rsplit("_", 1)[0]} for chunk_id in ids]
+    collection.add(ids=ids, embeddings=[vectors[i] for i in ids], documents=[texts[i] for i in ids],
+                   metadatas=metadatas)
+    lexical = LexicalIndex(str(tmp_path / "lexical.sqlite"))
+    lexical.add(ids, [texts[i] for i in ids], metadatas)
+    return vectors, lexical
+
+
+def test_vector_hits_keep_chroma_distances(collection, tmp_path):
+    vectors, lexical = fill(collection, tmp_path)
+    query = [1.0, 0.05, 0.0]
+    results = hybrid_query(collection, lexical, query, "java kafka", n_results=10, vector_pool=2)
+    chroma = collection.query(query_embeddings=[query], n_results=2)
+    got = dict(zip(results["ids"][0], results["distances"][0]))
+    for chunk_id, distance in zip(chroma["ids"][0], chroma["distances"][0]):
+        assert got[chunk_id] == distance
+
+
+def test_keyword_only_hit_gets_its_vector_distance(collection, tmp_path):
+    vectors, lexical = fill(collection, tmp_path)
+    query = [1.0, 0.05, 0.0]
+    # c.pdf_0 is outside the vector pool, only "kafka" brings it in
+    results = hybrid_query(collection, lexical, query, "kafka", n_results=10, vector_pool=2)
+    got = dict(zip(results["ids"][0], results["distances"][0]))
+    assert "c.pdf_0" in got
+    expected = embedding_distances(query, [vectors["c.pdf_0"]], "l2")[0]
+    assert np.isclose(got["c.pdf_0"], expected)
+    # far from the query, so it cannot outscore a close vector hit on similarity
+    assert got["c.pdf_0"] > got["a.pdf_0"]
+    ranked = rank_resumes(results, method="max", top_k=3)
+    assert ranked[0]["source"] == "a.pdf"
+
+
+def test_results_follow_fused_order_and_sources_filter(collection, tmp_path):
+    _, lexical = fill(collection, tmp_path)
+    query = [1.0, 0.05, 0.0]
+    results = hybrid_query(collection, lexical, query, "developer", n_results=10, vector_pool=3)
+    lexical_ids = [chunk_id for chunk_id, _ in lexical.search("developer", 20)]
+    vector_ids = collection.query(query_embeddings=[query], n_results=3)["ids"][0]
+    assert results["ids"][0] == [chunk_id for chunk_id, _ in rrf_fuse([vector_ids, lexical_ids])]
+
+    filtered = hybrid_query(collection, lexical, query, "developer", vector_pool=3, sources={"c.pdf"})
+    assert filtered["ids"][0] == ["c.pdf_0"]
+
+
+def test_distance_spaces_match_chroma():
+    query = [0.6, 0.8]
+    vectors = [[1.0, 0.0], [0.0, 2.0]]
+    assert np.allclose(embedding_distances(query, vectors, "l2"), [0.16 + 0.64, 0.36 + 1.44])
+    assert np.allclose(embedding_distances(query, vectors, "cosine"), [0.4, 0.2])
+    assert np.allclose(embedding_distances(query, vectors, "ip"), [0.4, -0.6])
+    assert np.allclose(embedding_distances(query, vectors, "unit_l2"), [0.8, 0.4])
@@ -0,0 +1,55 @@
+from ingest_pipeline import IngestPipeline, STAGES
+
+
+def run(items, **kwargs):
+    stored = []
+
+    def parse(item):
+        if item["name"] == "broken.pdf":
+            raise ValueError("not a PDF")
+        return item["data"].split(".")
+
+    def embed(item):
+        if item["name"] == "timeout.pdf":
+            raise TimeoutError("embedding server")
+        return [[float(len(c))] for c in item["split"]]
+
+    pipeline = IngestPipeline(
+        parse_fn=parse,
+        split_fn=lambda item: [c for c in item["parse"] if c],
+        embed_fn=embed,
+        store_fn=lambda batch: stored.append([item["name"] for item in batch]),
+        **kwargs
+    ).start(items)
+    pipeline.join(timeout=10)
+    assert not pipeline.is_alive()
+    return pipeline, stored
+
+
+def test_every_file_goes_through_every_stage():
+    items = [{"name": f"r{i}.pdf", "data": "Java. Spring. SQL"} for i in range(10)]
+    pipeline, stored = run(items)
+    assert sorted(item["name"] for item in pipeline.results) == sorted(item["name"] for item in items)
+    assert pipeline.errors == []
+    assert pipeline.counts == {stage: 10 for stage in STAGES}
+    assert pipeline.progress() == {stage: 1.0 for stage in STAGES}
+    assert items[0]["embed"] == [[4.0], [7.0], [4.0]]
+
+
+def test_a_failing_file_is_skipped_by_later_stages():
+    items = [{"name": "ok.pdf", "data": "Java"}, {"name": "broken.pdf", "data": ""},
+             {"name": "timeout.pdf", "data": "Python"}]
+    pipeline, stored = run(items)
+    assert [item["name"] for item in pipeline.results] == ["ok.pdf"]
+    assert sorted(pipeline.errors) == [("broken.pdf", "parse: not a PDF"),
+                                       ("timeout.pdf", "embed: embedding server")]
+    assert "split" not in items[1]
+    assert pipeline.counts["store"] == 3
+
+
+def test_store_writes_are_batched_across_files():
+    items = [{"name": f"r{i}.pdf", "data": "a.b.c.d"} for i in range(6)]
+    pipeline, stored = run(items, parse_workers=1, store_batch_chunks=8)
+    # 4 chunks per file: a write every second file
+    assert [len(batch) for batch in stored] == [2, 2, 2]
+    assert [name for batch in stored for name in batch] == [item["name"] for item in items]
@@ -0,0 +1,80 @@
+import os
+import parallel_loader
+from concurrent.futures.process import BrokenProcessPool
+from parallel_loader import iter_parsed_pdfs
+
+
+def crash_once(path):
+    """Kills its worker process the first time it sees a path named crash*.pdf."""
+    marker = path + ".seen"
+    if os.path.basename(path).startswith("crash") and not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return parallel_loader.PyPDFLoader(path).load()
+
+
+def crash_always(path):
+    os._exit(1)
+
+
+def parsed(results):
+    return {os.path.basename(path): (docs, error) for path, docs, error in results}
+
+
+def test_a_broken_file_does_not_stop_the_batch(make_pdf, tmp_path):
+    good = [make_pdf(f"r{i}.pdf", f"Resume {i} Python developer") for i in range(3)]
+    bad = tmp_path / "bad.pdf"
+    bad.write_bytes(b"not a pdf at all")
+    for workers in (1, 2):
+        results = parsed(iter_parsed_pdfs(good + [str(bad)], workers=workers))
+        assert len(results) == 4
+        assert results["bad.pdf"][0] == [] and results["bad.pdf"][1] is not None
+        for i in range(3):
+            docs, error = results[f"r{i}.pdf"]
+            assert error is None and f"Resume {i}" in docs[0].page_content
+
+
+def test_files_are_retried_once_after_a_worker_dies(make_pdf, monkeypatch):
+    monkeypatch.setattr(parallel_loader, "parse_pdf", crash_once)
+    paths = [make_pdf("crash.pdf", "Crashes the first parser"), make_pdf("ok.pdf", "Parses fine")]
+    results = parsed(iter_parsed_pdfs(paths, workers=2))
+    assert os.path.exists(paths[0] + ".seen")
+    assert results["crash.pdf"][1] is None and "Crashes" in results["crash.pdf"][0][0].page_content
+    assert results["ok.pdf"][1] is None
+
+
+def test_a_file_that_keeps_crashing_is_reported(make_pdf, monkeypatch):
+    monkeypatch.setattr(parallel_loader, "parse_pdf", crash_always)
+    paths = [make_pdf("a.pdf", "a"), make_pdf("b.pdf", "b")]
+    results = parsed(iter_parsed_pdfs(paths, workers=2))
+    assert sorted(results) == ["a.pdf", "b.pdf"]
+    assert all(isinstance(error, BrokenProcessPool) for _, error in results.values())
+
+
+# ---------------- IN-MEMORY PDFS ----------------
+def test_memoryview_stream_reads_and_seeks_without_copying():
+    data = bytearray(b"0123456789")
+    stream = parallel_loader.MemoryviewStream(memoryview(data))
+    assert stream.read(4) == b"0123"
+    assert stream.seek(-3, os.SEEK_END) == 7 and stream.read() == b"789"
+    assert stream.read(5) == b""
+    assert stream.seek(2) == 2 and stream.seek(3, os.SEEK_CUR) == 5
+    assert stream.seek(-100, os.SEEK_CUR) == 0
+    data[0:1] = b"X"                     # a view, not a copy of the buffer
+    assert stream.read(2) == b"X1"
+
+
+def test_load_pdf_bytes_matches_the_file_loader(make_pdf):
+    path = make_pdf("asha.pdf", "Asha Patil Java developer")
+    with open(path, "rb") as f:
+        docs = parallel_loader.load_pdf_bytes(memoryview(f.read()), "asha.pdf")
+    from_file = parallel_loader.parse_pdf(path)
+    assert [d.page_content for d in docs] == [d.page_content for d in from_file]
+    assert docs[0].metadata == {"source": "asha.pdf", "page": 0}
+
+
+def test_persist_in_background_writes_the_upload(tmp_path):
+    target = tmp_path / "uploads" / "asha.pdf"
+    assert parallel_loader.persist_in_background(memoryview(b"%PDF-1.4 x"), str(target)).result() == str(target)
+    assert target.read_bytes() == b"%PDF-1.4 x"
+    assert not os.path.exists(str(target) + ".part")
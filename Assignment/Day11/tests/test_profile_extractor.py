@@ -0,0 +1,89 @@
+import json
+import pytest
+from facets import resume_facets
+from resume_catalog import ResumeCatalog
+from profile_extractor import (parse_profile, profile_text, extract_profile, ensure_profile, backfill_profiles,
+                               trim_to_budget, PROFILE_FIELDS)
+from context_packer import count_tokens
+
+
+class FakeLLM:
+    """Answers every prompt with a fixed reply, or raises for resumes that mention "fail"."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.prompts = []
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        if "fail" in prompt.split("RESUME:")[1]:
+            raise TimeoutError("model busy")
+        return self.reply
+
+
+def test_json_reply_inside_chatter():
+    raw = 'Sure! Here it is:\n{"name": "Asha Patil", "primary_skills": ["Java", "Spring"], "company": ""}\nThanks'
+    profile = parse_profile(raw)
+    assert list(profile) == list(PROFILE_FIELDS)
+    assert profile["name"] == "Asha Patil"
+    assert profile["primary_skills"] == "Java, Spring"
+    assert profile["company"] == "Unknown" and profile["contact"] == "Unknown"
+
+
+@pytest.mark.parametrize("raw", [
+    "Name: Asha Patil\n- Total Experience: 6 years\n**Current Role**: Backend Engineer",
+    "{broken json\nName: Asha Patil\nTotal Experience: 6 years\nCurrent Role: Backend Engineer",
+])
+def test_label_lines_when_the_model_ignores_json(raw):
+    profile = parse_profile(raw)
+    assert profile["name"] == "Asha Patil"
+    assert profile["total_experience"] == "6 years"
+    assert profile["current_role"] == "Backend Engineer"
+
+
+def test_nothing_parseable_gives_unknowns():
+    assert set(parse_profile("I cannot help with that.").values()) == {"Unknown"}
+
+
+def test_profile_text_round_trips_through_the_label_parser():
+    profile = parse_profile(json.dumps({"name": "Asha", "current_role": "Engineer"}))
+    assert parse_profile(profile_text(profile)) == profile
+
+
+def test_trim_to_budget_keeps_whole_lines():
+    text = "\n".join(f"line {i} with some words" for i in range(100))
+    trimmed = trim_to_budget(text, 50)
+    assert text.startswith(trimmed) and trimmed.endswith("words")
+    assert count_tokens(trimmed) <= 50
+
+
+def test_extract_and_ensure_store_the_profile_once(collection, tmp_path):
+    catalog = ResumeCatalog(str(tmp_path / "catalog.sqlite"))
+    text = "Asha Patil\nJava developer, 6 years"
+    catalog.upsert("asha.pdf", "Asha Patil", 1, sha256="v1", facets=resume_facets(text))
+    collection.add(ids=["asha_0"], documents=[text], embeddings=[[1.0, 0.0]],
+                   metadatas=[{"source": "asha.pdf", "chunk_id": 0}])
+    llm = FakeLLM('{"name": "Asha R. Patil", "total_experience": "7 years"}')
+    assert extract_profile(llm, text)["name"] == "Asha R. Patil"
+
+    profile = ensure_profile(catalog, collection, llm, "asha.pdf")
+    assert ensure_profile(catalog, collection, llm, "asha.pdf") == profile
+    assert len(llm.prompts) == 2
+    assert catalog.get("asha.pdf")["candidate_name"] == "Asha R. Patil"
+    assert catalog.get("asha.pdf")["facets"]["years_exp"] == 7
+
+
+def test_backfill_reports_failures_and_progress(collection, tmp_path):
+    catalog = ResumeCatalog(str(tmp_path / "catalog.sqlite"))
+    for i, text in enumerate(["Asha, Java", "Rahul, fail", "Meera, Python"]):
+        source = f"r{i}.pdf"
+        catalog.upsert(source, text.split(",")[0], 1, sha256=source, facets=resume_facets(text))
+        collection.add(ids=[source], documents=[text], embeddings=[[1.0, float(i)]],
+                       metadatas=[{"source": source, "chunk_id": 0}])
+    progress = []
+    report = backfill_profiles(catalog, collection, FakeLLM('{"name": "X"}'), workers=2,
+                               on_progress=lambda done, total: progress.append((done, total)))
+    assert report["done"] == 2
+    assert [source for source, _ in report["failed"]] == ["r1.pdf"]
+    assert progress[-1] == (3, 3)
+    assert catalog.missing_profiles() == ["r1.pdf"]
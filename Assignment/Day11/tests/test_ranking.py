@@ -0,0 +1,59 @@
+import pytest
+from ranking import rank_resumes, distance_to_similarity, ranking_text
+
+
+def results(*hits):
+    """collection.query()-shaped result from (source, distance) pairs, in rank order."""
+    return {
+        "documents": [[f"{source} chunk {i}" for i, (source, _) in enumerate(hits)]],
+        "metadatas": [[{"source": source} for source, _ in hits]],
+        "distances": [[distance for _, distance in hits]],
+    }
+
+
+HITS = results(("a.pdf", 0.2), ("b.pdf", 0.3), ("b.pdf", 0.35), ("b.pdf", 0.4), ("c.pdf", 0.9), ("a.pdf", 1.5))
+
+
+def test_max_ranks_by_best_chunk():
+    ranked = rank_resumes(HITS, method="max")
+    assert [r["source"] for r in ranked] == ["a.pdf", "b.pdf", "c.pdf"]
+    assert ranked[0]["score"] == pytest.approx(distance_to_similarity(0.2))
+
+
+def test_sum_top_m_rewards_several_good_chunks():
+    ranked = rank_resumes(HITS, method="sum_top_m", top_m=3)
+    assert [r["source"] for r in ranked][:2] == ["b.pdf", "a.pdf"]
+    assert ranked[0]["score"] == pytest.approx(1 / 1.3 + 1 / 1.35 + 1 / 1.4)
+    # top_m=1 is the same as max
+    assert [r["source"] for r in rank_resumes(HITS, method="sum_top_m", top_m=1)] == \
+        [r["source"] for r in rank_resumes(HITS, method="max")]
+
+
+def test_rrf_uses_rank_positions_not_distances():
+    ranked = rank_resumes(HITS, method="rrf", rrf_k=60)
+    assert ranked[0]["source"] == "b.pdf"
+    assert ranked[0]["score"] == pytest.approx(1 / 62 + 1 / 63 + 1 / 64)
+    assert ranked[1]["score"] == pytest.approx(1 / 61 + 1 / 66)
+
+
+def test_hits_are_sorted_closest_first_and_top_k_applies():
+    ranked = rank_resumes(HITS, method="max", top_k=2)
+    assert len(ranked) == 2
+    assert [d for _, d in ranked[0]["hits"]] == [0.2, 1.5]
+
+
+def test_key_and_missing_metadata():
+    hits = results(("x", 0.1), ("y", 0.2))
+    hits["metadatas"][0] = [{"resume_id": "r1"}, None]
+    ranked = rank_resumes(hits, key="resume_id")
+    assert [r["source"] for r in ranked] == ["r1"]
+    assert rank_resumes({"ids": [[]], "metadatas": [[]], "distances": [[]]}) == []
+
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        rank_resumes(HITS, method="mean")
+
+
+def test_ranking_text():
+    assert ranking_text(rank_resumes(HITS, top_k=2)) == "a.pdf (0.833), b.pdf (0.769)"
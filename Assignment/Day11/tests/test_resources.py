@@ -0,0 +1,46 @@
+import socket
+import pytest
+from resources import ResourceRegistry, check_models_endpoint, chroma_collection, REGISTRY
+from stub_server import start_stub_server, StubConfig
+
+
+def closed_port_url():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}/v1"
+
+
+def test_models_endpoint_check():
+    server, base_url = start_stub_server(0, StubConfig(latency_ms=0))
+    try:
+        check_models_endpoint(base_url)
+    finally:
+        server.shutdown()
+    with pytest.raises(OSError):
+        check_models_endpoint(closed_port_url(), timeout=1)
+
+
+def test_failed_health_check_rebuilds_the_resource():
+    registry = ResourceRegistry()
+    healthy = {"ok": True}
+
+    def check(value):
+        if not healthy["ok"]:
+            raise ConnectionError("down")
+
+    registry.register("client", object, health_check=check, check_every=0)
+    first = registry.get("client")
+    assert registry.get("client") is first
+    healthy["ok"] = False
+    assert registry.get("client") is not first
+
+
+def test_collection_follows_a_reopened_client(tmp_path):
+    collection = chroma_collection(str(tmp_path / "store"), "resumes")
+    first = collection.resolve()
+    assert collection.count() == 0
+    REGISTRY.reset(("chroma_client", str((tmp_path / "store").resolve())))
+    for entry in REGISTRY._entries.values():
+        entry.checked = 0.0
+    assert collection.resolve() is not first
+    assert collection.count() == 0
@@ -0,0 +1,56 @@
+from facets import resume_facets
+from resume_catalog import ResumeCatalog, guess_candidate_name
+
+TEXT = "Asha Patil\nJava developer, Spring, 6 years, Pune"
+
+
+def test_version_moves_only_when_a_resume_changes(tmp_path):
+    catalog = ResumeCatalog(str(tmp_path / "catalog.sqlite"))
+    assert catalog.version() == 0
+    catalog.upsert("asha.pdf", "Asha Patil", 3, sha256="v1", facets=resume_facets(TEXT))
+    assert catalog.version() == 1
+
+    # the upload page stores the same file again on every rerun
+    catalog.upsert("asha.pdf", "Asha Patil", 3, sha256="v1", facets=resume_facets(TEXT))
+    assert catalog.version() == 1
+
+    catalog.upsert("asha.pdf", "Asha Patil", 4, sha256="v2", facets=resume_facets(TEXT + ", Docker"))
+    assert catalog.version() == 2
+    assert catalog.get("asha.pdf")["facets"]["skills"] == ["docker", "java", "spring"]
+    catalog.remove("asha.pdf")
+    assert catalog.version() == 3 and len(catalog) == 0
+
+
+def test_profile_survives_an_unchanged_file_only(tmp_path):
+    catalog = ResumeCatalog(str(tmp_path / "catalog.sqlite"))
+    catalog.upsert("asha.pdf", "Asha Patil", 3, sha256="v1", facets=resume_facets(TEXT))
+    version = catalog.version()
+    catalog.set_profile("asha.pdf", {"name": "Asha R. Patil", "total_experience": "7 years", "primary_skills": "Kafka"})
+    assert catalog.version() == version
+    assert catalog.get("asha.pdf")["facets"]["years_exp"] == 7
+
+    catalog.upsert("asha.pdf", "Asha Patil", 3, sha256="v1", facets=resume_facets(TEXT))
+    row = catalog.get("asha.pdf")
+    assert row["candidate_name"] == "Asha R. Patil" and row["profile"] is not None
+    assert catalog.version() == version
+
+    catalog.upsert("asha.pdf", "Asha Patil", 3, sha256="v2", facets=resume_facets(TEXT))
+    assert catalog.get("asha.pdf")["profile"] is None
+    assert catalog.missing_profiles() == ["asha.pdf"]
+
+
+def test_rows_and_skill_index_are_reloaded_from_disk(tmp_path):
+    path = str(tmp_path / "catalog.sqlite")
+    catalog = ResumeCatalog(path)
+    catalog.upsert("asha.pdf", "Asha Patil", 3, sha256="v1", facets=resume_facets(TEXT))
+    catalog.upsert("rahul.pdf", "Rahul Mehta", 2, sha256="r1", facets=resume_facets("Python, Pune"))
+
+    reopened = ResumeCatalog(path)
+    assert [row["source"] for row in reopened.list_rows()] == ["asha.pdf", "rahul.pdf"]
+    assert reopened.version() == 2
+    assert reopened.skill_index["java"] == {"asha.pdf"}
+
+
+def test_guess_candidate_name():
+    assert guess_candidate_name("\n  Asha Patil Kulkarni\nJava") == "Asha Patil"
+    assert guess_candidate_name("") == "Unknown Candidate"
@@ -0,0 +1,130 @@
+import os
+import pytest
+from hash_embeddings import HashEmbeddings
+from lexical_index import LexicalIndex
+from resume_sync import (upsert_resume_chunks, content_chunk_ids, scan_resume_dir, load_manifest, save_manifest,
+                         file_sha256, store_resume_docs, EmptyResume)
+
+
+class CountingEmbeddings(HashEmbeddings):
+    def __init__(self):
+        super().__init__()
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded += texts
+        return super().embed_documents(texts)
+
+
+def metas(source, texts):
+    return [{"source": source, "chunk_id": i} for i in range(len(texts))]
+
+
+def test_content_chunk_ids_are_stable_and_unique():
+    ids = content_chunk_ids("a.pdf", ["java", "python", "java"])
+    assert ids == content_chunk_ids("a.pdf", ["java", "python", "java"])
+    assert len(set(ids)) == 3
+    assert ids[2] == ids[0] + "_1"
+
+
+def test_first_upsert_writes_every_chunk(collection):
+    embed = CountingEmbeddings()
+    texts = ["java spring", "react frontend", "aws docker"]
+    counts = upsert_resume_chunks(collection, "source", "a.pdf", texts, metas("a.pdf", texts), embed)
+    assert counts == {"written": 3, "kept": 0, "deleted": 0}
+    assert collection.count() == 3
+    assert embed.embedded == texts
+
+
+def test_update_embeds_only_new_text_and_drops_stale_chunks(collection, tmp_path):
+    embed = CountingEmbeddings()
+    lexical = LexicalIndex(str(tmp_path / "lexical.sqlite"))
+    old = ["java spring", "react frontend", "aws docker"]
+    upsert_resume_chunks(collection, "source", "a.pdf", old, metas("a.pdf", old), embed, lexical_index=lexical)
+    upsert_resume_chunks(collection, "source", "b.pdf", ["kotlin"], metas("b.pdf", ["kotlin"]), embed,
+                         lexical_index=lexical)
+    embed.embedded.clear()
+
+    # "java spring" stays at 0, "aws docker" moves from 2 to 1, "react frontend" is gone
+    new = ["java spring", "aws docker", "kafka streams"]
+    counts = upsert_resume_chunks(collection, "source", "a.pdf", new, metas("a.pdf", new), embed,
+                                  lexical_index=lexical)
+    assert counts == {"written": 2, "kept": 1, "deleted": 1}
+    assert embed.embedded == ["kafka streams"]
+
+    stored = collection.get(where={"source": "a.pdf"}, include=["documents", "metadatas"])
+    by_text = {doc: meta["chunk_id"] for doc, meta in zip(stored["documents"], stored["metadatas"])}
+    assert by_text == {"java spring": 0, "aws docker": 1, "kafka streams": 2}
+    # the other resume is untouched, and the keyword index follows the collection
+    assert collection.count() == 4
+    assert len(lexical) == 4
+    assert lexical.search("react") == []
+
+
+def test_unchanged_resume_writes_nothing(collection):
+    embed = CountingEmbeddings()
+    texts = ["java spring", "aws docker"]
+    upsert_resume_chunks(collection, "source", "a.pdf", texts, metas("a.pdf", texts), embed)
+    embed.embedded.clear()
+    counts = upsert_resume_chunks(collection, "source", "a.pdf", texts, metas("a.pdf", texts), embed)
+    assert counts == {"written": 0, "kept": 2, "deleted": 0}
+    assert embed.embedded == []
+
+
+def test_failed_embedding_keeps_the_old_version(collection):
+    texts = ["java spring", "aws docker"]
+    upsert_resume_chunks(collection, "source", "a.pdf", texts, metas("a.pdf", texts), HashEmbeddings())
+
+    class Broken(HashEmbeddings):
+        def embed_documents(self, texts):
+            raise ConnectionError("embedding server down")
+
+    with pytest.raises(ConnectionError):
+        upsert_resume_chunks(collection, "source", "a.pdf", ["kafka"], metas("a.pdf", ["kafka"]), Broken())
+    assert sorted(collection.get(where={"source": "a.pdf"})["documents"]) == sorted(texts)
+
+
+def test_empty_text_is_rejected(collection):
+    with pytest.raises(EmptyResume):
+        upsert_resume_chunks(collection, "source", "a.pdf", [], [], HashEmbeddings())
+
+
+def test_image_only_pdf_leaves_the_catalog_untouched(collection, tmp_path):
+    from langchain_core.documents import Document
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from resume_catalog import ResumeCatalog
+    catalog = ResumeCatalog(str(tmp_path / "catalog.sqlite"))
+    with pytest.raises(EmptyResume):
+        store_resume_docs(collection, [Document(page_content="", metadata={"page": 0})], "scan.pdf",
+                          HashEmbeddings(), RecursiveCharacterTextSplitter(chunk_size=400), catalog=catalog)
+    assert len(catalog) == 0 and catalog.version() == 0
+
+
+# ---------------- MANIFEST ----------------
+def test_scan_hashes_only_files_whose_stat_moved(tmp_path):
+    (tmp_path / "a.pdf").write_bytes(b"a v1")
+    (tmp_path / "b.pdf").write_bytes(b"b v1")
+    (tmp_path / "notes.txt").write_text("not a resume")
+    changed, deleted, unchanged = scan_resume_dir(str(tmp_path), {})
+    assert sorted(name for name, _, _ in changed) == ["a.pdf", "b.pdf"]
+    assert deleted == [] and unchanged == []
+
+    manifest_path = str(tmp_path / "manifest.json")
+    save_manifest(manifest_path, {name: entry for name, _, entry in changed})
+    manifest = load_manifest(manifest_path)
+    assert manifest["a.pdf"]["sha256"] == file_sha256(str(tmp_path / "a.pdf"))
+
+    # touched with the same bytes: unchanged, the new mtime is remembered
+    stat = os.stat(tmp_path / "a.pdf")
+    os.utime(tmp_path / "a.pdf", (stat.st_atime, stat.st_mtime + 10))
+    (tmp_path / "b.pdf").write_bytes(b"b version 2")
+    manifest["gone.pdf"] = {"sha256": "x", "mtime": 0, "size": 0}
+    changed, deleted, unchanged = scan_resume_dir(str(tmp_path), manifest)
+    assert [name for name, _, _ in changed] == ["b.pdf"]
+    assert deleted == ["gone.pdf"]
+    assert unchanged == ["a.pdf"]
+    assert manifest["a.pdf"]["mtime"] == stat.st_mtime + 10
+
+
+def test_load_manifest_without_file_is_empty(tmp_path):
+    assert load_manifest(str(tmp_path / "missing.json")) == {}
@@ -0,0 +1,37 @@
+import time
+from streaming import TimedStream
+
+
+class Chunk:
+    def __init__(self, content):
+        self.content = content
+
+
+def slow_chunks(parts, delay=0.02):
+    for part in parts:
+        time.sleep(delay)
+        yield Chunk(part)
+
+
+def test_yields_text_and_keeps_the_full_answer():
+    stream = TimedStream(slow_chunks(["Asha ", "", "fits ", "best"]))
+    assert stream.timing_text() == "Generation not finished"
+    assert list(stream) == ["Asha ", "fits ", "best"]
+    assert stream.text == "Asha fits best"
+    assert 0.015 <= stream.ttft <= stream.total
+    assert stream.timing_text().startswith("⏱️ First token")
+
+
+def test_timing_starts_on_first_next_not_on_construction():
+    stream = TimedStream(slow_chunks(["a"], delay=0))
+    time.sleep(0.05)
+    list(stream)
+    assert stream.total < 0.05
+
+
+def test_plain_strings_and_empty_streams():
+    stream = TimedStream(iter(["x", "y"]))
+    assert "".join(stream) == "xy"
+    empty = TimedStream(iter([]))
+    assert list(empty) == [] and empty.text == ""
+    assert "First token n/a" in empty.timing_text()
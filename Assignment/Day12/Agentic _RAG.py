@@ -1,15 +1,28 @@
 import os
 import streamlit as st
-import chromadb
 import pandas as pd
 from dotenv import load_dotenv
-from collections import Counter
-from langchain_community.document_loaders import PyPDFLoader, DirectoryLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain.embeddings import init_embeddings
-from langchain.chat_models import init_chat_model
 from langchain.tools import tool
 import json
+import sys
+import hashlib
+import time
+
+# shared resume helpers live next to the Day11 app
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Day11"))
+from resume_sync import sync_resume_dir, store_resume_docs, EmptyResume, MANIFEST_FILE
+from parallel_loader import load_pdf_bytes, persist_in_background
+from resume_catalog import ResumeCatalog, CATALOG_FILE
+from ranking import ranking_text
+from answer_cache import ANSWER_CACHE, llm_model_name
+from streaming import TimedStream
+from lexical_index import LexicalIndex, LEXICAL_INDEX_FILE
+from compact_index import open_vector_store
+from dedup_index import DuplicateIndex, DuplicateResume, DEDUP_INDEX_FILE
+from shortlist_pipeline import build_shortlist
+from resources import REGISTRY, chat_model, embeddings, chroma_collection
+from profile_extractor import EXTRACT_PROFILES, extract_profile, backfill_profiles, profile_markdown
 
 load_dotenv()
 
@@ -25,110 +38,179 @@ if "action" not in st.session_state:
     st.session_state.action = "shortlist"   # default view
 
 # ---------------- MODELS ----------------
-@st.cache_resource
-def init_models():
-    """Initialize chat model and embedding model."""
-    llm = init_chat_model(
-        model="phi-3.1-mini-4k-instruct",
-        model_provider="openai",
-        base_url="http://127.0.0.1:1234/v1",
-        api_key="not-needed"
-    )
-    embed_model = init_embeddings(
-        model="text-embedding-nomic-embed-text-v1.5-embedding",
-        provider="openai",
-        base_url="http://127.0.0.1:1234/v1",
-        api_key="not-needed",
-        check_embedding_ctx_length=False
-    )
-    return llm, embed_model
-
-llm, embed_model = init_models()
+# process-wide clients from the Day11 resource registry: built on first use
+# and reused by every rerun (LLM_BASE_URL points them at another server)
+llm = chat_model()
+embed_model = embeddings()
 
 # ---------------- TEXT SPLITTER & VECTOR DB ----------------
 text_splitter = RecursiveCharacterTextSplitter(chunk_size=400, chunk_overlap=60)
 
+# chunks fetched per query, then scored per resume from their distances
+CANDIDATE_POOL = 20
+# hybrid retrieval: vector and BM25 hits fused with reciprocal rank fusion
+VECTOR_POOL = 10
+LEXICAL_POOL = 20
+RANK_METHOD = "max"        # "max", "sum_top_m" or "rrf"
+SHORTLIST_TOP_K = 3
+
+SHORTLIST_PROMPT = """CANDIDATE PROFILE ({best_source}):
+{profile_text}
+RELEVANT RESUME PARTS: {resume_text}
+JOB REQUIREMENTS: {user_query}
+
+Using only the profile and resume parts, do not repeat the profile. Answer:
+Match Score (1-10): 
+Why: (at most 4 sentences, mention missing requirements)"""
+
+# uploads are parsed in memory; set False to skip keeping the original PDF
+PERSIST_UPLOADS = True
+
 PERSIST_DIR = "./Resume_base"
 COLLECTION_NAME = "Resume_collection"
 
-chroma_client = chromadb.PersistentClient(path=PERSIST_DIR)
-collection = chroma_client.get_or_create_collection(name=COLLECTION_NAME)
+collection = chroma_collection(PERSIST_DIR, COLLECTION_NAME)
+
+# ---------------- RESUME CATALOG ----------------
+@st.cache_resource
+def get_catalog():
+    """One row per resume, kept in memory across reruns (backfilled once from Chroma)."""
+    catalog = ResumeCatalog(os.path.join(PERSIST_DIR, CATALOG_FILE))
+    if len(catalog) == 0 and collection.count() > 0:
+        catalog.rebuild_from_collection(collection)
+    # skill / experience / location facets for resumes indexed before facets existed
+    catalog.backfill_facets(collection)
+    return catalog
+
+catalog = get_catalog()
+
+# ---------------- KEYWORD INDEX ----------------
+@st.cache_resource
+def get_lexical_index():
+    """BM25 index over the same chunks as Chroma (backfilled once from Chroma)."""
+    lexical_index = LexicalIndex(os.path.join(PERSIST_DIR, LEXICAL_INDEX_FILE))
+    if len(lexical_index) == 0 and collection.count() > 0:
+        lexical_index.rebuild_from_collection(collection)
+    return lexical_index
+
+lexical_index = get_lexical_index()
+
+# ---------------- VECTOR STORE ----------------
+# VECTOR_STORE=int8 / float16 answers vector search from a compact array
+# (rebuilt when the catalog version moves) instead of the float32 HNSW index
+@st.cache_resource
+def get_vector_store():
+    return open_vector_store(collection, PERSIST_DIR, version_fn=catalog.version)
+
+vector_store = get_vector_store()
+
+# ---------------- DUPLICATE INDEX ----------------
+@st.cache_resource
+def get_dedup_index():
+    """MinHash + LSH signatures of every resume, checked before a new one is embedded."""
+    dedup_index = DuplicateIndex(os.path.join(PERSIST_DIR, DEDUP_INDEX_FILE))
+    if len(dedup_index) == 0 and collection.count() > 0:
+        dedup_index.rebuild_from_collection(collection)
+    return dedup_index
+
+dedup_index = get_dedup_index()
+
+# ---------------- INITIAL LOAD / INCREMENTAL SYNC ----------------
+RESUME_DIR = r"D:\Sunbeam\IIT-Gen-AI-94443\Assignment\Day11\fake resume"
 
-# ---------------- INITIAL LOAD ----------------
-@st.cache_data
+@st.cache_data(ttl=600)
 def load_initial_resumes():
-    """Load initial PDF resumes from disk into the Chroma collection (only if collection is empty)."""
-    if collection.count() == 0:
-        try:
-            dir_loader = DirectoryLoader(
-                path=r"D:\Sunbeam\IIT-Gen-AI-94443\Assignment\Day11\fake resume",
-                glob="*.pdf",
-                loader_cls=PyPDFLoader
+    """Sync the resume folder into Chroma: only new/changed PDFs are embedded, deleted PDFs are removed."""
+    try:
+        report = sync_resume_dir(
+            collection,
+            RESUME_DIR,
+            embed_model,
+            text_splitter,
+            manifest_path=os.path.join(PERSIST_DIR, MANIFEST_FILE),
+            catalog=catalog,
+            lexical_index=lexical_index,
+            dedup_index=dedup_index
+        )
+        if report["added"] or report["updated"] or report["deleted"]:
+            st.success(
+                f"✅ Resumes synced: {report['added']} added, "
+                f"{report['updated']} updated, {report['deleted']} deleted"
             )
-            documents = dir_loader.load()
-            chunks = text_splitter.split_documents(documents)
-            texts = [c.page_content for c in chunks]
-            embeddings = embed_model.embed_documents(texts)
-
-            ids = [f"resume_{i}" for i in range(len(texts))]
-            metadatas = []
-            for i, chunk in enumerate(chunks):
-                meta = chunk.metadata.copy()
-                meta["chunk_id"] = i
-                meta["source"] = os.path.basename(meta.get("source", "Unknown"))
-                metadatas.append(meta)
-
-            collection.add(ids=ids, documents=texts, embeddings=embeddings, metadatas=metadatas)
-            st.success("✅ Initial resumes loaded!")
-            return True
-        except Exception as e:
-            st.warning(f"Initial load skipped: {e}")
-            return False
-    return False
+        for name, err in report["failed"]:
+            st.warning(f"Skipped {name}: {err}")
+        for name, duplicate_of in report["duplicates"]:
+            st.info(f"Skipped {name}: near-duplicate of {duplicate_of}")
+        return report
+    except Exception as e:
+        st.warning(f"Initial load skipped: {e}")
+        return None
 
 load_initial_resumes()
 
 # ---------------- UTILITY FUNCTIONS ----------------
 def save_uploaded_file(uploaded_file):
-    """Save uploaded Streamlit file to disk and return its path."""
-    os.makedirs("./uploads", exist_ok=True)
-    filepath = f"./uploads/{uploaded_file.name}"
-    with open(filepath, "wb") as f:
-        f.write(uploaded_file.getbuffer())
-    return filepath
+    """Save the uploaded Streamlit file to ./uploads on a background thread; returns a Future."""
+    return persist_in_background(uploaded_file.getbuffer(), f"./uploads/{uploaded_file.name}")
 
 def process_resume_file(filepath):
     """Read a PDF from disk, chunk it, embed it, and store in Chroma with metadata."""
-    loader = PyPDFLoader(filepath)
-    docs = loader.load()
-    chunks = text_splitter.split_documents(docs)
-    texts = [c.page_content for c in chunks]
-    embeddings = embed_model.embed_documents(texts)
-
-    source_name = os.path.basename(filepath)
-    ids = [f"{source_name}_{i}" for i in range(len(texts))]
-    metadatas = [{"source": source_name, "chunk_id": i} for i in range(len(chunks))]
+    with open(filepath, "rb") as f:
+        return process_resume_bytes(f.read(), os.path.basename(filepath))
 
-    collection.add(ids=ids, documents=texts, embeddings=embeddings, metadatas=metadatas)
+def process_resume_bytes(file_bytes, source_name, update=False):
+    """
+    Parse a PDF straight from memory, chunk it, embed it, and upsert it into Chroma under source_name.
+    With update=True a refused near-duplicate keeps the earlier version and is not recorded as an alias.
+    """
+    docs = load_pdf_bytes(file_bytes, source_name)
+    # same path as the folder sync: dedup check before any embedding, only new chunk
+    # texts are embedded, page metadata is kept, catalog / keyword / duplicate indexes follow
+    try:
+        store_resume_docs(
+            collection, docs, source_name, embed_model, text_splitter,
+            catalog=catalog,
+            sha256=hashlib.sha256(file_bytes).hexdigest(),
+            lexical_index=lexical_index,
+            dedup_index=dedup_index
+        )
+    except DuplicateResume as e:
+        if update:
+            return f"⚠️ Not updated: {e}"
+        dedup_index.add_alias(e.source, e.duplicate_of, e.similarity)
+        return f"⚠️ Skipped: {e}"
+    except EmptyResume as e:
+        return f"❌ Not stored: {e} (scanned PDFs need OCR first)"
+
+    # one-time profile extraction, shortlist queries read it from the catalog
+    if EXTRACT_PROFILES and not catalog.get(source_name)["profile"]:
+        try:
+            catalog.set_profile(source_name, extract_profile(llm, "\n".join(d.page_content for d in docs)))
+        except Exception as e:
+            return f"✅ Successfully stored: {source_name} (profile extraction postponed: {e})"
     return f"✅ Successfully stored: {source_name}"
 
 def get_resumes_df():
-    """Fetch all distinct resumes from Chroma and store them in session_state as a DataFrame."""
-    data = collection.get(include=["documents", "metadatas"])
-    rows, seen = [], set()
-
-    for doc, meta, doc_id in zip(data["documents"], data["metadatas"], data["ids"]):
-        source = meta.get("source", "Unknown")
-        if source not in seen:
-            seen.add(source)
-            lines = [l.strip() for l in doc.strip().split("\n") if l.strip()]
-            name = " ".join(lines[0].split()[:2]) if lines else "Unknown"
-            rows.append({"Name": name, "Source": source, "ID": doc_id})
+    """Build the distinct-resume DataFrame from the catalog and store it in session_state."""
+    rows = [
+        {
+            "Name": row["candidate_name"],
+            "Role": (row["profile"] or {}).get("current_role", ""),
+            "Experience": (row["profile"] or {}).get("total_experience", ""),
+            "Source": row["source"],
+            "ID": row["source"],
+            "Chunks": row["chunk_count"],
+            "Uploaded": row["upload_time"],
+        }
+        for row in catalog.list_rows()
+    ]
 
     df = pd.DataFrame(rows)
     st.session_state.resumes_df = df
     return df
 
+get_resumes_df()
+
 # ---------------- TOOL FUNCTIONS ----------------
 @tool
 def list_all_resumes() -> str:
@@ -158,18 +240,37 @@ def delete_resume(resume_source: str) -> str:
     str
         A success or not-found message.
     """
-    data = collection.get(include=["metadatas"])
-    delete_ids = [
-        doc_id
-        for doc_id, meta in zip(data["ids"], data["metadatas"])
-        if meta.get("source") == resume_source
-    ]
+    # only fetch the ids of this resume instead of every metadata in the collection
+    delete_ids = collection.get(where={"source": resume_source}, include=[])["ids"]
     if delete_ids:
         collection.delete(ids=delete_ids)
+        lexical_index.remove_ids(delete_ids)
+        catalog.remove(resume_source)
+        dedup_index.remove(resume_source)
         get_resumes_df()
         return f"✅ Deleted resume: {resume_source}"
     return f"❌ Resume not found: {resume_source}"
 
+def build_shortlist_prompt(user_query: str):
+    """
+    Retrieve and rank resumes for a query and build the LLM prompt for the best one.
+    Returns None when nothing matches, otherwise a dict with best_source, ranked,
+    profile, prompt, filter_note and the collection version read before retrieval
+    (see shortlist_pipeline.build_shortlist, shared with Day11 and bench_shortlist.py).
+    """
+    return build_shortlist(
+        user_query, SHORTLIST_PROMPT, catalog, collection, vector_store, lexical_index, embed_model, llm,
+        top_k=SHORTLIST_TOP_K, candidate_pool=CANDIDATE_POOL, vector_pool=VECTOR_POOL,
+        lexical_pool=LEXICAL_POOL, rank_method=RANK_METHOD
+    )
+
+def shortlist_header(shortlist) -> str:
+    note = f"_{shortlist['filter_note']}_\n\n" if shortlist["filter_note"] else ""
+    return (
+        f"**🎯 BEST MATCH: {shortlist['best_source']}**\n_Ranking: {ranking_text(shortlist['ranked'])}_\n\n"
+        f"{note}{profile_markdown(shortlist['profile'])}\n\n"
+    )
+
 @tool
 def shortlist_resume(user_query: str) -> str:
     """
@@ -186,33 +287,11 @@ def shortlist_resume(user_query: str) -> str:
         A formatted description of the best-matching candidate and their details.
     """
     try:
-        query_embedding = embed_model.embed_query(user_query)
-        results = collection.query(query_embeddings=[query_embedding], n_results=3)
-
-        if not results["metadatas"][0]:
+        shortlist = build_shortlist_prompt(user_query)
+        if shortlist is None:
             return "❌ No matching resumes found"
-
-        sources = [m["source"] for m in results["metadatas"][0]]
-        best_source = Counter(sources).most_common(1)[0][0]
-
-        all_docs = collection.get(where={"source": best_source})
-        resume_text = "\n".join(all_docs["documents"][:3])
-
-        prompt = f"""RESUME: {best_source}
-CONTENT: {resume_text[:2000]}
-JOB REQUIREMENTS: {user_query}
-
-Extract key information:
-Name: 
-Current Role: 
-Company: 
-Experience (years): 
-Top Skills: 
-Match Score (1-10): 
-Source: {best_source}"""
-
-        response = llm.invoke(prompt)
-        return f"**🎯 BEST MATCH: {best_source}**\n{response.content}"
+        answer, _ = ANSWER_CACHE.invoke(llm, shortlist["prompt"], shortlist["version"])
+        return shortlist_header(shortlist) + answer
     except Exception as e:
         return f"❌ Search error: {str(e)}"
 
@@ -257,7 +336,10 @@ with st.sidebar:
     st.markdown("---")
     col1, col2 = st.columns(2)
     col1.metric("Total Chunks", collection.count())
-    col2.metric("Total Resumes", len(st.session_state.resumes_df))
+    col2.metric("Total Resumes", len(catalog))
+    st.caption(embed_model.query_cache.stats_text())
+    st.caption(ANSWER_CACHE.stats_text())
+    st.caption(REGISTRY.stats_text())
 
 # ---------------- MAIN AREA (UI) ----------------
 # Shortlist page: like your screenshot
@@ -282,9 +364,36 @@ if st.session_state.action == "shortlist":
         with st.chat_message("user"):
             st.markdown(user_query)
 
-        reply = shortlist_resume.invoke({"user_query": user_query})
+        # streaming mode: tokens are rendered as they arrive
+        request_start = time.perf_counter()
         with st.chat_message("assistant"):
-            st.markdown(reply)
+            try:
+                shortlist = build_shortlist_prompt(user_query)
+            except Exception as e:
+                shortlist = None
+                reply = f"❌ Search error: {str(e)}"
+            else:
+                reply = "❌ No matching resumes found"
+
+            if shortlist is None:
+                st.markdown(reply)
+            else:
+                header = shortlist_header(shortlist)
+                st.markdown(header)
+                model_name = llm_model_name(llm)
+                answer = ANSWER_CACHE.get(model_name, shortlist["prompt"], shortlist["version"])
+                if answer is not None:
+                    st.markdown(answer)
+                    st.caption("⚡ Served from answer cache")
+                else:
+                    stream = TimedStream(llm.stream(shortlist["prompt"]))
+                    st.write_stream(stream)
+                    answer = stream.text
+                    ANSWER_CACHE.put(model_name, shortlist["prompt"], shortlist["version"], answer)
+                    st.caption(
+                        f"{stream.timing_text()} · request {time.perf_counter() - request_start:.2f}s"
+                    )
+                reply = header + answer
         st.session_state.messages.append({"role": "assistant", "content": reply})
 
 elif st.session_state.action == "upload":
@@ -295,11 +404,17 @@ elif st.session_state.action == "upload":
         col1.success(f"**{uploaded_file.name}** ready")
         if col2.button("🚀 Upload & Process", type="primary"):
             with st.spinner("Processing..."):
-                filepath = save_uploaded_file(uploaded_file)
-                result = process_resume_file(filepath)
-                st.success(result)
+                result = process_resume_bytes(uploaded_file.getbuffer(), uploaded_file.name)
+                if PERSIST_UPLOADS and result.startswith("✅"):
+                    save_uploaded_file(uploaded_file)
+                # shown after the rerun below, which would otherwise wipe it
+                st.session_state.upload_report = (result, embed_model.throughput_text())
                 get_resumes_df()
                 st.rerun()
+    if "upload_report" in st.session_state:
+        result, throughput = st.session_state.pop("upload_report")
+        (st.success if result.startswith("✅") else st.warning)(result)
+        st.caption(throughput)
 
 elif st.session_state.action == "list":
     st.header("📋 All Resumes")
@@ -308,6 +423,24 @@ elif st.session_state.action == "list":
         st.success("✅ List refreshed!")
     st.dataframe(st.session_state.resumes_df, use_container_width=True)
 
+    missing = catalog.missing_profiles()
+    if missing and st.button(f"🧾 Extract Missing Profiles ({len(missing)})"):
+        bar = st.progress(0.0, text="Extracting profiles...")
+        profile_report = backfill_profiles(
+            catalog, collection, llm,
+            on_progress=lambda done, total: bar.progress(done / total, text=f"Profiles: {done}/{total}")
+        )
+        st.success(f"✅ Extracted {profile_report['done']} profiles")
+        for source, error in profile_report["failed"]:
+            st.warning(f"Profile of {source} failed: {error}")
+        get_resumes_df()
+
+    clusters = dedup_index.clusters()
+    if clusters:
+        st.subheader(f"🧬 Possible duplicates ({len(clusters)} groups)")
+        for i, members in enumerate(clusters, start=1):
+            st.markdown(f"**Group {i}:** " + ", ".join(f"`{source}` ({status})" for source, status in members))
+
 elif st.session_state.action == "delete":
     st.header("🗑️ Delete Resume")
     col1, col2 = st.columns(2)
@@ -334,9 +467,15 @@ elif st.session_state.action == "update":
         new_file = st.file_uploader("Upload updated PDF", type=["pdf"])
         if st.button("🔄 Update", type="primary") and old_name and new_file:
             with st.spinner("Updating..."):
-                _ = delete_resume.invoke({"resume_source": old_name})
-                filepath = save_uploaded_file(new_file)
-                result = process_resume_file(filepath)
-                st.success(result)
+                # upsert under the existing key instead of delete-then-add
+                result = process_resume_bytes(new_file.getbuffer(), old_name, update=True)
+                if PERSIST_UPLOADS and result.startswith("✅"):
+                    persist_in_background(new_file.getbuffer(), f"./uploads/{old_name}")
+                # shown after the rerun below, which would otherwise wipe it
+                st.session_state.update_report = (result, embed_model.throughput_text())
                 get_resumes_df()
                 st.rerun()
+    if "update_report" in st.session_state:
+        result, throughput = st.session_state.pop("update_report")
+        (st.success if result.startswith("✅") else st.warning)(result)
+        st.caption(throughput)
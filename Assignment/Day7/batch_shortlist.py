@@ -0,0 +1,160 @@
+"""
+Batch shortlisting: many job descriptions against the whole resume pool.
+
+Embeds all JDs in one batched pass, loads the chunk embedding matrix from
+Chroma once, scores every JD x chunk pair with one normalized matrix
+multiply per block of JDs, keeps each resume's best chunk (JD x resume)
+and writes the top-k resumes per JD to CSV or Parquet.
+
+Usage:
+    python batch_shortlist.py jds.csv --top-k 10 --output shortlist.csv
+    python batch_shortlist.py ./jd_folder --output shortlist.parquet
+
+jds.csv needs the columns jd_id, job_description. A folder is read as one
+JD per .txt file (the file name is the jd_id).
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+import chromadb
+from dotenv import load_dotenv
+from langchain.embeddings import init_embeddings
+
+# shared resume helpers live next to the Day11 app
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Day11"))
+from embed_client import BatchedEmbeddings
+from embed_cache import CachedEmbeddings
+from resources import base_url_from_env
+
+load_dotenv()
+
+PERSIST_DIR = "./Resume_base"
+COLLECTION_NAME = "Resume_collection"
+PAGE_SIZE = 5000
+
+
+def load_jds(path):
+    """Return (jd_ids, texts) from a CSV file or a folder of .txt files."""
+    if os.path.isdir(path):
+        names = sorted(n for n in os.listdir(path) if n.lower().endswith(".txt"))
+        texts = []
+        for name in names:
+            with open(os.path.join(path, name), encoding="utf-8") as f:
+                texts.append(f.read())
+        return [os.path.splitext(n)[0] for n in names], texts
+    df = pd.read_csv(path)
+    return df["jd_id"].astype(str).tolist(), df["job_description"].astype(str).tolist()
+
+
+def load_chunk_matrix(collection):
+    """
+    Page through the collection once and return (matrix, resume_keys) where
+    matrix is the L2-normalized float32 chunk embedding matrix and
+    resume_keys[i] is the resume of row i (resume_id for Day7, else source).
+    """
+    vectors, keys = [], []
+    offset = 0
+    while True:
+        page = collection.get(include=["embeddings", "metadatas"], limit=PAGE_SIZE, offset=offset)
+        if len(page["ids"]) == 0:
+            break
+        vectors.append(np.asarray(page["embeddings"], dtype=np.float32))
+        keys += [(m or {}).get("resume_id") or (m or {}).get("source", "Unknown") for m in page["metadatas"]]
+        offset += len(page["ids"])
+    if not vectors:
+        return np.zeros((0, 0), dtype=np.float32), []
+    matrix = np.vstack(vectors)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+    return matrix, keys
+
+
+def group_by_resume(matrix, keys):
+    """Sort chunk rows so each resume is contiguous; return (matrix, resumes, starts)."""
+    resumes, inverse = np.unique(np.asarray(keys, dtype=object), return_inverse=True)
+    order = np.argsort(inverse, kind="stable")
+    starts = np.searchsorted(inverse[order], np.arange(len(resumes)))
+    return matrix[order], resumes, starts
+
+
+def score_jds(jd_matrix, chunk_matrix, starts, top_k, block_size=64):
+    """
+    Yield (jd_index, resume_indices, scores) with each JD's top_k resumes.
+    A resume's score is the cosine similarity of its best chunk.
+    """
+    if top_k < 1:
+        raise ValueError(f"top_k must be at least 1, got {top_k}")
+    top_k = min(top_k, len(starts))
+    for b in range(0, len(jd_matrix), block_size):
+        sims = jd_matrix[b:b + block_size] @ chunk_matrix.T          # JD x chunk
+        per_resume = np.maximum.reduceat(sims, starts, axis=1)      # JD x resume
+        best = np.argpartition(-per_resume, top_k - 1, axis=1)[:, :top_k]
+        for row, candidates in enumerate(best):
+            scores = per_resume[row, candidates]
+            order = np.argsort(-scores)
+            yield b + row, candidates[order], scores[order]
+
+
+def write_results(rows, output):
+    df = pd.DataFrame(rows, columns=["jd_id", "rank", "resume", "score"])
+    if output.lower().endswith(".parquet"):
+        df.to_parquet(output, index=False)   # needs pyarrow or fastparquet
+    else:
+        df.to_csv(output, index=False)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch JD vs resume-pool shortlisting")
+    parser.add_argument("jds", help="CSV with jd_id,job_description or a folder of .txt JDs")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--output", default="shortlist.csv", help=".csv or .parquet")
+    parser.add_argument("--persist-dir", default=PERSIST_DIR)
+    parser.add_argument("--collection", default=COLLECTION_NAME)
+    parser.add_argument("--block-size", type=int, default=64, help="JDs scored per matrix multiply")
+    parser.add_argument("--base-url", help="OpenAI-compatible embedding server (default: LLM_BASE_URL)")
+    args = parser.parse_args()
+    if args.top_k < 1:
+        parser.error("--top-k must be at least 1")
+    base_url = args.base_url or base_url_from_env()
+
+    embed_model = CachedEmbeddings(BatchedEmbeddings(init_embeddings(
+        model="text-embedding-nomic-embed-text-v1.5-embedding",
+        provider="openai",
+        base_url=base_url,
+        api_key="not-needed",
+        check_embedding_ctx_length=False
+    )), path=os.path.join(args.persist_dir, "embed_cache.sqlite"))
+    collection = chromadb.PersistentClient(path=args.persist_dir).get_or_create_collection(name=args.collection)
+
+    start = time.perf_counter()
+    jd_ids, jd_texts = load_jds(args.jds)
+    if not jd_ids:
+        sys.exit(f"No job descriptions found in {args.jds} (need jd_id,job_description rows or .txt files).")
+    jd_matrix = np.asarray(embed_model.embed_documents(jd_texts), dtype=np.float32)
+    jd_matrix /= np.linalg.norm(jd_matrix, axis=1, keepdims=True) + 1e-12
+    t_embed = time.perf_counter()
+
+    chunk_matrix, keys = load_chunk_matrix(collection)
+    if not keys:
+        print("Collection is empty, nothing to shortlist.")
+        return
+    chunk_matrix, resumes, starts = group_by_resume(chunk_matrix, keys)
+    t_load = time.perf_counter()
+
+    rows = []
+    for jd_index, resume_indices, scores in score_jds(jd_matrix, chunk_matrix, starts, args.top_k, args.block_size):
+        for rank, (r, score) in enumerate(zip(resume_indices, scores), start=1):
+            rows.append((jd_ids[jd_index], rank, resumes[r], float(score)))
+    t_score = time.perf_counter()
+
+    write_results(rows, args.output)
+    print(f"{len(jd_ids)} JDs x {len(keys)} chunks ({len(resumes)} resumes) -> {args.output}")
+    print(f"embed JDs {t_embed - start:.2f}s | load matrix {t_load - t_embed:.2f}s | "
+          f"score {t_score - t_load:.2f}s | total {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,21 @@
 import os
+import sys
+import time
 import uuid
 import datetime
 import streamlit as st
-import chromadb
 from dotenv import load_dotenv
 
-from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain.embeddings import init_embeddings
-from langchain.chat_models import init_chat_model
+
+# shared resume helpers live next to the Day11 app
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Day11"))
+from lexical_index import LexicalIndex, LEXICAL_INDEX_FILE, hybrid_query
+from ingest_pipeline import IngestPipeline, STAGES
+from parallel_loader import load_pdf_bytes
+from resume_sync import content_chunk_ids, upsert_resume_chunks, EmptyResume
+from resources import chat_model, embeddings, chroma_collection
+from facets import resume_facets, facet_metadata, query_constraints, constraints_where, backfill_chunk_facets
 
 # ================= ENV =================
 load_dotenv()
@@ -32,6 +39,9 @@ if "messages" not in st.session_state:
 if "collection" not in st.session_state:
     st.session_state.collection = None
 
+if "lexical_index" not in st.session_state:
+    st.session_state.lexical_index = None
+
 if "resume_index" not in st.session_state:
     # maps: resume_id -> {file_name, upload_time}
     st.session_state.resume_index = {}
@@ -41,22 +51,11 @@ PERSIST_DIR = "./Resume_base"        # same directory you used
 COLLECTION_NAME = "Resume_collection"
 
 
-# ================= LLM =================
-llm = init_chat_model(
-    model="phi-3.1-mini-4k-instruct",
-    model_provider="openai",
-    base_url="http://127.0.0.1:1234/v1",
-    api_key="not-needed"
-)
-
-# ================= EMBEDDINGS =================
-embed_model = init_embeddings(
-    model="text-embedding-nomic-embed-text-v1.5-embedding",
-    provider="openai",
-    base_url="http://127.0.0.1:1234/v1",
-    api_key="not-needed",
-    check_embedding_ctx_length=False
-)
+# ================= LLM / EMBEDDINGS =================
+# process-wide clients from the Day11 resource registry: built on first use
+# and reused by every rerun (LLM_BASE_URL points them at another server)
+llm = chat_model()
+embed_model = embeddings()
 
 # ================= TEXT SPLITTER =================
 text_splitter = RecursiveCharacterTextSplitter(
@@ -66,56 +65,74 @@ text_splitter = RecursiveCharacterTextSplitter(
 
 # ================= CHROMA CLIENT / COLLECTION =================
 def get_chroma_collection():
-    chroma_client = chromadb.PersistentClient(path=PERSIST_DIR)
-    collection = chroma_client.get_or_create_collection(name=COLLECTION_NAME)
-    return collection
+    # shared client, opened once per process and health-checked on use
+    return chroma_collection(PERSIST_DIR, COLLECTION_NAME)
 
 
 def init_vector_db_once():
     if not st.session_state.db_initialized:
         st.session_state.collection = get_chroma_collection()
+        # BM25 keyword index over the same chunks, for hybrid search
+        st.session_state.lexical_index = LexicalIndex(os.path.join(PERSIST_DIR, LEXICAL_INDEX_FILE))
+        if len(st.session_state.lexical_index) == 0 and st.session_state.collection.count() > 0:
+            st.session_state.lexical_index.rebuild_from_collection(st.session_state.collection)
         st.session_state.db_initialized = True
 
 
+@st.cache_resource
+def backfill_facets_once():
+    """Facet metadata for chunks indexed before facets existed, once per process."""
+    return backfill_chunk_facets(get_chroma_collection(), "resume_id")
+
+
 init_vector_db_once()
+# chunks without facets would be dropped by every where filter
+backfill_facets_once()
 
 # ================= HELPER FUNCTIONS =================
-def index_single_pdf(file_bytes, file_name: str, resume_id: str | None = None):
-    """
-    Load a single PDF from bytes, split, embed, and add to Chroma.
-    Stores metadata: resume_id, file_name, upload_time.
-    """
-    if resume_id is None:
-        resume_id = str(uuid.uuid4())
+def parse_pdf_bytes(file_bytes, file_name: str):
+    """Parse PDF bytes (or a memoryview) in memory, no temp file."""
+    return load_pdf_bytes(file_bytes, file_name)
 
-    temp_path = f"./_tmp_{resume_id}.pdf"
-    with open(temp_path, "wb") as f:
-        f.write(file_bytes)
 
-    loader = PyPDFLoader(temp_path)
-    documents = loader.load()
-
-    chunks = text_splitter.split_documents(documents)
+def build_chunk_records(chunks, resume_id: str, file_name: str, upload_time: str):
+    """Return (ids, texts, metadatas) for the chunks of one resume."""
     texts = [c.page_content for c in chunks]
-    embeddings = embed_model.embed_documents(texts)
-
-    ids = [f"{resume_id}_chunk_{i}" for i in range(len(texts))]
+    # content-addressed, so an update keeps the ids of unchanged chunks
+    ids = content_chunk_ids(resume_id, texts)
+    # resume-level skills / experience / location on every chunk, for where filters
+    facets = facet_metadata(resume_facets("\n".join(texts)))
     metadatas = []
-    upload_time = datetime.datetime.now().isoformat()
-
     for i, chunk in enumerate(chunks):
         meta = chunk.metadata.copy()
+        meta.update(facets)
         meta["resume_id"] = resume_id
         meta["file_name"] = file_name
         meta["chunk_id"] = i
         meta["upload_time"] = upload_time
         metadatas.append(meta)
+    return ids, texts, metadatas
+
 
-    st.session_state.collection.add(
-        ids=ids,
-        documents=texts,
-        embeddings=embeddings,
-        metadatas=metadatas
+def index_single_pdf(file_bytes, file_name: str, resume_id: str | None = None):
+    """
+    Load a single PDF from bytes, split, embed, and upsert into Chroma.
+    Stores metadata: resume_id, file_name, upload_time.
+    With an existing resume_id the new chunks are upserted first and the
+    stale ones deleted after: only new chunk texts are embedded and the
+    resume never drops out of search (see upsert_resume_chunks).
+    """
+    if resume_id is None:
+        resume_id = str(uuid.uuid4())
+
+    documents = parse_pdf_bytes(file_bytes, file_name)
+    chunks = text_splitter.split_documents(documents)
+    upload_time = datetime.datetime.now().isoformat()
+    _, texts, metadatas = build_chunk_records(chunks, resume_id, file_name, upload_time)
+
+    upsert_resume_chunks(
+        st.session_state.collection, "resume_id", resume_id, texts, metadatas, embed_model,
+        lexical_index=st.session_state.lexical_index
     )
 
     # maintain a simple index for listing resumes
@@ -124,10 +141,67 @@ def index_single_pdf(file_bytes, file_name: str, resume_id: str | None = None):
         "upload_time": upload_time
     }
 
-    os.remove(temp_path)
     return resume_id
 
 
+def index_many_pdfs(uploaded_files):
+    """
+    Pipelined ingestion of several new resumes: parse, split, embed and store
+    run on separate threads joined by bounded queues, so parsing file N+1
+    overlaps embedding file N, and Chroma writes are batched across files.
+    Shows one progress bar per stage and returns the pipeline when done.
+    """
+    # stage threads must not touch st.session_state, hand them the objects
+    collection = st.session_state.collection
+    lexical_index = st.session_state.lexical_index
+
+    def store_batch(items):
+        ids, texts, embeddings, metadatas = [], [], [], []
+        for item in items:
+            item_ids, item_texts, item_metas = build_chunk_records(
+                item["split"], item["resume_id"], item["name"], item["upload_time"]
+            )
+            ids += item_ids
+            texts += item_texts
+            metadatas += item_metas
+            embeddings += item["embed"]
+        if ids:
+            collection.add(ids=ids, documents=texts, embeddings=embeddings, metadatas=metadatas)
+            lexical_index.add(ids, texts, metadatas)
+
+    items = [
+        {
+            "name": f.name,
+            "data": f.getbuffer(),
+            "resume_id": str(uuid.uuid4()),
+            "upload_time": datetime.datetime.now().isoformat(),
+        }
+        for f in uploaded_files
+    ]
+    pipeline = IngestPipeline(
+        parse_fn=lambda item: parse_pdf_bytes(item["data"], item["name"]),
+        split_fn=lambda item: text_splitter.split_documents(item["parse"]),
+        embed_fn=lambda item: embed_model.embed_documents([c.page_content for c in item["split"]]),
+        store_fn=store_batch,
+    ).start(items)
+
+    bars = {stage: st.progress(0.0, text=stage) for stage in STAGES}
+    while True:
+        alive = pipeline.is_alive()
+        for stage, done in pipeline.progress().items():
+            bars[stage].progress(done, text=f"{stage}: {pipeline.counts[stage]}/{pipeline.total}")
+        if not alive:
+            break
+        time.sleep(0.2)
+
+    for item in pipeline.results:
+        st.session_state.resume_index[item["resume_id"]] = {
+            "file_name": item["name"],
+            "upload_time": item["upload_time"]
+        }
+    return pipeline
+
+
 def delete_resume_from_chroma(resume_id: str):
     """
     Delete all chunks belonging to a resume_id from Chroma and local index.
@@ -140,6 +214,7 @@ def delete_resume_from_chroma(resume_id: str):
 
     if len(results.get("ids", [])) > 0:
         collection.delete(ids=results["ids"])
+    st.session_state.lexical_index.remove_where("resume_id", resume_id)
 
     if resume_id in st.session_state.resume_index:
         del st.session_state.resume_index[resume_id]
@@ -149,12 +224,30 @@ def shortlist_resumes(job_description: str, top_k: int = 3):
     """
     Use job description embedding to perform similarity search over Chroma.
     Return top_k grouped by resume_id with simple ranking.
+    Hard requirements in the JD (required skills, years of experience,
+    city, each from a "must" / "required" clause) become a where filter on
+    the chunk facets; if no resume meets them all, the search falls back to
+    the whole collection.
     """
     query_emb = embed_model.embed_query(job_description)
-    results = st.session_state.collection.query(
-        query_embeddings=[query_emb],
-        n_results=20  # fetch more chunks, then aggregate per resume
-    )
+    where = constraints_where(query_constraints(job_description))
+
+    def search(where):
+        # vector + BM25 hits fused with reciprocal rank fusion
+        return hybrid_query(
+            st.session_state.collection,
+            st.session_state.lexical_index,
+            query_emb,
+            job_description,
+            n_results=20,  # fetch more chunks, then aggregate per resume
+            vector_pool=10,
+            lexical_pool=20,
+            where=where
+        )
+
+    results = search(where)
+    if where is not None and not results["ids"][0]:
+        results = search(None)
 
     # Aggregate scores per resume_id
     docs = results["documents"][0]
@@ -251,19 +344,27 @@ if page == "Upload / Update Resume":
     )
 
     if st.button("Process Uploaded Resumes") and uploaded_files:
-        for f in uploaded_files:
-            file_bytes = f.read()
-            file_name = f.name
-
-            if selected_resume_id != "-- New Resume --":
-                # Update flow: delete old and reindex
-                delete_resume_from_chroma(selected_resume_id)
-                index_single_pdf(file_bytes, file_name, resume_id=selected_resume_id)
+        if selected_resume_id != "-- New Resume --":
+            for f in uploaded_files:
+                file_bytes = f.getbuffer()
+                file_name = f.name
+                # Update flow: upsert under the same resume_id instead of delete-then-add
+                try:
+                    index_single_pdf(file_bytes, file_name, resume_id=selected_resume_id)
+                except EmptyResume as e:
+                    st.error(f"Not updated: {e} (scanned PDFs need OCR first)")
+                    continue
                 st.success(f"Updated resume for ID: {selected_resume_id} with file: {file_name}")
-            else:
-                # New resume
-                new_id = index_single_pdf(file_bytes, file_name)
-                st.success(f"Uploaded new resume: {file_name} with ID: {new_id}")
+                st.caption(embed_model.throughput_text())
+        else:
+            # New resumes: pipelined parse / split / embed / store
+            start = time.perf_counter()
+            pipeline = index_many_pdfs(uploaded_files)
+            for item in pipeline.results:
+                st.success(f"Uploaded new resume: {item['name']} with ID: {item['resume_id']}")
+            for name, error in pipeline.errors:
+                st.error(f"Failed {name}: {error}")
+            st.caption(f"{len(pipeline.results)}/{pipeline.total} files in {time.perf_counter() - start:.1f}s")
 
 # ================= PAGE: LIST & DELETE =================
 elif page == "List & Delete Resumes":
@@ -329,3 +430,4 @@ elif page == "Shortlist by Job Description":
 # ================= OPTIONAL: SIMPLE CHAT VIEW (LOG) =================
 st.sidebar.subheader("System Log")
 st.sidebar.write(f"Total resumes indexed: {len(st.session_state.resume_index)}")
+st.sidebar.write(embed_model.query_cache.stats_text())